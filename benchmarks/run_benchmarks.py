@@ -0,0 +1,406 @@
+# run_benchmarks.py
+"""
+Times every pipeline stage on synthetic data and records peak memory.
+
+  python benchmarks/run_benchmarks.py 1k 100k
+  python benchmarks/run_benchmarks.py 1m --baseline benchmarks/results/<older>.json
+
+Stages: load_business (fetch_business_data), load_demographic
+(fetch_demographic_data), filter (filter_businesses), sort
+(sort_businesses by name), sort_revenue (sort_businesses by revenue,
+~30% of rows API-shaped with revenue=None), analyze (analyze_market), render (render_results).
+Scenarios (--no-scenarios skips them) time fixed feature workloads that
+don't scale with the dataset size and are reported as the "scenarios" run:
+  places_concurrent  30 Places city queries against a 0.2s-latency fake
+                     server (concurrent: ~one round trip, not 30)
+  census_nationwide  8 states of ACS places from a 0.1s-latency fake server
+                     (concurrent: ~one round trip, not 8)
+  index_query        100 filter + revenue sorts on a 200k-row BusinessIndex
+                     (target: < 1 ms per query)
+  snapshot_open      20 opens + lookups of a 200k-place demographic snapshot
+                     (flat: the open cost must not grow with the place count)
+  rank_cities        top-25 places for one industry over 5k places / 50k
+                     businesses (target: < 0.5 s)
+  service_analyze    8 keep-alive clients × 40 POST /analyze against the
+                     in-process service while it reloads every 0.2 s
+                     (target: median well under 50 ms)
+  spatial_radius     20 KD-tree 10 km radius queries over 200k geocoded
+                     businesses (target: < 50 ms per query)
+  resolve_places     300k city spellings (2k places × suffix variants) to
+                     place IDs with resolve_many (target: < 2 s)
+  sweep              ~100k industry × city-window × SPC scenarios in-process
+                     (target: > 20k scenarios / s)
+  sensitivity        100k Monte Carlo draws of the demand score for one
+                     market (target: interactive, < 1 s)
+Results go to benchmarks/results/<timestamp>.json; with --baseline, stages
+slower than the baseline by more than --tolerance are reported and the
+exit code is 1.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, "..", "marketdemand", "python_app"))
+sys.path.insert(0, BASE_DIR)
+
+import data_sources  # noqa: E402
+import data_storage  # noqa: E402
+import transport  # noqa: E402
+from analyzer import analyze_market  # noqa: E402
+from business_index import BusinessIndex  # noqa: E402
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data  # noqa: E402
+from demographic_snapshot import compile_snapshot, load_snapshot  # noqa: E402
+from filtering import filter_businesses, sort_businesses  # noqa: E402
+from place_resolver import PlaceResolver  # noqa: E402
+from ranking import rank_cities  # noqa: E402
+from renderer import render_results  # noqa: E402
+from sensitivity import run_sensitivity  # noqa: E402
+from service import AnalysisService  # noqa: E402
+from spatial_index import SpatialIndex  # noqa: E402
+from sweeps import run_sweep  # noqa: E402
+from synthetic_data import generate_demographics, generate_industries, iter_businesses, place_count_for, write_dataset  # noqa: E402
+
+RESULTS_DIR = os.path.join(BASE_DIR, "results")
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+
+def run_stage(name, func, stages, trace_memory=True):
+    """Run func once, record wall time and peak traced memory under stages[name]."""
+    own_trace = trace_memory and not tracemalloc.is_tracing()
+    if own_trace:  # scenarios: trace the stage only, not its (large) setup
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # keep [DEBUG] / dashboard output out of timings
+        result = func()
+    seconds = time.perf_counter() - start
+    stages[name] = {"seconds": round(seconds, 6)}
+    if trace_memory:
+        stages[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - before
+    if own_trace:
+        tracemalloc.stop()
+    return result
+
+
+def benchmark_size(size, trace_memory=True, seed=0, data_dir=DATA_DIR):
+    paths = write_dataset(size, data_dir, seed)
+    industry_data = fetch_industry_data(paths["industry"])
+
+    if trace_memory:
+        tracemalloc.start()
+    stages = {}
+    try:
+        businesses = run_stage("load_business", lambda: fetch_business_data(paths["business"]),
+                               stages, trace_memory)
+        demographics = run_stage("load_demographic", lambda: fetch_demographic_data(paths["demographic"]),
+                                 stages, trace_memory)
+
+        # Query: a common industry across the five largest places
+        biggest = sorted(demographics, key=lambda c: demographics[c]["population"], reverse=True)[:5]
+        filters = {"industry": "cafes", "cities": biggest, "sort_by": "business_name", "num_to_display": 25}
+
+        filtered = run_stage("filter", lambda: filter_businesses(businesses, filters), stages, trace_memory)
+        sorted_list = run_stage("sort", lambda: sort_businesses(filtered, filters), stages, trace_memory)
+        # API-shaped rows (revenue=None) sort after the ones with revenue
+        run_stage("sort_revenue", lambda: sort_businesses(filtered, dict(filters, sort_by="revenue")),
+                  stages, trace_memory)
+        analysis = run_stage(
+            "analyze",
+            lambda: analyze_market(filtered, demographics, filters, industry_data["cafes"]),
+            stages, trace_memory
+        )
+        run_stage("render", lambda: render_results(sorted_list[:filters["num_to_display"]], analysis),
+                  stages, trace_memory)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        "size": size,
+        "businesses": len(businesses),
+        "places": len(demographics),
+        "filtered": len(filtered),
+        "stages": stages,
+    }
+
+
+# ======================
+# SCENARIOS
+# ======================
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Decorator: fn(stages, trace_memory, scale) times its workload (sized by scale) with run_stage."""
+    def decorator(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return decorator
+
+
+def synthetic_market(n, seed=0):
+    """(businesses list, demographics, industries) of n synthetic businesses, in memory."""
+    places = generate_demographics(place_count_for(n), seed)
+    industries = generate_industries(seed)
+    return list(iter_businesses(n, places, industries, seed)), places, industries
+
+
+def scaled(n, scale):
+    return max(1, int(n * scale))
+
+
+def largest_places(places, k):
+    return sorted(places, key=lambda c: places[c]["population"], reverse=True)[:k]
+
+
+@contextlib.contextmanager
+def offline_apis():
+    """Fake API keys + a throwaway response cache, so every request reaches the fake server."""
+    keys, cache_dir = data_sources.fetch_API_Keys, data_storage.CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        data_sources.fetch_API_Keys = lambda: {"google_maps_api_key": "bench", "Census_API_Key": ""}
+        data_storage.CACHE_DIR = tmp
+        data_storage.clear_memory_cache()
+        try:
+            yield
+        finally:
+            data_storage.clear_memory_cache()  # flushes pending writes while CACHE_DIR is still tmp
+            data_sources.fetch_API_Keys, data_storage.CACHE_DIR = keys, cache_dir
+
+
+@scenario("places_concurrent")
+def bench_places_concurrent(stages, trace_memory, scale=1.0):
+    cities = [f"City{i}" for i in range(scaled(30, scale))]
+    with offline_apis(), transport.FakeApiServer(latency=0.2, places_per_query=20) as fake:
+        run_stage("places_concurrent",
+                  lambda: data_sources.fetch_business_api("cafes", cities, max_workers=30, url=fake.places_url),
+                  stages, trace_memory)
+
+
+@scenario("census_nationwide")
+def bench_census_nationwide(stages, trace_memory, scale=1.0):
+    states = ["49", "06", "17", "29", "48", "36", "12", "13"][:scaled(8, scale)]
+    with offline_apis(), transport.FakeApiServer(latency=0.1) as fake:
+        run_stage("census_nationwide",
+                  lambda: data_sources.fetch_demographic_nationwide(states, max_workers=8, base_url=fake.census_url),
+                  stages, trace_memory)
+
+
+@scenario("index_query")
+def bench_index_query(stages, trace_memory, scale=1.0):
+    businesses, places, _ = synthetic_market(scaled(200_000, scale))
+    index = BusinessIndex(businesses)
+    filters = {"industry": "Cafes", "cities": largest_places(places, 2), "sort_by": "revenue"}
+
+    def queries():
+        for _ in range(100):
+            sort_businesses(filter_businesses(index, filters), filters)
+    run_stage("index_query", queries, stages, trace_memory)
+
+
+@scenario("snapshot_open")
+def bench_snapshot_open(stages, trace_memory, scale=1.0):
+    n = scaled(200_000, scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "places.mdsnap")
+        compile_snapshot({f"place {i}": {"population": i, "avg_income": 50000} for i in range(n)}, path)
+
+        def open_and_lookup():
+            for _ in range(20):
+                with load_snapshot(path) as snap:
+                    snap[f"place {n - 1}"]
+        open_and_lookup()  # warm the page cache
+        run_stage("snapshot_open", open_and_lookup, stages, trace_memory)
+
+
+@scenario("rank_cities")
+def bench_rank_cities(stages, trace_memory, scale=1.0):
+    places, industries = generate_demographics(scaled(5000, scale)), generate_industries()
+    businesses = list(iter_businesses(scaled(50_000, scale), places, industries))
+    run_stage("rank_cities",
+              lambda: rank_cities(businesses, places, "cafes", industries["cafes"], k=25, min_population=20_000),
+              stages, trace_memory)
+
+
+@contextlib.contextmanager
+def running_service(**options):
+    """AnalysisService on a free local port, served from a background event loop; yields its URL."""
+    service = AnalysisService(**options)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(service.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    finally:
+        async def shutdown():
+            await service.stop()
+            server.close()
+            await server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+
+@scenario("service_analyze")
+def bench_service_analyze(stages, trace_memory, scale=1.0):
+    query = {"industry": "cafes", "cities": ["Provo", "Salt Lake City"], "sort_by": "revenue", "limit": 3}
+
+    def client(n):
+        session = requests.Session()
+        for _ in range(n):
+            session.post(f"{url}/analyze", json=query).raise_for_status()
+
+    with contextlib.redirect_stderr(io.StringIO()), running_service(refresh_interval=0.2) as url:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            run_stage("service_analyze", lambda: list(pool.map(client, [scaled(40, scale)] * 8)),
+                      stages, trace_memory)
+
+
+@scenario("spatial_radius")
+def bench_spatial_radius(stages, trace_memory, scale=1.0):
+    rng = random.Random(9)
+    origin = (40.2338, -111.6585)
+    index = SpatialIndex([
+        {"business_name": f"b{i}", "lat": origin[0] + rng.uniform(-1.5, 1.5), "lon": origin[1] + rng.uniform(-1.5, 1.5)}
+        for i in range(scaled(200_000, scale))
+    ])
+
+    def queries():
+        for _ in range(20):
+            index.within(*origin, radius_km=10)
+    run_stage("spatial_radius", queries, stages, trace_memory)
+
+
+@scenario("resolve_places")
+def bench_resolve_places(stages, trace_memory, scale=1.0):
+    rng = random.Random(2)
+    names = [f"Place {i}" for i in range(2000)]
+    column = [rng.choice(names) + rng.choice(["", " city", " CDP"]) for _ in range(scaled(300_000, scale))]
+    run_stage("resolve_places", lambda: PlaceResolver().resolve_many(column), stages, trace_memory)
+
+
+@scenario("sweep")
+def bench_sweep(stages, trace_memory, scale=1.0):
+    places, industries = generate_demographics(scaled(400, scale)), generate_industries()
+    businesses = list(iter_businesses(20_000, places, industries))
+    run_stage("sweep", lambda: sum(1 for _ in run_sweep(businesses, places, industries, max_window=5, workers=1)),
+              stages, trace_memory)
+
+
+@scenario("sensitivity")
+def bench_sensitivity(stages, trace_memory, scale=1.0):
+    businesses, places, industries = synthetic_market(10_000)
+    filters = {"industry": "cafes", "cities": largest_places(places, 3)}
+    filtered = filter_businesses(businesses, filters)
+    run_stage("sensitivity",
+              lambda: run_sensitivity(filtered, places, filters, industries["cafes"],
+                                      n_draws=scaled(100_000, scale), seed=1),
+              stages, trace_memory)
+
+
+def benchmark_scenarios(names=None, trace_memory=True, scale=1.0):
+    """Run the named scenarios (all by default) as one "scenarios" run; scale < 1 shrinks the workloads."""
+    stages = {}
+    for name in names or SCENARIOS:
+        SCENARIOS[name](stages, trace_memory, scale)
+    return {"size": "scenarios", "stages": stages}
+
+
+def compare_results(current, baseline, tolerance=0.25):
+    """List of regressions: stages whose time or peak memory grew by more than tolerance."""
+    old_runs = {r["size"]: r for r in baseline.get("runs", [])}
+    regressions = []
+    for run in current.get("runs", []):
+        old = old_runs.get(run["size"])
+        if not old:
+            continue
+        for stage, numbers in run["stages"].items():
+            old_numbers = old["stages"].get(stage, {})
+            for metric in ("seconds", "peak_bytes"):
+                new_value, old_value = numbers.get(metric), old_numbers.get(metric)
+                if new_value is None or not old_value:
+                    continue
+                if new_value > old_value * (1 + tolerance):
+                    regressions.append({
+                        "size": run["size"],
+                        "stage": stage,
+                        "metric": metric,
+                        "baseline": old_value,
+                        "current": new_value,
+                        "change": round(new_value / old_value - 1, 3),
+                    })
+    return regressions
+
+
+def save_results(report, out_dir=RESULTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(out_dir, f"{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_report(report):
+    for run in report["runs"]:
+        if run["size"] == "scenarios":
+            print("\n=== scenarios ===")
+        else:
+            print(f"\n=== {run['size']} businesses ({run['places']} places, {run['filtered']} matched) ===")
+        for stage, numbers in run["stages"].items():
+            peak = numbers.get("peak_bytes")
+            peak_str = f"{peak / 1_048_576:10.1f} MiB" if peak is not None else ""
+            print(f"{stage:<18} {numbers['seconds']:10.4f}s {peak_str}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Market Demand Analyzer pipeline.")
+    parser.add_argument("sizes", nargs="*", default=["1k", "100k"], help="1k, 100k, 1m, 10m or a number")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster at 10m)")
+    parser.add_argument("--no-scenarios", action="store_true", help="skip the fixed feature scenarios")
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [benchmark_size(size, trace_memory=not args.no_memory) for size in args.sizes],
+    }
+    if not args.no_scenarios:
+        report["runs"].append(benchmark_scenarios(trace_memory=not args.no_memory))
+    print_report(report)
+    print(f"\nSaved: {save_results(report, args.out)}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare_results(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"⚠️ REGRESSION {r['size']} {r['stage']} {r['metric']}: "
+                  f"{r['baseline']} -> {r['current']} (+{r['change']:.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# synthetic_data.py
+"""
+Reproducible synthetic datasets in the repo's JSON schemas:
+  businesses   -> sample_business_data.json   (list of business dicts)
+  demographics -> sample_demographic_data.json ({place: {population, avg_income}})
+  industries   -> industry_data.json          ({industry: params})
+
+Usage:
+  python benchmarks/synthetic_data.py 100k --out benchmarks/data
+"""
+import argparse
+import json
+import os
+import random
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DATA_DIR = os.path.join(BASE_DIR, "..", "marketdemand", "data")
+
+SIZES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+NAME_PREFIXES = ["Summit", "Peak", "Canyon", "Desert", "Wasatch", "River", "Pioneer", "Beehive",
+                 "Granite", "Valley", "Cedar", "Aspen", "Redrock", "Liberty", "Union", "Main Street"]
+PLACE_ROOTS = ["Spring", "Cedar", "Oak", "River", "Lake", "Mill", "Green", "Fair", "Rock", "Clear",
+               "Pine", "Maple", "Salem", "Union", "Franklin", "Madison", "Clinton", "Georgetown"]
+PLACE_SUFFIXES = ["field", "ville", "ton", " Falls", " Heights", " Springs", "dale", "wood", " City", "port"]
+
+
+def parse_size(size):
+    """'100k' / '1m' / '2500' -> int"""
+    key = str(size).lower()
+    if key in SIZES:
+        return SIZES[key]
+    return int(key.replace("_", ""))
+
+
+def place_count_for(n_businesses):
+    """Roughly one place per 300 businesses, capped at ~US place count."""
+    return max(50, min(30_000, n_businesses // 300))
+
+
+def generate_demographics(n_places, seed=0):
+    rng = random.Random(seed)
+    data = {}
+    i = 0
+    while len(data) < n_places:
+        root = PLACE_ROOTS[i % len(PLACE_ROOTS)]
+        suffix = PLACE_SUFFIXES[(i // len(PLACE_ROOTS)) % len(PLACE_SUFFIXES)]
+        name = f"{root}{suffix}"
+        if name in data:
+            name = f"{name} {i}"
+        # heavy-tailed populations like real places
+        population = int(min(8_000_000, rng.paretovariate(1.2) * 800))
+        data[name] = {"population": population, "avg_income": rng.randint(28_000, 160_000)}
+        i += 1
+    return data
+
+
+def generate_industries(seed=0):
+    """The repo's real industries plus synthetic ones so the matrix isn't tiny."""
+    rng = random.Random(seed)
+    with open(os.path.join(REPO_DATA_DIR, "industry_data.json"), "r") as f:
+        industries = json.load(f)
+    for i in range(20):
+        industries[f"synthetic industry {i}"] = {
+            "ideal_ppb": rng.choice([1500, 2000, 5000, 8000, 15000, 30000]),
+            "spend_per_capita": rng.randint(40, 1500),
+            "tam_weight": round(rng.uniform(0.4, 0.7), 2),
+            "income_elasticity": round(rng.uniform(0.9, 1.3), 2),
+        }
+    return industries
+
+
+def iter_businesses(n, places, industries, seed=0):
+    """Yield n business dicts; bigger places get more businesses."""
+    rng = random.Random(seed)
+    place_names = list(places)
+    weights = [max(1, places[p]["population"]) for p in place_names]
+    industry_names = [k.title() for k in industries if k != "default"]
+    for i in range(n):
+        city = rng.choices(place_names, weights)[0]
+        yield {
+            "business_name": f"{rng.choice(NAME_PREFIXES)} {rng.choice(industry_names)} {i}",
+            "city": city,
+            "industry": rng.choice(industry_names),
+            # API-sourced rows have no revenue
+            "revenue": rng.randint(40_000, 2_000_000) if rng.random() < 0.7 else None,
+            "place_id": f"ChIJ{rng.getrandbits(120):030x}",
+            "rating": round(rng.uniform(1, 5), 1) if rng.random() < 0.9 else None,
+            "user_ratings_total": rng.randint(0, 4000),
+        }
+
+
+def write_dataset(size, out_dir, seed=0):
+    """
+    Write the three JSON files for `size` businesses into out_dir.
+    Businesses are streamed to disk, so 10M rows never sit in memory.
+    Returns {"business": path, "demographic": path, "industry": path}.
+    """
+    n = parse_size(size)
+    os.makedirs(out_dir, exist_ok=True)
+    places = generate_demographics(place_count_for(n), seed)
+    industries = generate_industries(seed)
+
+    paths = {
+        "business": os.path.join(out_dir, f"business_{size}.json"),
+        "demographic": os.path.join(out_dir, f"demographic_{size}.json"),
+        "industry": os.path.join(out_dir, f"industry_{size}.json"),
+    }
+    with open(paths["demographic"], "w") as f:
+        json.dump(places, f)
+    with open(paths["industry"], "w") as f:
+        json.dump(industries, f, indent=2)
+    with open(paths["business"], "w") as f:
+        f.write("[\n")
+        for i, b in enumerate(iter_businesses(n, places, industries, seed)):
+            f.write((",\n" if i else "") + json.dumps(b))
+        f.write("\n]\n")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Market Demand Analyzer datasets.")
+    parser.add_argument("sizes", nargs="+", help="1k, 100k, 1m, 10m or a plain number")
+    parser.add_argument("--out", default=os.path.join(BASE_DIR, "data"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for size in args.sizes:
+        paths = write_dataset(size, args.out, args.seed)
+        print(f"{size}: {paths['business']}")
+
+
+if __name__ == "__main__":
+    main()
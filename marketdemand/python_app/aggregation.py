@@ -0,0 +1,151 @@
+# aggregation.py
+import math
+
+
+class RevenueSketch:
+    """
+    Constant-memory revenue distribution: a log-bucketed histogram.
+    Quantiles come back within ±relative_accuracy of a true value, sketches
+    with the same accuracy merge by adding counts, and values can be
+    removed again (needed for incremental market updates).
+    Values <= 0 share a single zero bucket.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins = {}        # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+
+    def _bucket(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def add(self, value, n=1):
+        if value <= 0:
+            self.zero_count += n
+        else:
+            k = self._bucket(value)
+            self.bins[k] = self.bins.get(k, 0) + n
+        self.count += n
+
+    def remove(self, value, n=1):
+        if value <= 0:
+            self.zero_count -= n
+        else:
+            k = self._bucket(value)
+            left = self.bins.get(k, 0) - n
+            if left > 0:
+                self.bins[k] = left
+            else:
+                self.bins.pop(k, None)
+        self.count -= n
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy.")
+        for k, n in other.bins.items():
+            self.bins[k] = self.bins.get(k, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Approximate q-quantile (0..1); NaN when empty."""
+        if self.count <= 0:
+            return float("nan")
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if rank < seen:
+                # bucket midpoint (relative error <= relative_accuracy)
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+class BusinessAccumulator:
+    """
+    Single pass over businesses (any iterable, e.g. a generator reading a
+    file) collecting everything analyze_market needs:
+      count, revenue sum, revenue coverage and revenue distribution stats.
+    Revenue is summed in arrival order with a compensation term
+    (Neumaier), so long add / remove sequences (MarketState) don't drift;
+    integer revenues sum exactly, same as calculate_current_revenue.
+    track_distribution=False skips the sketch when only totals are needed.
+    """
+
+    def __init__(self, relative_accuracy=0.01, track_distribution=True):
+        self.count = 0
+        self._sum = 0
+        self._comp = 0              # low-order bits lost by _sum
+        self.revenue_n = 0          # businesses with numeric revenue
+        self.revenue_positive = 0   # businesses with revenue > 0 (coverage)
+        self.sketch = RevenueSketch(relative_accuracy) if track_distribution else None
+
+    def add(self, business):
+        self.count += 1
+        rev = business.get("revenue")
+        if rev is not None:
+            self._add_revenue(rev)
+            self.revenue_n += 1
+            if rev > 0:
+                self.revenue_positive += 1
+            if self.sketch is not None:
+                self.sketch.add(rev)
+
+    def remove(self, business):
+        """Undo add(business) (pass the same record / revenue that was added)."""
+        self.count -= 1
+        rev = business.get("revenue")
+        if rev is not None:
+            self._add_revenue(-rev)
+            self.revenue_n -= 1
+            if rev > 0:
+                self.revenue_positive -= 1
+            if self.sketch is not None:
+                self.sketch.remove(rev)
+
+    def _add_revenue(self, x):
+        total = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._comp += (self._sum - total) + x
+        else:
+            self._comp += (x - total) + self._sum
+        self._sum = total
+
+    @property
+    def revenue_sum(self):
+        return self._sum + self._comp
+
+    def add_all(self, businesses):
+        for b in businesses:
+            self.add(b)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self._add_revenue(other._sum)
+        self._comp += other._comp
+        self.revenue_n += other.revenue_n
+        self.revenue_positive += other.revenue_positive
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        else:
+            self.sketch = None
+        return self
+
+    @property
+    def revenue_coverage(self):
+        return (self.revenue_positive / self.count) if self.count else 0.0
+
+    def stats(self):
+        """Same keys as analyzer.business_stats_df (median is approximate)."""
+        return {
+            "average_revenue": (self.revenue_sum / self.revenue_n) if self.revenue_n else float("nan"),
+            "median_revenue": self.sketch.quantile(0.5) if self.sketch is not None else float("nan"),
+            "count": self.count
+        }
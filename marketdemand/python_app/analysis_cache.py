@@ -0,0 +1,201 @@
+# analysis_cache.py
+"""
+LRU memoization for analyze_market.
+
+Key = canonical query (industry, sorted normalized cities, dynamic SPC,
+streaming mode, industry params) + fingerprints of the data it reads:
+  businesses   -> BusinessIndex selection: index token (identity +
+                  version, O(1)) + buckets; tables: count + revenue
+                  column, hashed once per table (tables are immutable);
+                  lists: count + revenues, hashed on every call
+  demographics -> PlaceResolver / snapshot: dataset token; dicts: the
+                  requested places' entries (whole table if none),
+                  hashed on every call
+  industry     -> the params dict
+so a changed dataset (edited in place or not) produces a new key and old
+results simply age out of the LRU. Hits skip the whole pipeline, pandas
+stats_dif included.
+
+  from analysis_cache import memoized_analyze_market
+  results = memoized_analyze_market(filtered, population, filters, params)
+  analysis_cache.default_cache.stats()   # {"hits", "misses", "evictions", "size", "max_entries"}
+"""
+import hashlib
+import itertools
+import json
+import threading
+import weakref
+from collections import OrderedDict
+
+import instrumentation as instr
+from analyzer import analyze_market, place_lookup
+from business_index import BusinessSelection
+from business_table import BusinessTable
+from place_resolver import lookup_place
+
+DEFAULT_MAX_ENTRIES = 512
+
+_tokens = {}                 # id(dataset object) -> token, dropped when the object dies
+_next_token = itertools.count(1)
+_table_hashes = weakref.WeakKeyDictionary()  # BusinessTable -> hash (no mutators, so never stale)
+_token_lock = threading.Lock()
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else repr(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def dataset_token(data):
+    """
+    (identity, version) of a dataset object built at load time, or None for
+    objects that can't be weakly referenced (plain lists / dicts). The
+    version attribute, where present, changes when the object is mutated.
+    """
+    try:
+        weakref.ref(data)
+    except TypeError:
+        return None
+    key = id(data)
+    with _token_lock:
+        token = _tokens.get(key)
+        if token is None:
+            token = _tokens[key] = next(_next_token)
+            weakref.finalize(data, _tokens.pop, key, None)
+    return ("token", token, getattr(data, "version", 0))
+
+
+def _table_hash(table):
+    """Revenue-column hash of a BusinessTable, computed once per table."""
+    with _token_lock:
+        digest = _table_hashes.get(table)
+    if digest is None:
+        values, missing = table.numeric("revenue")
+        digest = _digest(len(table), values.tobytes(), missing.tobytes())
+        with _token_lock:
+            _table_hashes[table] = digest
+    return digest
+
+
+def business_fingerprint(business_data):
+    """Fingerprint of what analyze_market reads from businesses (None if it can't be re-read)."""
+    if isinstance(business_data, BusinessSelection):
+        buckets = business_data.buckets
+        return (dataset_token(business_data.index), len(business_data),
+                None if buckets is None else tuple(buckets))
+    if isinstance(business_data, BusinessTable):
+        # filtered tables are new objects per query: hash the columns (vectorized)
+        return _table_hash(business_data)
+    if isinstance(business_data, (list, tuple)):
+        # rows can be edited in place: no identity memo, hash what is there now
+        return _digest(len(business_data), [b.get("revenue") for b in business_data])
+    return None  # generators / file streams: walked once, never cached
+
+
+def demographic_fingerprint(population_data, cities):
+    """Fingerprint of the demographic entries the query touches."""
+    token = dataset_token(population_data)
+    if token is not None:
+        return token
+    if not cities:
+        by_lower = place_lookup(population_data)
+        return _digest(sorted((k, sorted(v.items())) for k, v in by_lower.items()))
+    keys = sorted((c or "").strip().lower() for c in cities)
+    entries = [population_data.get(k) for k in keys]
+    if any(e is None for e in entries):
+        # keys not stored normalized, alias spellings (or missing places): use the full lookup
+        by_lower = place_lookup(population_data)
+        entries = [lookup_place(by_lower, k) for k in keys]
+    return _digest([sorted(e.items()) if e is not None else None for e in entries])
+
+
+def query_key(filters, industry_params, USE_DYNAMIC_SPC, streaming):
+    """Canonical query: normalized + sorted cities (repeats kept), normalized industry."""
+    cities = tuple(sorted((c or "").strip().lower() for c in filters["cities"]))
+    industry = (filters.get("industry") or "").strip().lower()
+    params = json.dumps(industry_params, sort_keys=True, default=str)
+    return (industry, cities, bool(USE_DYNAMIC_SPC), bool(streaming), params)
+
+
+class AnalysisCache:
+    """Thread-safe LRU of analyze_market results with hit / miss counters."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def analyze(self, business_data, population_data, filters, industry_params,
+                USE_DYNAMIC_SPC=True, streaming=None):
+        """analyze_market, answered from the cache when query + data are unchanged."""
+        if streaming is None:
+            streaming = not isinstance(business_data, (list, tuple, BusinessTable))
+        biz_print = business_fingerprint(business_data)
+        if biz_print is None:
+            return analyze_market(business_data, population_data, filters, industry_params,
+                                  USE_DYNAMIC_SPC, streaming)
+
+        key = (
+            query_key(filters, industry_params, USE_DYNAMIC_SPC, streaming),
+            biz_print,
+            demographic_fingerprint(population_data, filters["cities"]),
+        )
+        with self._lock:
+            results = self._entries.get(key)
+            if results is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if results is not None:
+            instr.count("memo.analyze.hit")
+            return _copy_results(results)
+
+        instr.count("memo.analyze.miss")
+        results = analyze_market(business_data, population_data, filters, industry_params,
+                                 USE_DYNAMIC_SPC, streaming)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = _copy_results(results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def _copy_results(results):
+    """Callers may edit their result dict; the cached one must stay intact."""
+    copied = dict(results)
+    if isinstance(copied.get("stats_dif"), dict):
+        copied["stats_dif"] = dict(copied["stats_dif"])
+    return copied
+
+
+default_cache = AnalysisCache()
+
+
+def memoized_analyze_market(business_data, population_data, filters, industry_params,
+                            USE_DYNAMIC_SPC=True, streaming=None):
+    """analyze_market through the process-wide default_cache."""
+    return default_cache.analyze(business_data, population_data, filters, industry_params,
+                                 USE_DYNAMIC_SPC, streaming)
@@ -1,12 +1,20 @@
 # analyzer.py
-import math
-import pandas as pd
+import numpy as np
 
+import instrumentation as instr
+from aggregation import BusinessAccumulator
+from business_table import BusinessTable
+from place_resolver import lookup_place
 
-def analyze_market(business_data, population_data, filters, industry_params, USE_DYNAMIC_SPC = True):
+BENCHMARK_INCOME = 60000  # Utah/US baseline for dynamic SPC
+
+
+@instr.timed("analyze")
+def analyze_market(business_data, population_data, filters, industry_params, USE_DYNAMIC_SPC = True, streaming = None):
     """
     Main market analysis pipeline.
-    business_data: filtered businesses (list of dicts)
+    business_data: filtered businesses (list of dicts, BusinessTable, or any
+                   iterable / generator of dicts)
     population_data: dict {city: population}
     filters: contains industry + list of cities
     industry_params: dict:
@@ -16,47 +24,106 @@ def analyze_market(business_data, population_data, filters, industry_params, USE
           "tam_weight": float,
           "rev_weight": float (optional)
         }
+    streaming: walk business_data exactly once in constant memory
+               (default: on for anything that isn't a list / tuple / table);
+               stats_dif median is then approximate (±1%)
     """
-    print(f"[MODEL] v0.4 | Census Demographics | Dynamic SPC {'ON' if USE_DYNAMIC_SPC else 'OFF'}")
+    instr.log("[MODEL] v0.4 | Census Demographics | Dynamic SPC {}", "ON" if USE_DYNAMIC_SPC else "OFF")
+
+    # Generators / file readers can only be walked once -> streaming mode
+    if streaming is None:
+        streaming = not isinstance(business_data, (list, tuple, BusinessTable))
+
+    # --- One pass: count, revenue sum, coverage (API businesses often have revenue=None) ---
+    with instr.span("analyze.accumulate"):
+        if isinstance(business_data, BusinessTable):
+            rev_count, current_rev = business_data.revenue_stats()
+            biz_count = len(business_data)
+            revenue_coverage = (rev_count / biz_count) if biz_count else 0.0
+            accumulator = None
+        else:
+            accumulator = BusinessAccumulator(track_distribution=streaming).add_all(business_data)
+            biz_count = accumulator.count
+            current_rev = accumulator.revenue_sum
+            revenue_coverage = accumulator.revenue_coverage
+    instr.count("analyze.businesses", biz_count)
 
-    # pre test for bad data
-    debug_selected_pop = aggregate_population(population_data, filters["cities"])
-    print(
-        f"[DEBUG] Industry={filters['industry']}, "
-        f"Cities={filters['cities']}, "
-        f"Businesses={len(business_data)}, "
-        f"SelectedPopulation={debug_selected_pop}"
-    )
-
-    # Extract industry parameters
-    ideal_ppb = industry_params["ideal_ppb"]
-    tam_weight = industry_params.get("tam_weight", 0.5)
-    # --- Revenue coverage check (API businesses often have revenue=None) ---
-    rev_values = [
-        b.get("revenue")
-        for b in business_data
-        if isinstance(b.get("revenue"), (int, float)) and b.get("revenue") > 0
-    ]
-    revenue_coverage = (len(rev_values) / len(business_data)) if business_data else 0.0
-
-    if revenue_coverage < 0.2:  # threshold: 20% of businesses have revenue
-        print(f"[INFO] Revenue coverage {revenue_coverage:.0%} — disabling revenue weighting.")
-        rev_weight = 0.0
     # ------------------------------------
     # 1. Aggregate population for selected cities
     # ------------------------------------
     cities = filters["cities"]
-    total_population = aggregate_population(population_data, cities)
-    weighted_income = aggregate_income(population_data, cities)
-    print(f"[DEBUG] Weighted Avg Income: ${weighted_income:,.2f}") # to debug
+    with instr.span("analyze.demographics"):
+        by_lower = place_lookup(population_data)
+        total_population = aggregate_population(population_data, cities, by_lower=by_lower)
+        weighted_income = aggregate_income(population_data, cities, by_lower=by_lower)
+    # pre test for bad data
+    instr.log(
+        "[DEBUG] Industry={}, Cities={}, Businesses={}, SelectedPopulation={}",
+        filters["industry"], filters["cities"], biz_count, total_population
+    )
+    if revenue_coverage < 0.2:  # threshold: 20% of businesses have revenue
+        instr.log("[INFO] Revenue coverage {:.0%} — disabling revenue weighting.", revenue_coverage)
+    instr.log("[DEBUG] Weighted Avg Income: ${:,.2f}", weighted_income) # to debug
     if total_population == 0:
         print("⚠️  Missing or zero population data — TAM may be inaccurate.")
     if total_population is None:
         print("⚠️  total_population returned None from aggregate_population()")
     # ------------------------------------
+    # 2–8. Score the aggregates
+    # ------------------------------------
+    with instr.span("analyze.score"):
+        results = score_market(
+            total_population=total_population,
+            weighted_income=weighted_income,
+            biz_count=biz_count,
+            current_rev=current_rev,
+            revenue_coverage=revenue_coverage,
+            industry_params=industry_params,
+            USE_DYNAMIC_SPC=USE_DYNAMIC_SPC
+        )
+    instr.log(
+        "[DEBUG] SPC used: {:.2f} (base={}, elasticity={})",
+        results["spend_per_capita"], industry_params["spend_per_capita"],
+        industry_params.get("income_elasticity", 1.0)
+    )
+    # ------------------------------------
+    # 9. Do something with pandas so I get full credit as a "data analysis project" (in case it doesn't already count)
+    # ------------------------------------
+    # (streaming mode uses the accumulator's constant-memory stats instead)
+    with instr.span("analyze.stats"):
+        if streaming and accumulator is not None:
+            results["stats_dif"] = accumulator.stats()
+        else:
+            results["stats_dif"] = business_stats_df(business_data)
+    # ------------------------------------
+    # 10. Return all computed values
+    # ------------------------------------
+    return results
+
+
+def score_market(
+    total_population,
+    weighted_income,
+    biz_count,
+    current_rev,
+    revenue_coverage,
+    industry_params,
+    USE_DYNAMIC_SPC=True
+):
+    """
+    Score one market from its aggregates (no printing, no business rows).
+    Shared by analyze_market and the batch / incremental scorers so every
+    path produces the same numbers.
+    """
+    # Extract industry parameters
+    ideal_ppb = industry_params["ideal_ppb"]
+    tam_weight = industry_params.get("tam_weight", 0.5)
+    rev_weight = industry_params.get("rev_weight", 0.2)
+    if revenue_coverage < 0.2:  # threshold: 20% of businesses have revenue
+        rev_weight = 0.0
+    # ------------------------------------
     # 2. Compute real people per business
     # ------------------------------------
-    biz_count = len(business_data)
     real_ppb = calculate_real_ppb(total_population, biz_count)
     # ------------------------------------
     # 3. Compute spend per capita
@@ -69,18 +136,15 @@ def analyze_market(business_data, population_data, filters, industry_params, USE
                                                      weighted_income=weighted_income,
                                                      real_ppb=real_ppb,
                                                      ideal_ppb=ideal_ppb,
-                                                     # industry_key=filters["industry"],
-                                                     income_elasticity = income_elasticity
+                                                     income_elasticity = income_elasticity,
+                                                     benchmark_income = industry_params.get("benchmark_income", BENCHMARK_INCOME)
                                                      )
     else:
-        spend_per_capita = industry_params.get("spend_per_capita")
-    print(f"[DEBUG] SPC used: {spend_per_capita:.2f} (base={base_spend}, elasticity={income_elasticity})")
-
+        spend_per_capita = base_spend
     # ------------------------------------
     # 4. TAM calculations
     # ------------------------------------
     tam = calculate_tam(total_population, spend_per_capita)
-    current_rev = calculate_current_revenue(business_data)
     remaining_tam = calculate_remaining_tam(tam, current_rev)
     remaining_pct = calculate_remaining_tam_pct(remaining_tam, tam)
     # ------------------------------------
@@ -88,7 +152,6 @@ def analyze_market(business_data, population_data, filters, industry_params, USE
     # ------------------------------------
     competition_log = calculate_competition_score(real_ppb, ideal_ppb)
     competition_norm_0_100 = normalize_competition_to_0_100(competition_log)
-
     # ------------------------------------
     # 6. Revenue benchmarking
     # ------------------------------------
@@ -119,13 +182,7 @@ def analyze_market(business_data, population_data, filters, industry_params, USE
     # 8. Confidence score (0–100)
     # ------------------------------------
     confidence_score = calc_confidence_index(biz_count)
-    # ------------------------------------
-    # 9. Do something with pandas so I get full credit as a "data analysis project" (in case it doesn't already count)
-    # ------------------------------------
-    stats_dif = business_stats_df(business_data)
-    # ------------------------------------
-    # 10. Return all computed values
-    # ------------------------------------
+
     return {
         "tam": tam,
         "current_revenue": current_rev,
@@ -139,28 +196,46 @@ def analyze_market(business_data, population_data, filters, industry_params, USE
         "businesses": biz_count,
         "confidence_score": confidence_score,
         "weighted_income": weighted_income,
-        "stats_dif": stats_dif
+        "spend_per_capita": spend_per_capita
     }
 
 # ============================================================
 # POPULATION + BASIC MATH
 # ============================================================
 
-def aggregate_population(pop_data, cities):
-    """Sum population for selected cities (case-insensitive)."""
-    by_lower = {k.strip().lower(): v for k, v in pop_data.items()}
+def place_lookup(pop_data):
+    """Case-insensitive {city: {...}} lookup; build once and pass as by_lower."""
+    if getattr(pop_data, "normalized_keys", False):
+        return pop_data  # e.g. DemographicSnapshot: already case-insensitive
+    return {k.strip().lower(): v for k, v in pop_data.items()}
+
+
+def aggregate_population(pop_data, cities, by_lower=None):
+    """Sum population for selected cities (case-insensitive, Census / alias spellings matched)."""
+    if by_lower is None:
+        by_lower = place_lookup(pop_data)
     if not cities:
-        return sum(v.get("population", 0) for v in by_lower.values())
+        return sum(v["population"] for v in by_lower.values())
     total = 0
     for c in cities:
-        key = (c or "").strip().lower()
-        if key in by_lower:
-            total += by_lower[key].get("population", 0)
+        record = lookup_place(by_lower, c)
+        if record is not None:
+            total += record["population"]
 
     return total or 0  # Always return a number
 
 
 
+def count_businesses_by_city(business_data):
+    """Business count per city (keys as they appear in the data)."""
+    counts = {}
+    for b in business_data:
+        city = b.get("city") or ""
+        counts[city] = counts.get(city, 0) + 1
+    return counts
+
+
+
 def calculate_real_ppb(population, biz_count):
     """People per business. Handles divide-by-zero and None."""
     if not population:
@@ -178,10 +253,12 @@ def calculate_tam(population, spend_per_capita):
 
 def calculate_current_revenue(businesses):
     """Sum revenue across all businesses."""
+    if isinstance(businesses, BusinessTable):
+        return businesses.revenue_stats()[1]
     total = 0
     for b in businesses:
         rev = b.get("revenue")
-        if isinstance(rev, (int, float)):
+        if rev is not None:  # validated at load: a number or None
             total += rev
     return total
 
@@ -212,7 +289,8 @@ def calculate_competition_score(real_ppb, ideal_ppb):
     if ratio <= 0:
         return -10  # extreme crowding protection
 
-    return math.log(ratio, 2)
+    # NumPy kernels (not math) so batch_scoring matches bit-for-bit
+    return float(np.log2(ratio))
 
 
 def normalize_competition_to_0_100(log_score, low=-2.0, high=2.0):
@@ -275,7 +353,7 @@ def calc_confidence_index(biz_count):
     if biz_count <= 0:
         return 0
     # Logarithmic growth that flattens after ~10–15 businesses
-    confidence = (math.log1p(biz_count) / math.log1p(15)) * 100
+    confidence = (float(np.log1p(biz_count)) / float(np.log1p(15))) * 100
     # Cap at 100 just in case
     return min(100, confidence)
     
@@ -314,10 +392,11 @@ def calc_demand_score(
 
     return max(0.0, min(100.0, demand))
 
-def aggregate_income(pop_data, cities):
+def aggregate_income(pop_data, cities, by_lower=None):
     """Compute weighted average income for selected cities (case-insensitive)."""
     # Case-insensitive lookup
-    by_lower = {k.strip().lower(): v for k, v in pop_data.items()}
+    if by_lower is None:
+        by_lower = place_lookup(pop_data)
 
     # If no cities provided, compute across all
     if not cities:
@@ -328,20 +407,28 @@ def aggregate_income(pop_data, cities):
     total_pop = 0
     weighted_income = 0
     for c in cities:
-        key = (c or "").strip().lower()
-        if key in by_lower:
-            pop = by_lower[key].get("population", 0)
-            income = by_lower[key].get("avg_income", 0)
+        record = lookup_place(by_lower, c)
+        if record is not None:
+            pop = record["population"]
             total_pop += pop
-            weighted_income += income * pop
+            weighted_income += record["avg_income"] * pop
 
     return weighted_income / total_pop if total_pop else 0
 
 def business_stats_df(business_data):
-    df = pd.DataFrame(business_data)
+    # pandas is only imported when exact stats are actually requested (slow import)
+    import pandas as pd
+
+    if isinstance(business_data, BusinessTable):
+        values, missing = business_data.numeric("revenue")
+        df = pd.DataFrame({"revenue": np.where(missing, np.nan, values)})
+    else:
+        df = pd.DataFrame(business_data)
+    # no rows -> no "revenue" column at all
+    revenue = df["revenue"] if "revenue" in df else pd.Series(dtype=float)
     return {
-        "average_revenue": df["revenue"].mean(),
-        "median_revenue": df["revenue"].median(),
+        "average_revenue": revenue.mean(),
+        "median_revenue": revenue.median(),
         "count": len(df)
     }
 
@@ -350,17 +437,17 @@ def calc_dynamic_spend_per_capita(
     weighted_income,
     real_ppb,
     ideal_ppb,
-    income_elasticity
+    income_elasticity,
+    benchmark_income=BENCHMARK_INCOME
 ):
     """
     Dynamic SPC using constant elasticity income scaling 
     + competition pressure adjustment.
     """
     # 1. Income elasticity model
-    benchmark_income = 60000  # Utah/US baseline
     income_ratio = weighted_income / benchmark_income if weighted_income > 0 else 1.0
     # exponential income scaling
-    income_multiplier = income_ratio ** income_elasticity
+    income_multiplier = float(np.power(income_ratio, income_elasticity))
     # 2. Competition multiplier (simple & stable)
     if ideal_ppb > 0 and real_ppb > 0:
         ratio = real_ppb / ideal_ppb
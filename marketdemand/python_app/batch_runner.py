@@ -0,0 +1,213 @@
+# batch_runner.py
+"""
+Non-interactive batch mode: load the datasets once, run every query in a
+job file, write one JSON result per line.
+
+  python batch_runner.py jobs.jsonl --out results.jsonl --workers 4
+
+Job file: JSON lines (or one JSON array) of queries like
+  {"id": "q1", "industry": "cafes", "cities": ["Provo", "Orem"],
+   "sort_by": "revenue", "limit": 10, "dynamic_spc": true}
+Optional per query: "exact_stats": true (pandas median for stats_dif;
+otherwise the streaming accumulator stats are used and pandas never loads).
+Repeated queries over unchanged data are answered from analysis_cache.
+"""
+import argparse
+import contextlib
+import json
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import instrumentation as instr
+from analysis_cache import memoized_analyze_market
+from business_index import BusinessIndex
+from data_sources import fetch_business_data, get_demographic_data, get_industry_data, validate_data
+from filtering import filter_businesses, sort_businesses
+from place_resolver import PlaceResolver
+
+# Per-process datasets (set by load_datasets / the worker initializer)
+_datasets = None
+
+
+# ======================
+# JOBS
+# ======================
+def read_jobs(file_path):
+    """Queries from a JSON-lines file or a JSON array file."""
+    with open(file_path, "r") as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def int_option(options, name, default):
+    """options[name] as a non-negative int (ValueError naming the field otherwise)."""
+    value = options.get(name, default)
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = -1
+    if isinstance(value, bool) or number < 0:
+        raise ValueError(f"'{name}' must be a non-negative integer, got {value!r}")
+    return number
+
+
+def normalize_query(query, position):
+    """Job / request body -> query dict (ValueError for malformed fields)."""
+    limit_key = "limit" if "limit" in query else "num_to_display"
+    return {
+        "id": query.get("id", position),
+        "industry": (query.get("industry") or "").strip(),
+        "cities": [c.strip() for c in (query.get("cities") or [])],
+        "sort_by": query.get("sort_by", "business_name"),
+        "num_to_display": int_option(query, limit_key, 10),
+        "dynamic_spc": bool(query.get("dynamic_spc", True)),
+        "exact_stats": bool(query.get("exact_stats", False)),
+    }
+
+
+# ======================
+# DATA (loaded once)
+# ======================
+def build_datasets(business_file=None, demographic_source="file"):
+    """Load + index everything the queries need (no globals touched)."""
+    businesses = validate_data(fetch_business_data(business_file), "business")
+    population = get_demographic_data(source=demographic_source)
+    if not getattr(population, "normalized_keys", False):
+        population = PlaceResolver.from_population(population)  # alias table built once, not per query
+    return {
+        "businesses": BusinessIndex(businesses),
+        "population": population,
+        "industries": get_industry_data(),
+    }
+
+
+def load_datasets(business_file=None, demographic_source="file"):
+    """build_datasets once per process (loader messages go to stderr)."""
+    global _datasets
+    with contextlib.redirect_stdout(sys.stderr):
+        _datasets = build_datasets(business_file, demographic_source)
+    return _datasets
+
+
+def _init_worker(business_file, demographic_source):
+    load_datasets(business_file, demographic_source)
+
+
+# ======================
+# QUERIES
+# ======================
+def run_query(query, datasets=None):
+    """One query -> JSON-ready result dict (errors are reported per query)."""
+    datasets = datasets or _datasets
+    industry_key = query["industry"].lower()
+    if industry_key not in datasets["industries"]:
+        return {"id": query["id"], "error": f"Industry '{industry_key}' not found in industry_data.json."}
+
+    filters = {
+        "industry": query["industry"],
+        "cities": query["cities"],
+        "sort_by": query["sort_by"],
+        "num_to_display": query["num_to_display"],
+    }
+    filtered = filter_businesses(datasets["businesses"], filters)
+    top = sort_businesses(filtered, filters)[:filters["num_to_display"]]
+    analysis = memoized_analyze_market(
+        business_data=filtered,
+        population_data=datasets["population"],
+        filters=filters,
+        industry_params=datasets["industries"][industry_key],
+        USE_DYNAMIC_SPC=query["dynamic_spc"],
+        streaming=not query["exact_stats"]
+    )
+    return {
+        "id": query["id"],
+        "industry": query["industry"],
+        "cities": query["cities"],
+        "dynamic_spc": query["dynamic_spc"],
+        "analysis": _json_ready(analysis),
+        "businesses": _json_ready(list(top)),
+    }
+
+
+def _run_in_worker(query):
+    return run_query(query)
+
+
+def _json_ready(value):
+    """numpy / inf / NaN -> plain JSON values (inf and NaN become null)."""
+    if isinstance(value, dict):
+        return {k: _json_ready(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_ready(v) for v in value]
+    if hasattr(value, "item"):  # numpy scalar
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def run_batch(queries, business_file=None, demographic_source="file", workers=1):
+    """
+    Yield results in job order. workers > 1 uses a process pool whose
+    workers each load the datasets once (fork shares pages on Linux).
+    """
+    slots = []
+    for i, q in enumerate(queries):
+        try:
+            slots.append(normalize_query(q, i))
+        except ValueError as e:  # reported in place, like unknown industries
+            slots.append({"id": q.get("id", i), "error": str(e)})
+    results = _run_valid([q for q in slots if "error" not in q], business_file, demographic_source, workers)
+    for q in slots:
+        yield q if "error" in q else next(results)
+
+
+def _run_valid(queries, business_file, demographic_source, workers):
+    if workers <= 1:
+        datasets = load_datasets(business_file, demographic_source)
+        for q in queries:
+            yield run_query(q, datasets)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(business_file, demographic_source)
+    ) as pool:
+        chunksize = max(1, len(queries) // (workers * 4))
+        yield from pool.map(_run_in_worker, queries, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many market analyses from a job file.")
+    parser.add_argument("jobs", help="JSON lines (or JSON array) of queries")
+    parser.add_argument("--out", help="results file (JSON lines); default stdout")
+    parser.add_argument("--workers", type=int, default=1, help="parallel worker processes")
+    parser.add_argument("--business-file", help="business JSON file (default: sample data)")
+    parser.add_argument("--demographics", choices=["file", "api"], default="file")
+    parser.add_argument("--profile", help="write a timing profile (.json, or folded stacks otherwise)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        instr.reset()
+        instr.enable()
+    queries = read_jobs(args.jobs)
+    out = open(args.out, "w") if args.out else sys.stdout
+    try:
+        for result in run_batch(queries, args.business_file, args.demographics, args.workers):
+            instr.count("batch.queries")
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if args.out:
+            out.close()
+        if args.profile:
+            instr.disable()
+            instr.dump(args.profile)
+
+
+if __name__ == "__main__":
+    main()
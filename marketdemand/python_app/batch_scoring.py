@@ -0,0 +1,222 @@
+# batch_scoring.py
+import numpy as np
+
+from analyzer import BENCHMARK_INCOME
+from place_resolver import PLACES
+
+def score_markets_batch(
+    population,
+    weighted_income,
+    biz_count,
+    current_revenue,
+    revenue_count,
+    ideal_ppb,
+    spend_per_capita,
+    tam_weight=0.5,
+    rev_weight=0.2,
+    income_elasticity=1.0,
+    USE_DYNAMIC_SPC=True,
+    benchmark_income=BENCHMARK_INCOME
+):
+    """
+    Vectorized analyzer.score_market.
+    Every argument is a scalar or array; they are broadcast together, e.g.
+    per-city arrays of shape (n_cities,) against per-industry params of
+    shape (n_industries, 1) score the whole industry × city matrix at once.
+    revenue_count = businesses with revenue > 0 (for the coverage check).
+    Returns a dict of float arrays with the same keys as score_market.
+    Mirrors the scalar helpers branch-for-branch, so results are identical.
+    """
+    pop = np.asarray(population, dtype=float)
+    income = np.asarray(weighted_income, dtype=float)
+    count = np.asarray(biz_count, dtype=float)
+    current_rev = np.asarray(current_revenue, dtype=float)
+    rev_count = np.asarray(revenue_count, dtype=float)
+    ideal = np.asarray(ideal_ppb, dtype=float)
+    base_spend = np.asarray(spend_per_capita, dtype=float)
+    tam_w = np.asarray(tam_weight, dtype=float)
+    rev_w = np.asarray(rev_weight, dtype=float)
+    elasticity = np.asarray(income_elasticity, dtype=float)
+    benchmark = np.asarray(benchmark_income, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # Revenue coverage check
+        coverage = np.where(count > 0, rev_count / count, 0.0)
+        rev_w = np.where(coverage < 0.2, 0.0, rev_w)
+
+        # calculate_real_ppb
+        real_ppb = np.where(count == 0, np.inf, pop / count)
+
+        # calc_dynamic_spend_per_capita
+        if USE_DYNAMIC_SPC:
+            income_ratio = np.where(income > 0, income / benchmark, 1.0)
+            income_multiplier = np.power(income_ratio, elasticity)
+            has_ratio = (ideal > 0) & (real_ppb > 0)
+            comp_multiplier = np.where(
+                has_ratio,
+                np.clip(1 / (real_ppb / ideal), 0.6, 1.5),
+                1.0
+            )
+            spc = base_spend * income_multiplier * comp_multiplier
+        else:
+            spc = base_spend * 1.0
+
+        # TAM
+        tam = pop * spc
+        remaining_tam = np.maximum(0, tam - current_rev)
+        remaining_pct = np.where(tam <= 0, 0.0, remaining_tam / tam)
+
+        # calculate_competition_score / normalize_competition_to_0_100
+        ratio = real_ppb / ideal
+        competition_log = np.where(
+            ideal == 0,
+            np.inf,
+            np.where(ratio <= 0, -10.0, np.log2(ratio))
+        )
+        low, high = -2.0, 2.0
+        clamped = np.maximum(low, np.minimum(high, competition_log))
+        competition_norm = np.where(
+            competition_log == np.inf,
+            100.0,
+            ((clamped - low) / (high - low)) * 100.0
+        )
+
+        # Revenue benchmarking
+        ideal_business_count = pop / ideal
+        expected = np.where(
+            (ideal == 0) | (ideal_business_count <= 0),
+            0.0,
+            tam / ideal_business_count
+        )
+        actual = np.where(count == 0, 0.0, current_rev / count)
+        gap_pct = (expected - actual) / expected
+        rev_opp_score = np.where(
+            expected <= 0,
+            0.0,
+            np.where(gap_pct <= 0, 0.0, np.where(gap_pct >= 1, 100.0, gap_pct * 100))
+        )
+
+        # calc_demand_score
+        tam_score = np.maximum(0.0, np.minimum(100.0, remaining_pct * 100))
+        comp_score = np.maximum(0.0, np.minimum(100.0, competition_norm))
+        rev_score = np.maximum(0.0, np.minimum(100.0, rev_opp_score))
+        comp_w = np.maximum(0.0, 1.0 - tam_w - rev_w)
+        demand = (tam_w * tam_score) + (comp_w * comp_score) + (rev_w * rev_score)
+        demand_score = np.maximum(0.0, np.minimum(100.0, demand))
+
+        # calc_confidence_index
+        confidence = (np.log1p(count) / np.log1p(15)) * 100
+        confidence_score = np.where(count <= 0, 0.0, np.minimum(100, confidence))
+
+    shape = np.broadcast_shapes(
+        pop.shape, income.shape, count.shape, current_rev.shape, rev_count.shape,
+        ideal.shape, base_spend.shape, tam_w.shape, rev_w.shape, elasticity.shape, benchmark.shape
+    )
+    out = {
+        "tam": tam,
+        "current_revenue": current_rev,
+        "remaining_tam": remaining_tam,
+        "remaining_pct": remaining_pct,
+        "competition_score": competition_log,
+        "competition_norm": competition_norm,
+        "rev_opp_score": rev_opp_score,
+        "demand_score": demand_score,
+        "population": pop,
+        "businesses": count,
+        "confidence_score": confidence_score,
+        "weighted_income": income,
+        "spend_per_capita": spc,
+    }
+    return {k: np.broadcast_to(v, shape).astype(float) for k, v in out.items()}
+
+
+# ============================================================
+# INDUSTRY × CITY MATRIX
+# ============================================================
+
+def build_market_matrix(business_data, population_data, industry_data):
+    """
+    One pass over business_data -> per (industry, city) aggregates.
+    Rows follow industry_data keys, columns follow population_data keys;
+    matching is case-insensitive (industries) / by place ID (cities) like filter_businesses.
+    Businesses whose industry or city is unknown are skipped.
+    """
+    industries = list(industry_data.keys())
+    cities = list(population_data.keys())
+    ind_idx = {k.strip().lower(): i for i, k in enumerate(industries)}
+    city_idx = {PLACES.resolve(k): j for j, k in enumerate(cities)}
+
+    shape = (len(industries), len(cities))
+    biz_count = np.zeros(shape)
+    revenue_count = np.zeros(shape)
+    current_revenue = np.zeros(shape)
+
+    # Python accumulation keeps the scalar path's summation order exactly.
+    revenue_sums = {}
+    for b in business_data:
+        i = ind_idx.get((b.get("industry") or "").lower())
+        j = city_idx.get(PLACES.resolve(b.get("city")))
+        if i is None or j is None:
+            continue
+        biz_count[i, j] += 1
+        rev = b.get("revenue")
+        if rev is not None:
+            revenue_sums[(i, j)] = revenue_sums.get((i, j), 0) + rev
+            if rev > 0:
+                revenue_count[i, j] += 1
+    for (i, j), total in revenue_sums.items():
+        current_revenue[i, j] = total
+
+    population = np.array([v["population"] for v in population_data.values()], dtype=float)
+    income = np.array([v["avg_income"] for v in population_data.values()], dtype=float)
+    # Same expression as aggregate_income for a single city
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted_income = np.where(population > 0, (income * population) / population, 0.0)
+
+    return {
+        "industries": industries,
+        "cities": cities,
+        "population": population,
+        "weighted_income": weighted_income,
+        "biz_count": biz_count,
+        "current_revenue": current_revenue,
+        "revenue_count": revenue_count,
+    }
+
+
+def industry_param_arrays(industry_data, industries=None):
+    """Column vectors (n_industries, 1) of industry params, with score_market defaults."""
+    industries = industries if industries is not None else list(industry_data.keys())
+    params = [industry_data[k] for k in industries]
+    defaults = {"tam_weight": 0.5, "rev_weight": 0.2, "income_elasticity": 1.0,
+                "benchmark_income": BENCHMARK_INCOME}
+
+    columns = {}
+    for name in ("ideal_ppb", "spend_per_capita", "tam_weight", "rev_weight", "income_elasticity",
+                 "benchmark_income"):
+        values = [p[name] if name not in defaults else p.get(name, defaults[name]) for p in params]
+        columns[name] = np.array(values, dtype=float).reshape(-1, 1)
+    return columns
+
+
+def score_all_markets(business_data, population_data, industry_data, USE_DYNAMIC_SPC=True):
+    """
+    Score every industry against every city in one vectorized pass.
+    Cell [i, j] equals analyze_market for industry i with cities=[city j]
+    over the matching businesses.
+    Returns {"industries": [...], "cities": [...], <score field>: 2-D array}.
+    """
+    matrix = build_market_matrix(business_data, population_data, industry_data)
+    scores = score_markets_batch(
+        population=matrix["population"],
+        weighted_income=matrix["weighted_income"],
+        biz_count=matrix["biz_count"],
+        current_revenue=matrix["current_revenue"],
+        revenue_count=matrix["revenue_count"],
+        USE_DYNAMIC_SPC=USE_DYNAMIC_SPC,
+        **industry_param_arrays(industry_data, matrix["industries"])
+    )
+    scores["industries"] = matrix["industries"]
+    scores["cities"] = matrix["cities"]
+    return scores
+
@@ -0,0 +1,135 @@
+# business_index.py
+import heapq
+
+from place_resolver import PLACES
+from spatial_index import SpatialIndex
+
+# Sort fields supported by the index (same keys sort_businesses uses)
+SORT_FIELDS = ("business_name", "revenue", "industry")
+
+
+class BusinessSelection(list):
+    """
+    Result of BusinessIndex.filter: a plain list of business dicts that also
+    remembers which (industry, city) buckets it came from, so
+    sort_businesses can merge presorted buckets instead of re-sorting.
+    """
+
+    def __init__(self, rows, index, buckets):
+        super().__init__(rows)
+        self.index = index
+        self.buckets = buckets
+
+
+class BusinessIndex:
+    """
+    Build once at load time, query many times.
+
+    rows are bucketed by normalized industry -> city -> row IDs (ascending),
+    and every bucket also keeps its row IDs presorted for each SORT_FIELDS
+    entry, so filter = dict lookups + merge by row ID and
+    sort = merge of presorted buckets.
+    Normalization matches filter_businesses (industry lowercased, cities by place ID).
+    """
+
+    def __init__(self, business_data):
+        self.rows = list(business_data)
+        self._spatial = None
+        self.by_industry = {}  # industry -> {city place ID: [row ids]}
+        self.by_city = {}      # city place ID -> [industry keys having that city]
+
+        resolve = PLACES.resolve
+        for row_id, b in enumerate(self.rows):
+            industry = (b.get("industry") or "").lower()
+            city = resolve(b.get("city"))
+            cities = self.by_industry.setdefault(industry, {})
+            if city not in cities:
+                cities[city] = []
+                self.by_city.setdefault(city, []).append(industry)
+            cities[city].append(row_id)
+
+        # Global sort order + rank per field (stable, same keys as sort_businesses)
+        self.order = {}
+        self.rank = {}
+        for field in SORT_FIELDS:
+            order = self._sorted_ids(range(len(self.rows)), field)
+            rank = [0] * len(self.rows)
+            for position, row_id in enumerate(order):
+                rank[row_id] = position
+            self.order[field] = order
+            self.rank[field] = rank
+
+        # Per bucket presorted IDs: (industry, city) -> {field: [row ids]}
+        self.bucket_order = {}
+        for industry, cities in self.by_industry.items():
+            for city, ids in cities.items():
+                self.bucket_order[(industry, city)] = {
+                    field: sorted(ids, key=self.rank[field].__getitem__) for field in SORT_FIELDS
+                }
+
+    @property
+    def spatial(self):
+        """KD-tree over the rows' coordinates, built on first use."""
+        if self._spatial is None:
+            self._spatial = SpatialIndex(self.rows)
+        return self._spatial
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def _sorted_ids(self, ids, field):
+        rows = self.rows
+        if field == "revenue":
+            # Highest first; missing revenue (None from the API) sorts last
+            with_rev = [i for i in ids if rows[i].get("revenue") is not None]
+            without = [i for i in ids if rows[i].get("revenue") is None]
+            return sorted(with_rev, key=lambda i: rows[i]["revenue"], reverse=True) + without
+        return sorted(ids, key=lambda i: (rows[i].get(field) or "").lower())
+
+    def _buckets_for(self, filters):
+        """(industry, city) bucket keys matching the filters, or None for 'everything'."""
+        industry = (filters.get("industry") or "").lower()
+        cities = list(dict.fromkeys(PLACES.resolve(c) for c in (filters.get("cities") or [])))
+
+        if not industry and not cities:
+            return None
+        if industry and cities:
+            by_city = self.by_industry.get(industry, {})
+            return [(industry, c) for c in cities if c in by_city]
+        if industry:
+            return [(industry, c) for c in self.by_industry.get(industry, {})]
+        return [(ind, c) for c in cities for ind in self.by_city.get(c, [])]
+
+    def filter(self, filters):
+        """Same result as filter_businesses on the row list (original order kept)."""
+        buckets = self._buckets_for(filters)
+        if buckets is None:
+            return BusinessSelection(self.rows, self, None)
+
+        id_lists = [self.by_industry[ind][c] for ind, c in buckets]
+        if len(id_lists) == 1:
+            ids = id_lists[0]
+        else:
+            ids = heapq.merge(*id_lists)
+        rows = self.rows
+        return BusinessSelection([rows[i] for i in ids], self, buckets)
+
+    def sort(self, selection, sort_by):
+        """Sorted rows of a selection (None = every row); None if sort_by isn't indexed."""
+        if sort_by not in SORT_FIELDS:
+            return None
+
+        buckets = selection.buckets if isinstance(selection, BusinessSelection) else None
+        if buckets is None:
+            ids = self.order[sort_by]
+        else:
+            id_lists = [self.bucket_order[b][sort_by] for b in buckets]
+            if len(id_lists) == 1:
+                ids = id_lists[0]
+            else:
+                ids = heapq.merge(*id_lists, key=self.rank[sort_by].__getitem__)
+        rows = self.rows
+        return [rows[i] for i in ids]
@@ -0,0 +1,268 @@
+# business_table.py
+import numpy as np
+
+from place_resolver import PLACES
+
+# Business schema (see model_calculations.md 2.2)
+STRING_FIELDS = ("business_name", "place_id")
+CATEGORY_FIELDS = ("city", "industry")
+FLOAT_FIELDS = ("revenue", "rating")
+INT_FIELDS = ("user_ratings_total",)
+# Coordinates (Places location): float64 columns, only stored when present
+GEO_FIELDS = ("lat", "lon")
+FIELDS = ("business_name", "city", "industry", "revenue", "place_id", "rating", "user_ratings_total",
+          "lat", "lon")
+
+
+class StringColumn:
+    """
+    Unique strings (names, place IDs) packed into one UTF-8 buffer.
+    Rows are (start, length) pairs, so take() shares the buffer.
+    """
+
+    def __init__(self, buffer, starts, lengths, missing):
+        self.buffer = buffer
+        self.starts = starts
+        self.lengths = lengths
+        self.missing = missing
+
+    @classmethod
+    def from_values(cls, values):
+        encoded = [(v.encode("utf-8") if isinstance(v, str) else b"") for v in values]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int32, count=len(encoded))
+        starts = np.zeros(len(encoded), dtype=np.int64)
+        if len(encoded) > 1:
+            np.cumsum(lengths[:-1], out=starts[1:])
+        missing = np.fromiter((not isinstance(v, str) for v in values), dtype=bool, count=len(encoded))
+        return cls(b"".join(encoded), starts, lengths, missing)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def value(self, i):
+        if self.missing[i]:
+            return None
+        start = int(self.starts[i])
+        return self.buffer[start:start + int(self.lengths[i])].decode("utf-8")
+
+    def take(self, idx):
+        return StringColumn(self.buffer, self.starts[idx], self.lengths[idx], self.missing[idx])
+
+    def nbytes(self):
+        return len(self.buffer) + self.starts.nbytes + self.lengths.nbytes + self.missing.nbytes
+
+
+class CategoryColumn:
+    """Repeated strings (city, industry) interned as int32 codes into `categories`."""
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_values(cls, values):
+        lookup = {}
+        categories = []
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, v in enumerate(values):
+            v = v if isinstance(v, str) else ""
+            code = lookup.get(v)
+            if code is None:
+                code = lookup[v] = len(categories)
+                categories.append(v)
+            codes[i] = code
+        return cls(codes, categories)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def value(self, i):
+        return self.categories[self.codes[i]]
+
+    def take(self, idx):
+        return CategoryColumn(self.codes[idx], self.categories)
+
+    def codes_matching(self, wanted_lower):
+        """Codes whose lowercased category is in wanted_lower."""
+        return [c for c, name in enumerate(self.categories) if name.lower() in wanted_lower]
+
+    def nbytes(self):
+        return self.codes.nbytes + sum(len(c) for c in self.categories)
+
+
+class BusinessRow:
+    """Read-only dict-like view of one table row (built on demand)."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table, i):
+        self._table = table
+        self._i = i
+
+    def __getitem__(self, field):
+        if field not in self._table.fields:
+            raise KeyError(field)
+        return self._table.value(field, self._i)
+
+    def get(self, field, default=None):
+        if field not in self._table.fields:
+            return default
+        return self._table.value(field, self._i)
+
+    def keys(self):
+        return self._table.fields
+
+    def items(self):
+        return [(f, self[f]) for f in self._table.fields]
+
+    def __iter__(self):
+        return iter(self._table.fields)
+
+    def __contains__(self, field):
+        return field in self._table.fields
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"BusinessRow({self.to_dict()!r})"
+
+
+class BusinessTable:
+    """
+    Columnar business records:
+      - business_name / place_id: packed UTF-8 (StringColumn)
+      - city / industry: interned int codes (CategoryColumn)
+      - revenue / rating: float64 + missing mask
+      - user_ratings_total: int64 + missing mask
+      - lat / lon: float64 + missing mask (only when some row has them)
+    Iterating yields BusinessRow views, so code written for lists of dicts
+    (b["city"], b.get("revenue")) keeps working.
+    """
+
+    def __init__(self, columns, size):
+        self.columns = columns
+        self.size = size
+        self.fields = tuple(f for f in FIELDS if f in columns)
+
+    # ---------- building ----------
+    @classmethod
+    def from_records(cls, records):
+        records = records if isinstance(records, list) else list(records)
+        columns = {}
+        for field in STRING_FIELDS:
+            columns[field] = StringColumn.from_values([r.get(field) for r in records])
+        for field in CATEGORY_FIELDS:
+            columns[field] = CategoryColumn.from_values([r.get(field) for r in records])
+        geo = [f for f in GEO_FIELDS if any(r.get(f) is not None for r in records)]
+        for field in FLOAT_FIELDS + INT_FIELDS + tuple(geo):
+            raw = [r.get(field) for r in records]
+            missing = np.fromiter(
+                (not isinstance(v, (int, float)) or isinstance(v, bool) for v in raw),
+                dtype=bool, count=len(raw)
+            )
+            dtype = np.int64 if field in INT_FIELDS else np.float64
+            values = np.fromiter(
+                (v if not m else 0 for v, m in zip(raw, missing)),
+                dtype=dtype, count=len(raw)
+            )
+            columns[field] = (values, missing)
+        return cls(columns, len(records))
+
+    def to_records(self):
+        return [BusinessRow(self, i).to_dict() for i in range(self.size)]
+
+    # ---------- access ----------
+    def value(self, field, i):
+        col = self.columns.get(field)
+        if col is None:
+            return None
+        if isinstance(col, tuple):
+            values, missing = col
+            if missing[i]:
+                return None
+            return int(values[i]) if field in INT_FIELDS else float(values[i])
+        return col.value(i)
+
+    def numeric(self, field):
+        """(values, missing) arrays for revenue / rating / user_ratings_total / lat / lon."""
+        if field not in self.columns:  # coordinates absent from the whole table
+            return np.zeros(self.size), np.ones(self.size, dtype=bool)
+        return self.columns[field]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return (BusinessRow(self, i) for i in range(self.size))
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self.size
+            if not 0 <= key < self.size:
+                raise IndexError("BusinessTable index out of range")
+            return BusinessRow(self, int(key))
+        if isinstance(key, slice):
+            return self.take(np.arange(self.size)[key])
+        return self.take(np.asarray(key))
+
+    def take(self, idx):
+        idx = np.asarray(idx, dtype=np.int64)
+        columns = {}
+        for field, col in self.columns.items():
+            if isinstance(col, tuple):
+                columns[field] = (col[0][idx], col[1][idx])
+            else:
+                columns[field] = col.take(idx)
+        return BusinessTable(columns, len(idx))
+
+    def nbytes(self):
+        total = 0
+        for col in self.columns.values():
+            if isinstance(col, tuple):
+                total += col[0].nbytes + col[1].nbytes
+            else:
+                total += col.nbytes()
+        return total
+
+    # ---------- vectorized consumers ----------
+    def filter(self, filters):
+        """Same rows as filter_businesses (cities by place ID, industry case-insensitive)."""
+        mask = np.ones(self.size, dtype=bool)
+        industry = filters.get("industry")
+        cities = filters.get("cities")
+        if industry:
+            codes = self.columns["industry"].codes_matching({industry.lower()})
+            mask &= np.isin(self.columns["industry"].codes, codes)
+        if cities:
+            col = self.columns["city"]
+            place_ids = PLACES.resolve_many(col.categories)  # one lookup per distinct city
+            codes = np.flatnonzero(np.isin(place_ids, list(PLACES.ids_for(cities))))
+            mask &= np.isin(col.codes, codes)
+        return self.take(np.flatnonzero(mask))
+
+    def sort(self, sort_by):
+        """Stable sort like sort_businesses; missing revenue sorts last. None if unsupported."""
+        if sort_by == "revenue":
+            values, missing = self.columns["revenue"]
+            key = np.where(missing, np.inf, -values)
+        elif sort_by in CATEGORY_FIELDS:
+            col = self.columns[sort_by]
+            # categories that differ only in case must tie (stable order kept)
+            lowered = [c.lower() for c in col.categories]
+            rank = {name: r for r, name in enumerate(sorted(set(lowered)))}
+            rank_of_code = np.array([rank[name] for name in lowered], dtype=np.int64)
+            key = rank_of_code[col.codes] if len(col.codes) else col.codes
+        elif sort_by == "business_name":
+            col = self.columns["business_name"]
+            key = np.array([(col.value(i) or "").lower() for i in range(self.size)], dtype=object)
+        else:
+            return None
+        return self.take(np.argsort(key, kind="stable"))
+
+    def revenue_stats(self):
+        """(count with revenue > 0, revenue sum) without touching rows."""
+        values, missing = self.columns["revenue"]
+        present = values[~missing]
+        return int((present > 0).sum()), float(present.sum())
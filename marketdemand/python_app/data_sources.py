@@ -1,7 +1,21 @@
 import json
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import requests
 
+import instrumentation as instr
+from business_table import BusinessTable
+from data_storage import fetch_or_cache, make_cache_key
+from demographic_snapshot import SNAPSHOT_EXT, load_snapshot
+from place_resolver import PLACE_SUFFIXES, parse_address_city, strip_place_suffix
+from scheduler import ApiError, schedule
+from transport import active_transport
+from validation import VALIDATORS, ValidationReport, iter_businesses
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "..", "data")
 
@@ -9,14 +23,78 @@ DATA_DIR = os.path.join(BASE_DIR, "..", "data")
 # ======================
 # FILE-BASED FETCHERS
 # ======================
-def fetch_business_data():
-    file_path = os.path.join(DATA_DIR, "sample_business_data.json")
+@instr.timed("fetch.business.file")
+def fetch_business_data(file_path=None):
+    file_path = file_path or os.path.join(DATA_DIR, "sample_business_data.json")
     with open(file_path, "r") as f:
         return json.load(f)
 
 
-def fetch_demographic_data():
-    file_path = os.path.join(DATA_DIR, "sample_demographic_data.json")
+def iter_business_file(file_path, chunk_size=1 << 16, validate=True):
+    """
+    Lazily yield business dicts from a large file without loading it all.
+    .ndjson / .jsonl: one JSON object per line.
+    .json: a top-level array, decoded incrementally chunk by chunk.
+    Rows are validated one by one (validation.clean_business), same as
+    get_business_data; validate=False yields them as read.
+    """
+    rows = _read_business_file(file_path, chunk_size)
+    if not validate:
+        yield from rows
+        return
+    report = ValidationReport("business")
+    yield from iter_businesses(rows, report)
+    report.warn()
+
+
+def _read_business_file(file_path, chunk_size):
+    if file_path.endswith((".ndjson", ".jsonl")):
+        with open(file_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        return
+
+    decoder = json.JSONDecoder()
+    with open(file_path, "r") as f:
+        buf = ""
+        started = False
+        while True:
+            chunk = f.read(chunk_size)
+            buf += chunk
+            pos = 0
+            while True:
+                # skip whitespace, the opening "[" and separators
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if not started and pos < len(buf):
+                    if buf[pos] != "[":
+                        raise ValueError(f"{file_path} is not a JSON array of businesses.")
+                    started = True
+                    pos += 1
+                    continue
+                if pos < len(buf) and buf[pos] == "]":
+                    return
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    break  # object continues in the next chunk
+                yield obj
+                pos = end
+            buf = buf[pos:]
+            if not chunk:
+                if buf.strip():
+                    raise ValueError(f"{file_path} ended in the middle of a business record.")
+                return
+
+
+@instr.timed("fetch.demographic.file")
+def fetch_demographic_data(file_path=None):
+    file_path = file_path or os.path.join(DATA_DIR, "sample_demographic_data.json")
+    if file_path.endswith(SNAPSHOT_EXT):
+        # compiled snapshot: memory-mapped, no parse
+        return load_snapshot(file_path)
     with open(file_path, "r") as f:
         raw = json.load(f)
         # Lowercase city names for matching, preserve subfields
@@ -24,8 +102,9 @@ def fetch_demographic_data():
         return normalized
 
 
-def fetch_industry_data():
-    file_path = os.path.join(DATA_DIR, "industry_data.json")
+@instr.timed("fetch.industry.file")
+def fetch_industry_data(file_path=None):
+    file_path = file_path or os.path.join(DATA_DIR, "industry_data.json")
     with open(file_path, "r") as f:
         raw = json.load(f)
         # Make industry keys case-insensitive
@@ -36,42 +115,72 @@ def fetch_industry_data():
 # ======================
 # API FALLBACK INTERFACES
 # ======================
-def get_business_data(source="file", industry=None, cities=None):
+@instr.timed("fetch.business")
+def get_business_data(source="file", industry=None, cities=None, as_table=False, harvest=False, fallback=False):
+    """
+    source="api" raises ApiError when the API fails (or no key is set);
+    fallback=True uses the SAMPLE business file instead, with a warning.
+    """
     if source == "api":
         if not cities:
-            print("⚠️ API business mode requires at least one city for now. Falling back to file data.")
+            if not fallback:
+                raise ValueError("API business mode requires at least one city.")
+            print("⚠️ API business mode requires at least one city for now. Using the SAMPLE business file instead.")
             data = fetch_business_data()
         else:
-            data = fetch_business_api(industry=industry, cities=cities)
-            if not data:
-                print("⚠️ Business API returned no data. Falling back to file data.")
+            # harvest: paginated + tiled (complete counts for dense cities, more requests)
+            fetch = harvest_business_api if harvest else fetch_business_api
+            try:
+                data = fetch(industry=industry, cities=cities)
+            except ApiError as e:
+                if not fallback:
+                    raise
+                print(f"⚠️ Business API FAILED ({e}). Using the SAMPLE business file instead.")
+                data = fetch_business_data()
+            if not data and fallback:
+                print("⚠️ Business API returned no data. Using the SAMPLE business file instead.")
                 data = fetch_business_data()
     else:
         data = fetch_business_data()
 
-    validate_data(data, "business")
+    data = validate_data(data, "business")
+    if as_table:
+        # columnar, ~5x less memory for large datasets
+        return BusinessTable.from_records(data)
     return data
 
 
+@instr.timed("fetch.industry")
 def get_industry_data(source="file"):
     if source == "api":
         data = fetch_industry_api()
     else:
         data = fetch_industry_data()
-    validate_data(data,"industry")
+    data = validate_data(data, "industry")
     return data
 
 
-def get_demographic_data(source="file"):
+@instr.timed("fetch.demographic")
+def get_demographic_data(source="file", fallback=False):
+    """
+    source="api" raises ApiError when the Census API fails;
+    fallback=True uses the SAMPLE demographic file instead, with a warning.
+    """
     if source == "api":
-        data = fetch_demographic_api()
-        if not data:
-            print("⚠️ Demographic API returned no data. Falling back to file data.")
+        try:
+            data = fetch_demographic_api()
+        except ApiError as e:
+            if not fallback:
+                raise
+            print(f"⚠️ Demographic API FAILED ({e}). Using the SAMPLE demographic file instead.")
+            data = fetch_demographic_data()
+        if not data and fallback:
+            print("⚠️ Demographic API returned no data. Using the SAMPLE demographic file instead.")
             data = fetch_demographic_data()
     else:
         data = fetch_demographic_data()
 
-    validate_data(data, "demographic")
+    data = validate_data(data, "demographic")
     return data
 
 
@@ -91,142 +200,467 @@ def fetch_API_Keys():
         print("⚠️ apiKeys.json is not valid JSON. Continuing without API key.")
         return {}
 
-def fetch_demographic_api():
+def _places_api_key():
+    """The Google Places key from apiKeys.json (ApiError if there is none)."""
+    api_key = (fetch_API_Keys().get("google_maps_api_key", "") or "").strip()
+    if not api_key:
+        raise ApiError("places", "Google Places API key missing (google_maps_api_key in data/apiKeys.json)")
+    return api_key
+
+
+CENSUS_FIELDS = "NAME,B01003_001E,B19013_001E"
+PLACES_FIELD_MASK = "places.id,places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.location"
+PLACES_LIVE_URL = "https://places.googleapis.com/v1/places:searchText"
+# MDA_PLACES_URL / MDA_CENSUS_URL point the fetchers elsewhere (e.g. transport.FakeApiServer)
+PLACES_SEARCH_URL = os.environ.get("MDA_PLACES_URL", PLACES_LIVE_URL)
+# Text Search caps: 20 results per page, 3 pages (60 results) per query
+PLACES_PAGE_SIZE = 20
+PLACES_MAX_PAGES = 3
+
+
+CENSUS_LIVE_URL = "https://api.census.gov/data/2022/acs/acs5"
+CENSUS_BASE_URL = os.environ.get("MDA_CENSUS_URL", CENSUS_LIVE_URL)
+
+# State FIPS -> USPS code (50 states, DC, Puerto Rico)
+STATE_FIPS = {
+    "01": "AL", "02": "AK", "04": "AZ", "05": "AR", "06": "CA", "08": "CO", "09": "CT", "10": "DE",
+    "11": "DC", "12": "FL", "13": "GA", "15": "HI", "16": "ID", "17": "IL", "18": "IN", "19": "IA",
+    "20": "KS", "21": "KY", "22": "LA", "23": "ME", "24": "MD", "25": "MA", "26": "MI", "27": "MN",
+    "28": "MS", "29": "MO", "30": "MT", "31": "NE", "32": "NV", "33": "NH", "34": "NJ", "35": "NM",
+    "36": "NY", "37": "NC", "38": "ND", "39": "OH", "40": "OK", "41": "OR", "42": "PA", "44": "RI",
+    "45": "SC", "46": "SD", "47": "TN", "48": "TX", "49": "UT", "50": "VT", "51": "VA", "53": "WA",
+    "54": "WV", "55": "WI", "56": "WY", "72": "PR",
+}
+
+
+@instr.timed("fetch.demographic.api")
+def fetch_demographic_api(state="49", base_url=None):
+    """One state's places as {place: {"population", "avg_income"}} (Utah FIPS = 49)."""
+    return fetch_or_cache(
+        _census_cache_key(state, base_url),
+        lambda: _fetch_census_places(state, base_url),
+        source="census"
+    )
+
+
+def _census_cache_key(state, base_url=None):
+    field_mask = CENSUS_FIELDS
+    base_url = base_url or CENSUS_BASE_URL
+    if base_url != CENSUS_LIVE_URL:
+        field_mask = f"{CENSUS_FIELDS}|{base_url}"
+    return make_cache_key("census", state=state, field_mask=field_mask)
+
+
+def _fetch_census_places(state="49", base_url=None, session=None, timeout=30):
     try:
-        api_key = fetch_API_Keys().get("Census_API_Key", "")
-        base_url = "https://api.census.gov/data/2022/acs/acs5"
-        # Utah FIPS = 49
-        params = {
-        "get": "NAME,B01003_001E,B19013_001E",
+        data = _census_request(session or _get_session(), base_url or CENSUS_BASE_URL, state, timeout)
+        if not data:
+            return {}
+        return census_columns_to_dict(parse_census_rows(data))
+    except ApiError:
+        raise  # reported by the caller, never mistaken for "no places"
+    except Exception as e:
+        print(f"⚠️ API error (demographic, state {state}): {e}")
+    return {}
+
+
+def _census_request(http, base_url, state, timeout=30):
+    """One ACS place:* request for a state -> the raw JSON rows (ApiError on failure)."""
+    api_key = fetch_API_Keys().get("Census_API_Key", "")
+    params = {
+        "get": CENSUS_FIELDS,
         "for": "place:*",
-        "in": "state:49",
-        }
-        if api_key:
-            params["key"] = api_key
-        response = requests.get(
-            base_url,
-            params=params,
-            timeout=30,
-            headers={"User-Agent": "MarketDemandAnalyzer/0.1"}
+        "in": f"state:{state}",
+    }
+    if api_key:
+        params["key"] = api_key
+    with instr.span("http.census"):
+        response = schedule(
+            "census",
+            lambda: http.get(
+                base_url,
+                params=params,
+                timeout=timeout,
+                headers={"User-Agent": "MarketDemandAnalyzer/0.1"}
+            ),
+            key=("GET", base_url, state)
         )
+    instr.count("http.census.requests")
+    instr.count("http.census.bytes", len(response.content))
 
-        # If Census returns HTML or blank text, response.json() will crash.
-        content_type = (response.headers.get("Content-Type") or "").lower()
+    # If Census returns HTML or blank text, response.json() will crash.
+    content_type = (response.headers.get("Content-Type") or "").lower()
 
-        if response.status_code != 200:
-            print(f"⚠️ Census HTTP {response.status_code}: {response.text[:200]}")
-            return {}
+    if response.status_code != 200:
+        instr.count("http.census.errors")
+        raise ApiError("census", f"HTTP {response.status_code} (state {state}): {response.text[:200]}",
+                       response.status_code)
 
-        if "json" not in content_type:
-            print(f"⚠️ Census returned non-JSON content-type={content_type}. Body head: {response.text[:200]}")
-            return {}
+    if "json" not in content_type:
+        raise ApiError("census", f"non-JSON content-type={content_type}. Body head: {response.text[:200]}")
 
-        data = response.json()
-        
-        headers = data[0]
-        rows = data[1:]
-        name_idx = headers.index("NAME")
-        pop_idx = headers.index("B01003_001E")
-        income_idx = headers.index("B19013_001E")
+    return response.json()
 
-        result = {}
-        for row in rows:
-                name = row[name_idx]
-                place_part = name.split(",")[0].strip().lower()
-                city = normalize_place_name(place_part)
 
-                try:
-                    population = int(row[pop_idx])
-                    income = int(row[income_idx])
-                    # Filter Census sentinel / invalid values
-                    if income <= 0 or income > 1_000_000:
-                        continue
-                except (TypeError, ValueError):
-                    continue
+def parse_census_rows(data):
+    """
+    ACS JSON ([header, *rows]) -> columnar arrays, parsed a column at a time:
+      {"state": str[], "place": str[] (normalized), "population": int64[], "avg_income": int64[]}
+    Rows with unparseable numbers or sentinel incomes (<= 0, > 1M) are dropped.
+    """
+    header, rows = data[0], data[1:]
+    if not rows:
+        empty = np.array([], dtype=str)
+        return {"state": empty, "place": empty,
+                "population": np.array([], dtype=np.int64), "avg_income": np.array([], dtype=np.int64)}
+    columns = list(zip(*rows))
+
+    def numeric(name):
+        raw = np.array(columns[header.index(name)], dtype=str)
+        raw[np.isin(raw, ["None", ""])] = "nan"
+        try:
+            return raw.astype(float)
+        except ValueError:  # stray text in a numeric column: fall back per value
+            return np.array([_to_float(v) for v in raw])
+
+    population = numeric("B01003_001E")
+    income = numeric("B19013_001E")
+    # Filter Census sentinel / invalid values
+    keep = np.isfinite(population) & np.isfinite(income) & (income > 0) & (income <= 1_000_000)
+
+    places = np.array(columns[header.index("NAME")], dtype=str)[keep]
+    places = np.char.strip(np.char.partition(places, ",")[:, 0])
+    if "state" in header:
+        states = np.array(columns[header.index("state")], dtype=str)[keep]
+    else:
+        states = np.full(len(places), "")
+    return {
+        "state": states,
+        "place": normalize_place_names(places),
+        "population": population[keep].astype(np.int64),
+        "avg_income": income[keep].astype(np.int64),
+    }
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return float("nan")
 
-                result[city] = {
-                    "population": population,
-                    "avg_income": income
-                }
-        return result
-    except Exception as e:
-        print(f"⚠️ API error (demographic): {e}")
-    return {}
 
+def census_columns_to_dict(columns):
+    """Columnar census rows -> {place: {"population", "avg_income"}} (later duplicates win)."""
+    return {
+        place: {"population": pop, "avg_income": income}
+        for place, pop, income in zip(
+            columns["place"].tolist(), columns["population"].tolist(), columns["avg_income"].tolist()
+        )
+    }
+
+
+@instr.timed("fetch.demographic.nationwide")
+def fetch_demographic_nationwide(states=None, max_workers=8, base_url=None, timeout=30):
+    """
+    Every place in every state (default: all of STATE_FIPS), states fetched
+    concurrently (max_workers at a time) and cached per state.
+    Returns {(state_code, place): {"population", "avg_income"}}, e.g.
+    ("IL", "springfield") and ("MO", "springfield") stay separate.
+    States that fail are reported and left out.
+    """
+    states = list(states or STATE_FIPS)
+    session = _get_session(max_workers)
+
+    def fetch_state(fips):
+        try:
+            return fetch_or_cache(
+                _census_cache_key(fips, base_url),
+                lambda: _fetch_census_places(fips, base_url, session, timeout),
+                source="census"
+            ) or {}
+        except ApiError as e:
+            print(f"⚠️ Census request FAILED for state {fips}: {e}")
+            return {}
 
-def fetch_business_api(industry: str, cities: list[str] | None = None, max_per_city: int = 20):
+    workers = max(1, min(max_workers, len(states)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        per_state = list(pool.map(instr.bind(fetch_state), states))
+
+    merged = {}
+    for fips, places in zip(states, per_state):
+        if not places:
+            print(f"⚠️ No Census places for state {fips}.")
+        code = STATE_FIPS.get(fips, fips)
+        for place, values in places.items():
+            merged[(code, place)] = values
+    return merged
+
+
+def demographics_for_state(nationwide, state):
+    """One state's slice of fetch_demographic_nationwide as the usual {place: {...}} dict."""
+    state = STATE_FIPS.get(state, state).upper()
+    return {place: values for (code, place), values in nationwide.items() if code == state}
+
+
+@instr.timed("fetch.business.api")
+def fetch_business_api(
+    industry: str,
+    cities: list[str] | None = None,
+    max_per_city: int = 20,
+    max_workers: int = 8,
+    timeout: float = 30,
+    url: str | None = None
+):
     """
     Google Places (New) Text Search.
     Returns list[dict] in your app's business schema.
     revenue is None because Places doesn't provide it.
+    City queries run concurrently (max_workers threads sharing one pooled
+    session, timeout seconds per request) and are deduped by place_id.
     """
     try:
-        api_key = (fetch_API_Keys().get("google_maps_api_key", "") or "").strip()
-        if not api_key:
-            print("⚠️ Google Places API key missing. Returning empty business list.")
-            return []
-    
-        url = "https://places.googleapis.com/v1/places:searchText"
+        api_key = _places_api_key()
+        url = url or PLACES_SEARCH_URL
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.rating,places.userRatingCount",
+            "X-Goog-FieldMask": PLACES_FIELD_MASK,
         }
     
         if not cities:
-            queries = [f"{industry} in Utah"]
+            queries = [("", f"{industry} in Utah")]
         else:
-            queries = [f"{industry} in {c}, UT" for c in cities]
-    
-        results = []
-    
-        for q in queries:
-            payload = {
-                "textQuery": q,
-                "maxResultCount": max_per_city,
-                "languageCode": "en",
-                "regionCode": "US",
-            }
-    
-            resp = requests.post(url, headers=headers, json=payload, timeout=30)
-    
-            if resp.status_code != 200:
-                print(f"⚠️ Places HTTP {resp.status_code}: {resp.text[:200]}")
-                continue
-    
-            data = resp.json()
-            places = data.get("places", [])
-    
-            for p in places:
-                name = ((p.get("displayName") or {}).get("text")) or ""
-                addr = p.get("formattedAddress") or ""
-                place_id = p.get("id")
-    
-                # best-effort city parsing: take first segment of address
-                # e.g. "155 S Freedom Blvd, Provo, UT 84601" -> "provo"
-                city_guess = ""
-                if "," in addr:
-                    city_guess = addr.split(",")[1].strip().lower()  # 1 is city in typical formattedAddress
-    
-                results.append({
-                    "business_name": name,
-                    "city": city_guess,
-                    "industry": industry,
-                    "revenue": None,
-                    "place_id": place_id,
-                    "rating": p.get("rating"),
-                    "user_ratings_total": p.get("userRatingCount"),
-                })
-            deduped = {}
-            for b in results:
+            queries = [(c, f"{industry} in {c}, UT") for c in cities]
+
+        session = _get_session(max_workers)
+
+        def fetch_city(city_query):
+            c, q = city_query
+            cache_key = make_cache_key("google_places", industry=industry, city=c, state="UT",
+                                       field_mask=_places_cache_mask(f"{PLACES_FIELD_MASK}|{max_per_city}", url))
+            try:
+                return fetch_or_cache(
+                    cache_key,
+                    lambda: _places_text_search(session, url, headers, q, industry, max_per_city, timeout),
+                    source="google_places"
+                ) or []
+            except Exception as e:
+                print(f"⚠️ API error (business, {q}): {e}")
+                return e
+
+        workers = max(1, min(max_workers, len(queries)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            per_city = list(pool.map(instr.bind(fetch_city), queries))
+
+        failed = [(q, r) for (_, q), r in zip(queries, per_city) if isinstance(r, Exception)]
+        if failed and len(failed) == len(queries):
+            raise ApiError("places", f"all {len(queries)} city queries failed (first: {failed[0][1]})")
+        if failed:
+            print(f"⚠️ Places failed for {len(failed)} of {len(queries)} cities; results are INCOMPLETE.")
+        per_city = [r for r in per_city if not isinstance(r, Exception)]
+
+        # Dedupe across all cities (a business near a border shows up twice)
+        deduped = {}
+        for rows in per_city:
+            for b in rows:
                 key = b.get("place_id") or (b.get("business_name","").lower(), b.get("city","").lower())
-                deduped[key] = b
-            return list(deduped.values())
+                deduped.setdefault(key, b)
+        return list(deduped.values())
+    except ApiError:
+        raise
     except Exception as e:
         print(f"⚠️ API error (business): {e}")
-        return {}
-    return results
+        return []
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session(pool_size=8):
+    """
+    Shared requests.Session so concurrent calls reuse keep-alive connections,
+    or the record / replay transport when one is active (see transport.py).
+    """
+    transport = active_transport()
+    if transport is not None:
+        return transport
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 10))
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _places_cache_mask(field_mask, url):
+    """Responses from a non-live endpoint never share cache entries with live ones."""
+    return field_mask if url == PLACES_LIVE_URL else f"{field_mask}|{url}"
+
+
+def _places_text_search(session, url, headers, query, industry, max_per_city, timeout=30):
+    """One Places Text Search call -> list of business rows."""
+    payload = {
+        "textQuery": query,
+        "maxResultCount": max_per_city,
+        "languageCode": "en",
+        "regionCode": "US",
+    }
+    data = _places_request(session, url, headers, payload, timeout)
+    return [_place_to_row(p, industry) for p in data.get("places", [])]
+
+
+def _places_request(session, url, headers, payload, timeout=30):
+    """POST one Text Search request -> response JSON (ApiError once retries are exhausted)."""
+    with instr.span("http.places"):
+        resp = schedule(
+            "places",
+            lambda: session.post(url, headers=headers, json=payload, timeout=timeout),
+            key=("POST", url, headers.get("X-Goog-FieldMask"), payload)
+        )
+    instr.count("http.places.requests")
+    instr.count("http.places.bytes", len(resp.content))
+
+    if resp.status_code != 200:
+        instr.count("http.places.errors")
+        raise ApiError("places", f"HTTP {resp.status_code}: {resp.text[:200]}", resp.status_code)
+    return resp.json()
+
 
+def _place_to_row(p, industry):
+    """Places API place -> row in the app's business schema."""
+    name = ((p.get("displayName") or {}).get("text")) or ""
+    addr = p.get("formattedAddress") or ""
+
+    # e.g. "155 S Freedom Blvd, Provo, UT 84601, USA" -> "provo"
+    city_guess = parse_address_city(addr)
+
+    return {
+        "business_name": name,
+        "city": city_guess,
+        "industry": industry,
+        "revenue": None,
+        "place_id": p.get("id"),
+        "rating": p.get("rating"),
+        "user_ratings_total": p.get("userRatingCount"),
+        "lat": (p.get("location") or {}).get("latitude"),
+        "lon": (p.get("location") or {}).get("longitude"),
+    }
+
+
+# ======================
+# HARVESTING (paginated + tiled)
+# ======================
+@instr.timed("fetch.business.harvest")
+def harvest_business_api(industry, cities, **options):
+    """iter_harvest_places collected into a list (see there for options)."""
+    try:
+        return list(iter_harvest_places(industry, cities, **options))
+    except ApiError:
+        raise
+    except Exception as e:
+        print(f"⚠️ API error (business harvest): {e}")
+        return []
+
+
+def iter_harvest_places(
+    industry,
+    cities,
+    url=None,
+    page_size=PLACES_PAGE_SIZE,
+    max_pages=PLACES_MAX_PAGES,
+    max_depth=3,
+    patience=4,
+    timeout=30,
+    seen=None
+):
+    """
+    Yield every business Places will return for industry in each city,
+    not just the first page:
+      - each search follows nextPageToken up to max_pages
+      - the city's viewport is searched as a tile (locationBias rectangle);
+        a tile that fills all its pages is split into 4 quadrants, down to
+        max_depth levels
+      - a city stops once `patience` tiles in a row bring no new place_id
+    Rows are yielded as soon as they're new; only place_ids are kept
+    (pass `seen` to share the dedupe set across calls).
+    """
+    api_key = _places_api_key()
+    url = url or PLACES_SEARCH_URL
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": api_key,
+        "X-Goog-FieldMask": f"{PLACES_FIELD_MASK},nextPageToken",
+    }
+    session = _get_session()
+    seen = set() if seen is None else seen
+
+    for city in cities:
+        query = f"{industry} in {city}, UT"
+        tiles = deque([(_city_viewport(session, url, headers, city, timeout), 0)])
+        dry_tiles = 0
+        while tiles and dry_tiles < patience:
+            rect, depth = tiles.popleft()
+            instr.count("places.harvest.tiles")
+            found = new = 0
+            for row in _paged_search(session, url, headers, query, industry, rect,
+                                     page_size, max_pages, timeout):
+                found += 1
+                key = row["place_id"] or (row["business_name"].lower(), row["city"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                new += 1
+                yield row
+            dry_tiles = 0 if new else dry_tiles + 1
+            # a full tile probably hides more places: search its quadrants
+            if rect is not None and found >= page_size * max_pages and depth < max_depth:
+                tiles.extend((quadrant, depth + 1) for quadrant in _split_rectangle(rect))
+
+
+def _paged_search(session, url, headers, query, industry, rect, page_size, max_pages, timeout):
+    """Rows from one (query, tile) search, following nextPageToken."""
+    payload = {
+        "textQuery": query,
+        "pageSize": page_size,
+        "languageCode": "en",
+        "regionCode": "US",
+    }
+    if rect is not None:
+        payload["locationBias"] = {"rectangle": rect}
+    for _ in range(max_pages):
+        data = _places_request(session, url, headers, payload, timeout)
+        instr.count("places.harvest.pages")
+        for p in data.get("places", []):
+            yield _place_to_row(p, industry)
+        token = data.get("nextPageToken")
+        if not token:
+            return
+        payload = dict(payload, pageToken=token)
+
+
+def _city_viewport(session, url, headers, city, timeout=30):
+    """The city's bounding rectangle from Places ({"low": .., "high": ..}), or None."""
+    payload = {"textQuery": f"{city}, UT", "pageSize": 1, "languageCode": "en", "regionCode": "US"}
+    data = _places_request(session, url, dict(headers, **{"X-Goog-FieldMask": "places.viewport"}),
+                           payload, timeout)
+    places = (data or {}).get("places") or []
+    return places[0].get("viewport") if places else None
+
+
+def _split_rectangle(rect):
+    """Four quadrants of a {"low": {latitude, longitude}, "high": {...}} rectangle."""
+    low, high = rect["low"], rect["high"]
+    mid_lat = (low["latitude"] + high["latitude"]) / 2
+    mid_lng = (low["longitude"] + high["longitude"]) / 2
+    lats = [(low["latitude"], mid_lat), (mid_lat, high["latitude"])]
+    lngs = [(low["longitude"], mid_lng), (mid_lng, high["longitude"])]
+    return [
+        {"low": {"latitude": la, "longitude": lo}, "high": {"latitude": ha, "longitude": ho}}
+        for la, ha in lats for lo, ho in lngs
+    ]
 
 
 def fetch_industry_api():
@@ -240,9 +674,16 @@ def fetch_industry_api():
 
 
 def validate_data(data, data_type):
-    """Warn if no data loaded."""
+    """
+    Check + coerce a loaded dataset (see validation.py) and report what was
+    rejected; returns the clean data. Warns if no data loaded.
+    """
+    if data and not isinstance(data, BusinessTable):
+        data, report = VALIDATORS[data_type](data)
+        report.warn()
     if not data:
         print(f"⚠️  Warning: No {data_type} data loaded.")
+    return data
 
 
 def normalize_place_name(raw_name: str) -> str:
@@ -250,14 +691,14 @@ def normalize_place_name(raw_name: str) -> str:
     Converts Census place names like 'Provo city' or 'Alta town'
     to a stable key like 'provo' or 'alta'.
     """
-    s = (raw_name or "").strip().lower()
-
     # remove common Census place suffixes (Utah)
-    suffixes = [
-        " city", " town", " metro township", " cdp", " village"
-    ]
-    for suf in suffixes:
-        if s.endswith(suf):
-            s = s[: -len(suf)].strip()
+    return strip_place_suffix((raw_name or "").strip().lower())
+
 
-    return s
\ No newline at end of file
+def normalize_place_names(names):
+    """normalize_place_name over a whole array of names at once."""
+    s = np.char.lower(np.char.strip(np.asarray(names, dtype=str)))
+    for suf in PLACE_SUFFIXES:
+        head = np.char.rpartition(s, suf)[..., 0] if s.size else s
+        s = np.where(np.char.endswith(s, suf), np.char.strip(head), s)
+    return s
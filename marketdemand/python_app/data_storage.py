@@ -1,12 +1,202 @@
-def get_cached(key):
-    # return cached value or None
-    pass
-
-def set_cache(key, value):
-    # write to file
-    pass
-
-def fetch_or_cache(key, api_call_function):
-    # if cached return it
-    # else call API, store, return result
-    pass
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import instrumentation as instr
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Runtime data, not part of the repo (data_cache/ is gitignored); MDA_CACHE_DIR moves it
+CACHE_DIR = os.environ.get("MDA_CACHE_DIR") or os.path.join(BASE_DIR, "..", "data_cache")
+
+# One JSON file per API source (the files live in CACHE_DIR)
+CACHE_FILES = {
+    "census": "census_cache.json",
+    "google_places": "google_places_cache.json",
+    "yelp": "yelp_cache.json",
+    "business_spend": "business_spend_cache.json",
+}
+
+# Seconds before an entry is considered stale
+DAY = 24 * 60 * 60
+CACHE_TTLS = {
+    "census": 30 * DAY,          # ACS 5-year data changes yearly
+    "google_places": 1 * DAY,    # businesses open / close
+    "yelp": 1 * DAY,
+    "business_spend": 7 * DAY,
+}
+
+# Max entries per source file; least recently used entries are evicted first
+CACHE_MAX_ENTRIES = {
+    "census": 200,
+    "google_places": 2000,
+    "yelp": 2000,
+    "business_spend": 500,
+}
+
+DEFAULT_SOURCE = "census"
+
+# set_cache marks a source dirty; its file is rewritten after FLUSH_EVERY
+# unsaved entries or FLUSH_INTERVAL seconds, and on flush() / exit
+FLUSH_EVERY = 50
+FLUSH_INTERVAL = 5.0
+
+# In-process layer: source -> OrderedDict(key -> entry), oldest access first
+_memory = {}
+# Fetchers call the cache from worker threads
+_lock = threading.RLock()
+# source -> unsaved set_cache calls / time of the last file write
+_dirty = {}
+_last_flush = {}
+# one writer per file, so snapshots land in the order they were taken
+_write_locks = {}
+
+
+# ======================
+# KEYS
+# ======================
+def make_cache_key(source, industry=None, city=None, state=None, field_mask=None):
+    """Normalized key so 'Provo ' / 'provo' and 'Cafes' / 'cafes' share an entry."""
+    def norm(v):
+        return (str(v) if v is not None else "").strip().lower()
+
+    parts = [norm(source), norm(industry), norm(city), norm(state), norm(field_mask)]
+    return "|".join(parts)
+
+
+# ======================
+# FILE LAYER
+# ======================
+def _cache_path(source):
+    file_name = CACHE_FILES.get(source, f"{source}_cache.json")
+    return os.path.join(CACHE_DIR, file_name)
+
+
+def _load_source(source):
+    """Load a source's cache file into the memory layer (once per process)."""
+    if source in _memory:
+        return _memory[source]
+
+    entries = {}
+    try:
+        with open(_cache_path(source), "r") as f:
+            raw = f.read()
+        if raw.strip():
+            entries = json.loads(raw).get("entries", {})
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, AttributeError):
+        print(f"⚠️ Cache file for '{source}' is corrupt. Starting with an empty cache.")
+        entries = {}
+
+    ordered = OrderedDict(sorted(entries.items(), key=lambda kv: kv[1].get("last_access", 0)))
+    _memory[source] = ordered
+    return ordered
+
+
+def _write_source(source, entries):
+    """Atomic write: dump to a temp file in the same folder, then os.replace()."""
+    path = _cache_path(source)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": 1, "entries": entries}, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# ======================
+# PUBLIC API
+# ======================
+def get_cached(key, source=DEFAULT_SOURCE):
+    """Return cached value, or None if missing / expired."""
+    with _lock:
+        entries = _load_source(source)
+        entry = entries.get(key)
+        if entry is None:
+            return None
+
+        now = time.time()
+        ttl = CACHE_TTLS.get(source, DAY)
+        if now - entry.get("stored_at", 0) > ttl:
+            del entries[key]
+            return None
+
+        entry["last_access"] = now
+        entries.move_to_end(key)
+        return entry["value"]
+
+
+def set_cache(key, value, source=DEFAULT_SOURCE):
+    """Store value, evict least recently used entries over the cap, write to file."""
+    with _lock:
+        entries = _load_source(source)
+        now = time.time()
+        entries[key] = {"value": value, "stored_at": now, "last_access": now}
+        entries.move_to_end(key)
+
+        max_entries = CACHE_MAX_ENTRIES.get(source, 500)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+
+        _dirty[source] = _dirty.get(source, 0) + 1
+        due = _dirty[source] >= FLUSH_EVERY or now - _last_flush.get(source, 0) >= FLUSH_INTERVAL
+    if due:
+        flush(source)
+
+
+def flush(source=None):
+    """
+    Write unsaved entries to the cache file(s) (all dirty sources by default).
+    Serializing + writing happens outside the shared lock, so lookups and
+    other sources' fetches don't wait on the disk.
+    """
+    with _lock:
+        sources = [source] if source is not None else list(_dirty)
+        write_locks = [(s, _write_locks.setdefault(s, threading.Lock())) for s in sources]
+    for s, write_lock in write_locks:
+        with write_lock:
+            with _lock:
+                if not _dirty.get(s):
+                    continue
+                snapshot = {k: dict(v) for k, v in _memory.get(s, {}).items()}
+                _dirty[s] = 0
+                _last_flush[s] = time.time()
+            _write_source(s, snapshot)
+
+
+def fetch_or_cache(key, api_call_function, source=DEFAULT_SOURCE):
+    """
+    If cached return it, else call the API, store and return the result.
+    Empty results (API errors return {} / []) are not cached.
+    """
+    cached = get_cached(key, source)
+    if cached is not None:
+        instr.count(f"cache.{source}.hit")
+        return cached
+
+    instr.count(f"cache.{source}.miss")
+    result = api_call_function()
+    if result:
+        set_cache(key, result, source)
+    return result
+
+
+def clear_memory_cache():
+    """Drop the in-process layer (unsaved entries are flushed to the files first)."""
+    flush()
+    with _lock:
+        _memory.clear()
+        _dirty.clear()
+        _last_flush.clear()
+
+
+atexit.register(flush)
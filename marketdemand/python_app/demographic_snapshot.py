@@ -0,0 +1,233 @@
+# demographic_snapshot.py
+"""
+Compiled, memory-mapped demographic table.
+
+  python demographic_snapshot.py compile ../data/demographics.mdsnap
+  python demographic_snapshot.py compile us.mdsnap --demographic-file places.json
+
+Opening a snapshot only reads the header and maps the file, so startup
+cost stays flat however many places it holds; a lookup hashes the
+normalized name (blake2b) and probes an open-addressing slot table.
+DemographicSnapshot is a read-only Mapping with the same
+{place: {"population", "avg_income"}} shape as fetch_demographic_data,
+and fetch_demographic_data loads it directly for SNAPSHOT_EXT files.
+
+File layout (little endian, sections 8-byte aligned):
+  header   MAGIC (8 bytes), version uint32, reserved uint32 (0),
+           n_places uint64, n_slots uint64, names_size uint64
+  records  n × (population int64, avg_income float64)
+  hashes   n × uint64            (per record, checked before the name)
+  offsets  (n + 1) × uint64      (into names)
+  slots    n_slots × uint32      (record index + 1, 0 = empty)
+  names    UTF-8 normalized place names, concatenated
+
+Population is rounded to a whole count; avg_income is stored exactly.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Mapping
+
+import numpy as np
+
+MAGIC = b"MDASNAP1"
+VERSION = 2
+SNAPSHOT_EXT = ".mdsnap"
+_HEADER = struct.Struct("<8sIIQQ")
+RECORD_DTYPE = np.dtype([("population", "<i8"), ("avg_income", "<f8")])
+
+
+def normalize_key(name):
+    """Same normalization as analyzer.place_lookup."""
+    return (name or "").strip().lower()
+
+
+def _hash(key_bytes):
+    return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little")
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+# ======================
+# COMPILE
+# ======================
+def compile_snapshot(population_data, out_path):
+    """
+    Write {place: {"population", "avg_income"}} to out_path (atomically).
+    Keys are normalized; on collisions the later entry wins, like place_lookup.
+    Returns the number of places written.
+    """
+    rows = {}
+    for name, values in population_data.items():
+        rows[normalize_key(name)] = (
+            int(round(values.get("population", 0) or 0)),
+            float(values.get("avg_income", 0) or 0),
+        )
+    keys = [k.encode("utf-8") for k in rows]
+    n = len(keys)
+    n_slots = 1 << max(3, (2 * n - 1).bit_length())  # load factor <= 0.5
+
+    records = np.array(list(rows.values()), dtype=RECORD_DTYPE).reshape(n)
+    hashes = np.array([_hash(k) for k in keys], dtype="<u8")
+    offsets = np.zeros(n + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(k) for k in keys])
+    slots = np.zeros(n_slots, dtype="<u4")
+    mask = n_slots - 1
+    for i, h in enumerate(hashes.tolist()):
+        slot = h & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = i + 1
+    names = b"".join(keys)
+
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=".tmp_", suffix=SNAPSHOT_EXT)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, 0, n, n_slots))
+            f.write(struct.pack("<Q", len(names)))
+            for section in (records, hashes, offsets, slots):
+                data = section.tobytes()
+                f.write(data + b"\0" * (_align(len(data)) - len(data)))
+            f.write(names)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return n
+
+
+# ======================
+# LOAD
+# ======================
+class DemographicSnapshot(Mapping):
+    """Read-only, memory-mapped {place: {"population", "avg_income"}}."""
+
+    # place_lookup() can use this mapping as-is (keys already normalized,
+    # lookups normalize their argument)
+    normalized_keys = True
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._mmap
+        magic, version, _, n, n_slots = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a demographic snapshot.")
+        if version != VERSION:
+            raise ValueError(f"{path} is snapshot version {version}; recompile it (expected {VERSION}).")
+        (names_size,) = struct.unpack_from("<Q", buf, _HEADER.size)
+
+        pos = _HEADER.size + 8
+
+        def section(dtype, count):
+            nonlocal pos
+            arr = np.frombuffer(buf, dtype=dtype, count=count, offset=pos)
+            pos += _align(arr.nbytes)
+            return arr
+
+        self._records = section(RECORD_DTYPE, n)
+        self._hashes = section("<u8", n)
+        self._offsets = section("<u8", n + 1)
+        self._slots = section("<u4", n_slots)
+        self._names_start = pos
+        self._names_size = names_size
+        self._mask = n_slots - 1
+        self._n = n
+
+    def close(self):
+        # numpy views keep the buffer exported; drop them before closing
+        self._records = self._hashes = self._offsets = self._slots = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _name(self, i):
+        start = self._names_start + int(self._offsets[i])
+        end = self._names_start + int(self._offsets[i + 1])
+        return self._mmap[start:end]
+
+    def index_of(self, name):
+        """Record index for a place name, or -1."""
+        key = normalize_key(name).encode("utf-8")
+        h = _hash(key)
+        slot = h & self._mask
+        slots, hashes = self._slots, self._hashes
+        while True:
+            entry = int(slots[slot])
+            if entry == 0:
+                return -1
+            i = entry - 1
+            if int(hashes[i]) == h and self._name(i) == key:
+                return i
+            slot = (slot + 1) & self._mask
+
+    def _record(self, i):
+        pop, income = self._records[i].tolist()
+        return {"population": pop, "avg_income": income}
+
+    def __getitem__(self, name):
+        i = self.index_of(name)
+        if i < 0:
+            raise KeyError(name)
+        return self._record(i)
+
+    def __contains__(self, name):
+        return isinstance(name, str) and self.index_of(name) >= 0
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self._name(i).decode("utf-8")
+
+    def values(self):
+        return [self._record(i) for i in range(self._n)]
+
+    def columns(self):
+        """Zero-copy population / avg_income arrays in file order."""
+        return self._records["population"], self._records["avg_income"]
+
+
+def load_snapshot(path):
+    return DemographicSnapshot(path)
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile demographic data into a memory-mapped snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("compile", help=f"write a {SNAPSHOT_EXT} snapshot")
+    build.add_argument("out")
+    build.add_argument("--demographic-file", help="JSON {place: {population, avg_income}} (default: sample data)")
+    build.add_argument("--census-state", help="compile from the Census API for this state FIPS instead")
+    args = parser.parse_args(argv)
+
+    from data_sources import fetch_demographic_api, fetch_demographic_data, validate_data
+
+    if args.census_state:
+        data = fetch_demographic_api(state=args.census_state)
+    else:
+        data = fetch_demographic_data(args.demographic_file)
+    n = compile_snapshot(validate_data(data, "demographic"), args.out)
+    print(f"Wrote {n} places to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
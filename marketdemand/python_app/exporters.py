@@ -0,0 +1,273 @@
+# exporters.py
+"""
+Streaming export of results: CSV, NDJSON or Parquet (optional pyarrow).
+
+Rows are consumed in chunks (any iterable: a list, a BusinessTable,
+a generator over a file stream) and written through a buffered stream, so
+memory stays at one chunk whatever the row count. ".gz" paths (or
+compress=True) are gzip-compressed; Parquet compresses internally.
+Files are written to a temp file and moved into place when complete.
+
+  export_businesses(sorted_rows, "cafes.csv.gz")
+  export_analysis(analysis, "cafes.analysis.ndjson")
+  render("csv", sorted_rows, analysis, path="cafes.csv")     # businesses + analysis sidecar
+  render("terminal", limited_rows, analysis)                 # the dashboard
+
+  MDA_EXPORT=results.parquet python main.py
+"""
+import contextlib
+import csv
+import gzip
+import io
+import itertools
+import json
+import math
+import os
+import sys
+import tempfile
+
+import instrumentation as instr
+from business_table import CATEGORY_FIELDS, FIELDS, FLOAT_FIELDS, GEO_FIELDS, INT_FIELDS, STRING_FIELDS
+from renderer import render_results
+
+CHUNK_SIZE = 10_000
+BUFFER_SIZE = 1 << 20
+FORMATS = ("csv", "ndjson", "parquet")
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+
+
+def format_for_path(path):
+    """'csv' / 'ndjson' / 'parquet' from the file name (".gz" ignored)."""
+    base = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(base)[1].lower()
+    if ext == ".json":  # one JSON document per line is not a .json file
+        raise ValueError(f"{path!r}: NDJSON export writes one record per line; name it .ndjson or .jsonl.")
+    fmt = _EXTENSIONS.get(ext)
+    if fmt is None:
+        raise ValueError(f"Can't tell the export format of {path!r}; use one of {', '.join(FORMATS)}.")
+    return fmt
+
+
+@contextlib.contextmanager
+def open_output(path, compress=None, binary=False):
+    """Buffered (optionally gzip) stream to path, moved into place only on success; "-" = stdout."""
+    if path == "-":
+        yield sys.stdout.buffer if binary else sys.stdout
+        return
+    compress = path.endswith(".gz") if compress is None else compress
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp_", suffix=".export")
+    try:
+        with open(fd, "wb", buffering=BUFFER_SIZE) as raw:
+            stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) if compress else raw
+            if binary:
+                yield stream
+            else:
+                text = io.TextIOWrapper(stream, encoding="utf-8", newline="", write_through=True)
+                yield text
+                text.detach()
+            if compress:
+                stream.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def iter_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Lists of up to chunk_size rows, pulled lazily from any iterable."""
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _plain(value):
+    """numpy scalars -> Python; inf / NaN -> None (same rules as batch_runner JSON)."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def analysis_record(analysis):
+    """analyze_market result -> one flat record (stats_dif fields as "stats_dif.<name>")."""
+    record = {}
+    for key, value in analysis.items():
+        if isinstance(value, dict):
+            for sub, sub_value in value.items():
+                record[f"{key}.{sub}"] = _plain(sub_value)
+        else:
+            record[key] = _plain(value)
+    return record
+
+
+# ======================
+# WRITERS (one per format)
+# ======================
+def _csv_cell(value):
+    value = _plain(value)
+    if isinstance(value, (list, tuple)):
+        return "|".join(str(v) for v in value)
+    return "" if value is None else value
+
+
+def _write_csv(chunks, columns, out):
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    n = 0
+    for chunk in chunks:
+        writer.writerows([[_csv_cell(r.get(c)) for c in columns] for r in chunk])
+        n += len(chunk)
+    return n
+
+
+def _write_ndjson(chunks, columns, out):
+    n = 0
+    for chunk in chunks:
+        out.write("".join(json.dumps({c: _plain(r.get(c)) for c in columns}) + "\n" for r in chunk))
+        n += len(chunk)
+    return n
+
+
+def _arrow_schema(pa, columns, sample):
+    """Business fields get their business_table type; other columns are inferred from sample."""
+    types = {}
+    for c in STRING_FIELDS + CATEGORY_FIELDS:
+        types[c] = pa.string()
+    for c in FLOAT_FIELDS + GEO_FIELDS:
+        types[c] = pa.float64()
+    for c in INT_FIELDS:
+        types[c] = pa.int64()
+    fields = []
+    for c in columns:
+        t = types.get(c)
+        if t is None:
+            t = pa.array([_plain(r.get(c)) for r in sample]).type
+            t = pa.float64() if pa.types.is_null(t) else t
+        fields.append((c, t))
+    return pa.schema(fields)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow); use CSV or NDJSON otherwise.")
+    return pa, pq
+
+
+def _write_parquet(chunks, columns, out, compression="zstd"):
+    pa, pq = _require_pyarrow()
+
+    writer = None
+    n = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(out, _arrow_schema(pa, columns, chunk), compression=compression)
+            data = {c: [_plain(r.get(c)) for r in chunk] for c in columns}
+            writer.write_table(pa.table(data, schema=writer.schema))
+            n += len(chunk)
+        if writer is None:  # no rows: still write the columns
+            writer = pq.ParquetWriter(out, _arrow_schema(pa, columns, []), compression=compression)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+
+_WRITERS = {"csv": _write_csv, "ndjson": _write_ndjson, "parquet": _write_parquet}
+
+
+def export_rows(rows, path, columns, fmt=None, compress=None, chunk_size=CHUNK_SIZE):
+    """Write rows (dict-like) with the given columns; returns the number of rows written."""
+    fmt = fmt or format_for_path(path)
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}.")
+    binary = fmt == "parquet"
+    with instr.span(f"export.{fmt}"):
+        with open_output(path, compress=False if binary else compress, binary=binary) as out:
+            n = _WRITERS[fmt](iter_chunks(rows, chunk_size), list(columns), out)
+    instr.count("export.rows", n)
+    return n
+
+
+def export_businesses(rows, path, fmt=None, compress=None, columns=FIELDS, chunk_size=CHUNK_SIZE):
+    """sort_businesses output (list, BusinessTable or any row iterable) -> file."""
+    return export_rows(rows, path, columns, fmt, compress, chunk_size)
+
+
+def export_analysis(analysis, path, fmt=None, compress=None):
+    """analyze_market result -> a one-row file."""
+    record = analysis_record(analysis)
+    return export_rows([record], path, record.keys(), fmt, compress)
+
+
+def analysis_path(path):
+    """'out.csv.gz' -> 'out.analysis.csv.gz' (the sidecar for the analysis row)."""
+    base, gz = (path[:-3], ".gz") if path.endswith(".gz") else (path, "")
+    stem, ext = os.path.splitext(base)
+    return f"{stem}.analysis{ext}{gz}"
+
+
+# ======================
+# RENDERERS
+# ======================
+RENDERERS = {}
+
+
+def register_renderer(name):
+    """Decorator: renderer(business_list, analysis, path=None, **options)."""
+    def decorator(fn):
+        RENDERERS[name] = fn
+        return fn
+    return decorator
+
+
+@register_renderer("terminal")
+def _render_terminal(business_list, analysis, path=None, **options):
+    render_results(business_list, analysis)
+
+
+def _file_renderer(fmt):
+    def render_file(business_list, analysis, path=None, **options):
+        if not path:
+            raise ValueError(f"The {fmt} renderer needs an output path.")
+        n = export_businesses(business_list, path, fmt=fmt, **options)
+        export_analysis(analysis, analysis_path(path), fmt=fmt, compress=options.get("compress"))
+        return n
+    return render_file
+
+
+for _fmt in FORMATS:
+    register_renderer(_fmt)(_file_renderer(_fmt))
+
+
+def check_renderer(name):
+    """name if it is a registered renderer (ValueError otherwise)."""
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown renderer {name!r}; available: {', '.join(sorted(RENDERERS))}.")
+    return name
+
+
+def export_renderer_for(path, name=None):
+    """
+    Renderer for an export path (name, or the format from the path), checked
+    up front so a bad MDA_EXPORT fails before the analysis runs, not after.
+    """
+    name = check_renderer(name or format_for_path(path))
+    if name == "parquet":
+        _require_pyarrow()
+    return name
+
+
+def render(name, business_list, analysis, path=None, **options):
+    """Send results to a registered renderer ("terminal", "csv", "ndjson", "parquet", ...)."""
+    return RENDERERS[check_renderer(name)](business_list, analysis, path=path, **options)
@@ -1,12 +1,29 @@
+import numpy as np
+
+import instrumentation as instr
+from business_index import BusinessIndex, BusinessSelection
+from business_table import BusinessTable
+from place_resolver import PLACES
+from spatial_index import distances_km, sort_by_distance, within_radius
+
+
+@instr.timed("filter")
 def filter_businesses(business_data, filters):
-  """Filter by cities + industry."""
-  cities = filters["cities"]
-  industry = filters["industry"]
+  """Filter by cities + industry (or by radius_km around origin instead of cities)."""
+  if filters.get("radius_km") is not None and filters.get("origin"):
+      return filter_by_radius(business_data, filters)
+
+  if isinstance(business_data, (BusinessIndex, BusinessTable)):
+      return business_data.filter(filters)
+
+  cities = PLACES.ids_for(filters["cities"]) if filters["cities"] else None
+  industry = (filters["industry"] or "").lower()
+  resolve = PLACES.resolve
 
   filtered = []
   for b in business_data:
-      city_ok = (not cities) or (b["city"].lower() in [c.lower() for c in cities])
-      industry_ok = (not industry) or (b["industry"].lower() == industry.lower())
+      city_ok = (not cities) or (resolve(b["city"]) in cities)
+      industry_ok = (not industry) or (b["industry"].lower() == industry)
 
       if city_ok and industry_ok:
           filtered.append(b)
@@ -14,16 +31,74 @@ def filter_businesses(business_data, filters):
   return filtered
 
 
+def filter_by_radius(business_data, filters):
+  """Industry + within filters["radius_km"] of filters["origin"] (lat, lon); original order kept."""
+  origin, radius_km = filters["origin"], filters["radius_km"]
+  industry = (filters.get("industry") or "").lower()
+
+  if isinstance(business_data, BusinessTable):
+      mask = distances_km(business_data, origin) <= radius_km
+      if industry:
+          codes = business_data.columns["industry"].codes_matching({industry})
+          mask &= np.isin(business_data.columns["industry"].codes, codes)
+      return business_data.take(np.flatnonzero(mask))
+
+  if isinstance(business_data, BusinessIndex):
+      # KD-tree: O(log n + matches)
+      row_ids, _ = business_data.spatial.query_radius(origin[0], origin[1], radius_km)
+      rows = [business_data.rows[i] for i in np.sort(row_ids).tolist()]
+  else:
+      rows = within_radius(business_data, origin, radius_km)
+
+  if industry:
+      rows = [b for b in rows if (b.get("industry") or "").lower() == industry]
+  return rows
+
+
+def iter_filter_businesses(business_data, filters):
+  """Generator version of filter_businesses for streamed (larger than RAM) data."""
+  cities = PLACES.ids_for(filters["cities"])
+  industry = (filters["industry"] or "").lower()
+  resolve = PLACES.resolve
+
+  for b in business_data:
+      city_ok = (not cities) or (resolve(b["city"]) in cities)
+      industry_ok = (not industry) or (b["industry"].lower() == industry)
+
+      if city_ok and industry_ok:
+          yield b
+
+
+@instr.timed("sort")
 def sort_businesses(data, filters):
   """Sort based on user’s selected field."""
   sort_by = filters["sort_by"]
 
+  # Columnar data: vectorized stable sort
+  if isinstance(data, BusinessTable) and sort_by == "distance" and filters.get("origin"):
+      dist = distances_km(data, filters["origin"])
+      return data.take(np.argsort(np.where(np.isnan(dist), np.inf, dist), kind="stable"))
+  if isinstance(data, BusinessTable):
+      sorted_table = data.sort(sort_by)
+      return sorted_table if sorted_table is not None else data
+
+  # Indexed data: merge presorted buckets instead of sorting
+  if isinstance(data, (BusinessIndex, BusinessSelection)):
+      index = data if isinstance(data, BusinessIndex) else data.index
+      indexed = index.sort(data, sort_by)
+      if indexed is not None:
+          return indexed
+      data = list(data)
+
   # NOTE: removed `display_options`, but 
   # may re-add display toggles later to show/hide revenue, industry, etc.
   # display_options = { "revenue": False, "industry": False }
 
   if sort_by == "revenue":
-      return sorted(data, key=lambda x: x["revenue"], reverse=True)
+      # highest first; missing revenue (None, e.g. from the API) sorts last
+      with_rev = [b for b in data if b.get("revenue") is not None]
+      without = [b for b in data if b.get("revenue") is None]
+      return sorted(with_rev, key=lambda x: x["revenue"], reverse=True) + without
 
   elif sort_by == "industry":
       return sorted(data, key=lambda x: x["industry"].lower())
@@ -32,8 +107,11 @@ def sort_businesses(data, filters):
       return sorted(data, key=lambda x: x["business_name"].lower())
 
   elif sort_by == "distance":
-      print("** distance sort not implemented **")
-      return data
+      if not filters.get("origin"):
+          print("⚠️ Distance sort needs an origin (lat, lon). Leaving order unchanged.")
+          return data
+      # nearest first; businesses without coordinates last
+      return sort_by_distance(data, filters["origin"])
 
   return data
 
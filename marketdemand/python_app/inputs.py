@@ -14,9 +14,24 @@ def set_filter_options():
       "4": "distance"
   }
 
-  return {
+  filters = {
       "num_to_display": num,
       "industry": industry,
       "cities": cities,
       "sort_by": sort_map.get(sort_by, "business_name")
-  }
\ No newline at end of file
+  }
+
+  if filters["sort_by"] == "distance":
+      origin = input("Distance from (lat,lon): ").strip()
+      try:
+          lat, lon = (float(x) for x in origin.split(","))
+          filters["origin"] = (lat, lon)
+      except ValueError:
+          print("⚠️ Couldn't read that location; sorting by name instead.")
+          filters["sort_by"] = "business_name"
+          return filters
+      radius = input("Only within km (blank for no limit): ").strip()
+      if radius:
+          filters["radius_km"] = float(radius)
+
+  return filters
\ No newline at end of file
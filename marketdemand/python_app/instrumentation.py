@@ -0,0 +1,222 @@
+# instrumentation.py
+"""
+Per-stage timing spans and counters (off by default).
+
+    import instrumentation as instr
+    instr.enable()
+    with instr.span("fetch.business"):
+        ...
+    instr.count("cache.google_places.hit")
+    instr.dump_json("profile.json")      # or instr.dump_folded("profile.folded")
+
+When disabled, span() returns a shared no-op context and count() returns
+after one flag check, so leaving the calls in hot paths costs ~nothing.
+Nested spans are recorded by call path ("main;analyze;analyze.score"), which
+is also the folded-stack format flamegraph.pl / speedscope read.
+log() replaces the old [DEBUG]/[MODEL]/[INFO] prints: it only prints (and
+only formats its arguments) in verbose mode. Worker threads start with an
+empty span stack; wrap the callable with bind() to nest its spans under the
+span that submitted it.
+"""
+import functools
+import json
+import threading
+import time
+
+_enabled = False
+_verbose = False
+_lock = threading.Lock()
+_local = threading.local()
+_spans = {}      # "a;b;c" -> [calls, total_seconds, child_seconds]
+_counters = {}   # name -> number
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "path", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = _stack()
+        self.path = f"{stack[-1]};{self.name}" if stack else self.name
+        stack.append(self.path)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+        parent = stack[-1] if stack else None
+        with _lock:
+            entry = _spans.setdefault(self.path, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            if parent is not None:
+                _spans.setdefault(parent, [0, 0.0, 0.0])[2] += elapsed
+        return False
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+# ======================
+# SWITCHES
+# ======================
+def enable(verbose=None):
+    global _enabled, _verbose
+    _enabled = True
+    if verbose is not None:
+        _verbose = verbose
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def set_verbose(verbose=True):
+    global _verbose
+    _verbose = verbose
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+# ======================
+# RECORDING
+# ======================
+def span(name):
+    """Context manager timing one stage (no-op when disabled)."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator version of span()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Add n to a counter (no-op when disabled)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def bind(func):
+    """Wrap func so spans it opens (in any thread) nest under the current span."""
+    if not _enabled:
+        return func
+    stack = _stack()
+    if not stack:
+        return func
+    parent = stack[-1]
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        saved = getattr(_local, "stack", None)
+        _local.stack = [parent]
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.stack = saved
+    return wrapper
+
+
+def is_verbose():
+    return _verbose
+
+
+def log(message, *args):
+    """Debug output; printed only in verbose mode.
+
+    Arguments are str.format()-ed into message lazily, so a disabled log
+    costs one flag check: log("[DEBUG] income ${:,.2f}", income).
+    """
+    if _verbose:
+        print(message.format(*args) if args else message)
+
+
+# ======================
+# REPORTS
+# ======================
+def report():
+    """{"spans": [{path, calls, seconds, self_seconds}], "counters": {...}}"""
+    with _lock:
+        spans = [
+            {
+                "path": path,
+                "calls": calls,
+                "seconds": round(total, 6),
+                "self_seconds": round(max(0.0, total - children), 6),
+            }
+            for path, (calls, total, children) in _spans.items()
+            if calls
+        ]
+        counters = dict(_counters)
+    spans.sort(key=lambda s: s["path"])
+    return {"spans": spans, "counters": counters}
+
+
+def dump_json(file_path):
+    with open(file_path, "w") as f:
+        json.dump(report(), f, indent=2)
+
+
+def folded_stacks():
+    """flamegraph.pl input: 'a;b;c <self microseconds>' per line."""
+    lines = []
+    for s in report()["spans"]:
+        micros = int(s["self_seconds"] * 1_000_000)
+        if micros > 0:
+            lines.append(f"{s['path']} {micros}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def dump_folded(file_path):
+    with open(file_path, "w") as f:
+        f.write(folded_stacks())
+
+
+def dump(file_path):
+    """.json -> JSON report, anything else -> folded stacks."""
+    if file_path.endswith(".json"):
+        dump_json(file_path)
+    else:
+        dump_folded(file_path)
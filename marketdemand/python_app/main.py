@@ -1,30 +1,57 @@
+import os
+
+import instrumentation as instr
+from scheduler import ApiError
 from data_sources import (
     get_business_data,
     get_demographic_data,
     get_industry_data
 )
 from analyzer import analyze_market
-from renderer import render_results
+from exporters import analysis_path, check_renderer, export_renderer_for, render
 from filtering import filter_businesses, sort_businesses
+from business_index import BusinessIndex
 from inputs import set_filter_options
 
+# MDA_PROFILE=profile.json (or profile.folded) records per-stage timings + counters
+# MDA_VERBOSE=1 prints the [MODEL]/[DEBUG]/[INFO] model trace
+# MDA_EXPORT=results.csv(.gz) / .ndjson / .parquet also writes every sorted business + the analysis
+# MDA_RENDERER / MDA_EXPORT_RENDERER pick any renderer registered in exporters (default: terminal / from the path)
+PROFILE_PATH = os.environ.get("MDA_PROFILE")
+EXPORT_PATH = os.environ.get("MDA_EXPORT")
+RENDERER = os.environ.get("MDA_RENDERER", "terminal")
+EXPORT_RENDERER = os.environ.get("MDA_EXPORT_RENDERER")
+VERBOSE = os.environ.get("MDA_VERBOSE") == "1"
+
 # ============================
 # Control Flow
 # ============================
 def main():
     print("=== Market Demand Analyzer ===")
+    # 0. Check output settings before asking for anything
+    try:
+        check_renderer(RENDERER)
+        export_renderer = export_renderer_for(EXPORT_PATH, EXPORT_RENDERER) if EXPORT_PATH else None
+    except (ValueError, ImportError) as e:
+        print(f"\n⚠️ Invalid output settings (MDA_RENDERER / MDA_EXPORT / MDA_EXPORT_RENDERER): {e}")
+        return
     # 1. Collect filter options
     filter_options = set_filter_options()
     # 2. Load raw datasets
     biz_source = "api"  # <-- switch between "file" and "api"
     pop_source = "api"  # <-- switch between "file" and "api"
-    print(f"[SOURCES] businesses={biz_source}, demographics={pop_source}, industry=file")
-    business_data = get_business_data(
-        source=biz_source,
-        industry=filter_options["industry"],
-        cities=filter_options["cities"] 
-    )
-    population_data = get_demographic_data(source=pop_source)
+    instr.log("[SOURCES] businesses={}, demographics={}, industry=file", biz_source, pop_source)
+    try:
+        business_data = get_business_data(
+            source=biz_source,
+            industry=filter_options["industry"],
+            cities=filter_options["cities"]
+        )
+        population_data = get_demographic_data(source=pop_source)
+    except (ApiError, ValueError) as e:
+        print(f"\n⚠️ Could not load live data: {e}")
+        print("Switch biz_source / pop_source to \"file\" to analyze the SAMPLE data instead.")
+        return
     industry_data = get_industry_data()
     print(f"Data sources loaded: {len(business_data)} businesses, {len(population_data)} cities, {len(industry_data)} industries.")
     # 3. Fetch unified industry params
@@ -34,7 +61,9 @@ def main():
         return
     industry_params = industry_data[industry_key]
     # 4. Filter and sort businesses (UI layer)
-    filtered_business_data = filter_businesses(business_data, filter_options)
+    with instr.span("index"):
+        business_index = BusinessIndex(business_data)
+    filtered_business_data = filter_businesses(business_index, filter_options)
     sorted_list = sort_businesses(filtered_business_data, filter_options)
     limited_list = sorted_list[:filter_options["num_to_display"]]
     # 5. Full market analysis (now uses unified industry_params)
@@ -46,10 +75,21 @@ def main():
     )
     # 6. Render final output (business list + analysis summary)
     # ---------------------------------------
-    render_results(limited_list, analysis_results)
+    render(RENDERER, limited_list, analysis_results)
+    if EXPORT_PATH:
+        n = render(export_renderer, sorted_list, analysis_results, path=EXPORT_PATH)
+        print(f"Exported {n} businesses to {EXPORT_PATH} (analysis: {analysis_path(EXPORT_PATH)})")
 
 # ============================
 # RUN PROGRAM
 # ============================
 if __name__ == "__main__":
-    main()
+    instr.set_verbose(VERBOSE)
+    if PROFILE_PATH:
+        instr.enable()
+    try:
+        main()
+    finally:
+        if PROFILE_PATH:
+            instr.dump(PROFILE_PATH)
+            print(f"Profile written to {PROFILE_PATH}")
@@ -0,0 +1,142 @@
+# market_state.py
+"""
+Incremental scoring for one (industry, region).
+
+MarketState keeps the running aggregates analyze_market would compute
+(count, revenue sum, revenue coverage, revenue sketch) and rescores from
+them with analyzer.score_market, so each add / remove / population change
+costs O(1) instead of a rescan of every business.
+
+  state = MarketState.from_data(businesses, population, filters, industry_params)
+  state.add_business(new_row)
+  state.remove_business(closed_row)        # or its place_id
+  state.sync(refreshed_rows)               # apply only what changed
+  state.scores()["demand_score"]
+"""
+from aggregation import BusinessAccumulator
+from analyzer import aggregate_income, aggregate_population, place_lookup, score_market
+
+
+def business_key(business):
+    """Identity of a business: place_id, else (name, city) like fetch_business_api's dedupe."""
+    return business.get("place_id") or (
+        (business.get("business_name") or "").lower(), (business.get("city") or "").lower()
+    )
+
+
+def _key_of(business):
+    """business_key for a row (anything with .get), else the argument is already a key."""
+    return business_key(business) if hasattr(business, "get") else business
+
+
+class MarketState:
+    """
+    Running aggregates + scores for one market.
+    Businesses are tracked by business_key, so re-adding a known business
+    replaces it and remove_business accepts either the row or its key.
+    Only the revenue of each business is kept, not the row.
+    """
+
+    def __init__(
+        self,
+        industry_params,
+        total_population=0,
+        weighted_income=0,
+        businesses=(),
+        USE_DYNAMIC_SPC=True,
+        relative_accuracy=0.01
+    ):
+        self.industry_params = industry_params
+        self.total_population = total_population
+        self.weighted_income = weighted_income
+        self.USE_DYNAMIC_SPC = USE_DYNAMIC_SPC
+        self.accumulator = BusinessAccumulator(relative_accuracy)
+        self._revenue = {}    # business_key -> revenue as added
+        self._scores = None   # cached until the next change
+        for b in businesses:
+            self.add_business(b)
+
+    @classmethod
+    def from_data(cls, business_data, population_data, filters, industry_params, USE_DYNAMIC_SPC=True):
+        """Build from already filtered businesses + the demographic table (like analyze_market)."""
+        by_lower = place_lookup(population_data)
+        return cls(
+            industry_params,
+            total_population=aggregate_population(population_data, filters["cities"], by_lower=by_lower),
+            weighted_income=aggregate_income(population_data, filters["cities"], by_lower=by_lower),
+            businesses=business_data,
+            USE_DYNAMIC_SPC=USE_DYNAMIC_SPC
+        )
+
+    def __len__(self):
+        return self.accumulator.count
+
+    def __contains__(self, business):
+        return _key_of(business) in self._revenue
+
+    # ======================
+    # UPDATES (O(1) each)
+    # ======================
+    def add_business(self, business):
+        key = business_key(business)
+        if key in self._revenue:
+            self.remove_business(key)
+        revenue = business.get("revenue")
+        self._revenue[key] = revenue
+        self.accumulator.add({"revenue": revenue})
+        self._scores = None
+
+    def remove_business(self, business):
+        """Remove by row (dict / BusinessRow) or business_key; returns False if it wasn't tracked."""
+        key = _key_of(business)
+        if key not in self._revenue:
+            return False
+        self.accumulator.remove({"revenue": self._revenue.pop(key)})
+        self._scores = None
+        return True
+
+    def update_population(self, total_population, weighted_income=None):
+        self.total_population = total_population
+        if weighted_income is not None:
+            self.weighted_income = weighted_income
+        self._scores = None
+
+    def sync(self, businesses):
+        """
+        Make the tracked set equal to businesses (e.g. one Places refresh),
+        touching only rows that appeared, disappeared or changed revenue.
+        Returns {"added": n, "removed": n, "updated": n}.
+        """
+        latest = {business_key(b): b for b in businesses}
+        changes = {"added": 0, "removed": 0, "updated": 0}
+        for key in [k for k in self._revenue if k not in latest]:
+            self.remove_business(key)
+            changes["removed"] += 1
+        for key, b in latest.items():
+            if key not in self._revenue:
+                changes["added"] += 1
+            elif self._revenue[key] != b.get("revenue"):
+                changes["updated"] += 1
+            else:
+                continue
+            self.add_business(b)
+        return changes
+
+    # ======================
+    # SCORES
+    # ======================
+    def scores(self):
+        """Same keys as analyze_market (stats_dif from the revenue sketch)."""
+        if self._scores is None:
+            acc = self.accumulator
+            self._scores = score_market(
+                total_population=self.total_population,
+                weighted_income=self.weighted_income,
+                biz_count=acc.count,
+                current_rev=acc.revenue_sum,
+                revenue_coverage=acc.revenue_coverage,
+                industry_params=self.industry_params,
+                USE_DYNAMIC_SPC=self.USE_DYNAMIC_SPC
+            )
+            self._scores["stats_dif"] = acc.stats()
+        return dict(self._scores)
@@ -0,0 +1,273 @@
+# place_resolver.py
+"""
+One place -> one integer ID, whatever spelling it arrives in.
+
+Business rows ("Provo"), Census names ("Provo city"), parsed Places
+addresses ("155 S Freedom Blvd, Provo, UT 84601") and user input
+("provo, ut") all resolve to the same place ID through an alias table,
+so hot paths compare ints instead of re-lowercasing strings on every call.
+Every distinct raw string is resolved once and cached.
+
+The process-wide PLACES is seeded with the demographic table's places
+before its first lookup, and names it has to invent an ID for are keyed
+by their suffix-stripped form, so IDs don't depend on the order in which
+spellings show up.
+
+  PLACES.resolve("Provo city") == PLACES.resolve("provo")       # shared, grows on demand
+  PLACES.resolve_many(city_column)                               # int array, one lookup per distinct name
+  resolver = PlaceResolver.from_population(population, aliases={"slc": "salt lake city"})
+  resolver["SLC"]                                                # demographic record via alias
+"""
+import json
+import os
+import re
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+# Census place-type suffixes ("Provo city", "Eagle Mountain CDP")
+PLACE_SUFFIXES = [" city", " town", " metro township", " cdp", " village"]
+UNKNOWN = -1
+SEED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "sample_demographic_data.json")
+# Raw spellings remembered by resolve(); the memo is dropped when it fills up
+MAX_CACHED_SPELLINGS = 100_000
+
+_SPACES = re.compile(r"\s+")
+# "UT", "UT 84601", "UT 84601-1234": the state segment of a formattedAddress
+_STATE_SEGMENT = re.compile(r"^[A-Z]{2}(\s+\d{5}(-\d{4})?)?$")
+
+
+def clean_place(raw_name):
+    """Lowercase, trim, collapse whitespace, drop a ", state" tail."""
+    s = (raw_name or "").partition(",")[0]
+    return _SPACES.sub(" ", s).strip().lower()
+
+
+def strip_place_suffix(name):
+    """'provo city' -> 'provo' (suffixes tried in PLACE_SUFFIXES order, like normalize_place_name)."""
+    for suf in PLACE_SUFFIXES:
+        if name.endswith(suf):
+            name = name[: -len(suf)].strip()
+    return name
+
+
+def parse_address_city(address):
+    """
+    City from a Places formattedAddress (lowercased, "" if none):
+    the segment before "ST 12345", else the second segment.
+    """
+    segments = [s.strip() for s in (address or "").split(",")]
+    for i in range(len(segments) - 1, 0, -1):
+        if _STATE_SEGMENT.match(segments[i]):
+            return clean_place(segments[i - 1])
+    return clean_place(segments[1]) if len(segments) > 1 else ""
+
+
+def lookup_place(by_lower, name):
+    """Record for name in a place_lookup mapping, trying alias spellings; None if absent."""
+    if isinstance(by_lower, PlaceResolver):
+        return by_lower.get(name)
+    key = clean_place(name)
+    for candidate in _candidates(key):
+        record = by_lower.get(candidate)
+        if record is not None:
+            return record
+    return None
+
+
+def _candidates(key):
+    """
+    Spellings to try, in order: exact, suffix stripped. Suffixes are never
+    added ("park" must not become "park city"); register such spellings
+    with add_alias.
+    """
+    yield key
+    stripped = strip_place_suffix(key)
+    if stripped != key:
+        yield stripped
+
+
+class PlaceResolver(Mapping):
+    """
+    Alias table: cleaned spelling -> place ID, plus the canonical name and
+    (optional) demographic record of each ID.
+
+    resolve() tries the spelling, then its suffix-stripped form; a name
+    that matches nothing gets a new ID under its suffix-stripped form
+    (grow=True) or UNKNOWN. seed: callable returning place names, added
+    before the first lookup. As a Mapping it is canonical name -> record
+    for the places that have one, and analyzer.place_lookup uses it as-is.
+    """
+
+    normalized_keys = True
+
+    def __init__(self, grow=True, seed=None):
+        self.grow = grow
+        self._seed = seed
+        self.names = []      # id -> canonical name
+        self.records = []    # id -> demographic record (or None)
+        self._ids = {}       # cleaned alias -> id
+        self._cache = {}     # raw string -> id (at most MAX_CACHED_SPELLINGS)
+        self._size = 0       # places with a record
+        self.version = 0     # bumped when records / aliases change (analysis_cache keys)
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+
+    @classmethod
+    def from_population(cls, population_data, aliases=None, grow=False):
+        """Resolver over {place: record}; aliases maps extra spellings to place names."""
+        resolver = cls(grow=grow)
+        for name, record in population_data.items():
+            resolver.add_place(name, record)
+        for alias, name in (aliases or {}).items():
+            resolver.add_alias(alias, name)
+        return resolver
+
+    def __getstate__(self):  # picklable for worker processes (the lock is not)
+        self._seed_places()
+        state = dict(self.__dict__)
+        del state["_lock"], state["_seed_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+
+    # ======================
+    # BUILDING
+    # ======================
+    def add_place(self, name, record=None):
+        """ID of name (created if new); record replaces any previous one, like place_lookup."""
+        if self._seed is not None:
+            self._seed_places()
+        return self._add_place(name, record)
+
+    def _add_place(self, name, record):
+        key = clean_place(name)
+        with self._lock:
+            place_id = self._ids.get(key)
+            if place_id is None:
+                place_id = self._new_id(key)
+                self._cache.clear()  # cached spellings may now match this place exactly
+            if record is not None:
+                self._size += self.records[place_id] is None
+                self.records[place_id] = record
+                self.version += 1
+        return place_id
+
+    def add_alias(self, alias, name):
+        """Make alias resolve to name's place (KeyError if name is unknown)."""
+        place_id = self.resolve(name)
+        if place_id == UNKNOWN:
+            raise KeyError(name)
+        with self._lock:
+            self._ids[clean_place(alias)] = place_id
+            self._cache.clear()
+            self.version += 1
+        return place_id
+
+    def _seed_places(self):
+        """Add the seed's places once, before anything else gets an ID."""
+        with self._seed_lock:
+            if self._seed is None:
+                return
+            for name in self._seed():
+                self._add_place(name, None)
+            self._seed = None
+
+    def _new_id(self, key):
+        place_id = len(self.names)
+        self.names.append(key)
+        self.records.append(None)
+        self._ids[key] = place_id
+        return place_id
+
+    # ======================
+    # RESOLVING
+    # ======================
+    def resolve(self, raw_name):
+        """Place ID for a raw spelling (cached per distinct string)."""
+        place_id = self._cache.get(raw_name)
+        if place_id is not None:
+            return place_id
+        if self._seed is not None:
+            self._seed_places()
+        key = clean_place(raw_name)
+        place_id = self._match(key)
+        if place_id is None:
+            if not self.grow:
+                return UNKNOWN
+            with self._lock:
+                place_id = self._match(key)  # another thread may have added it
+                if place_id is None:
+                    # "lehi city" and "lehi" get one ID whichever comes first
+                    place_id = self._new_id(strip_place_suffix(key))
+                    self._ids[key] = place_id
+        if len(self._cache) >= MAX_CACHED_SPELLINGS:
+            self._cache = {}  # bounded: the process-wide PLACES sees every spelling ever fetched
+        self._cache[raw_name] = place_id
+        return place_id
+
+    def _match(self, key):
+        ids = self._ids
+        for candidate in _candidates(key):
+            place_id = ids.get(candidate)
+            if place_id is not None:
+                return place_id
+        return None
+
+    def resolve_many(self, names):
+        """Place IDs (int64 array) for an array of names; each distinct name resolved once."""
+        names = np.array([n or "" for n in names], dtype=str)
+        if not names.size:
+            return np.zeros(0, dtype=np.int64)
+        unique, inverse = np.unique(names, return_inverse=True)
+        ids = np.array([self.resolve(n) for n in unique.tolist()], dtype=np.int64)
+        return ids[inverse.reshape(-1)]
+
+    def ids_for(self, names):
+        """Set of place IDs for a filter's city list (UNKNOWN dropped)."""
+        return {i for i in (self.resolve(n) for n in names) if i != UNKNOWN}
+
+    def name_of(self, place_id):
+        return self.names[place_id]
+
+    # ======================
+    # MAPPING (canonical name -> record)
+    # ======================
+    def __getitem__(self, name):
+        place_id = self._lookup_id(name)
+        record = self.records[place_id] if place_id != UNKNOWN else None
+        if record is None:
+            raise KeyError(name)
+        return record
+
+    def _lookup_id(self, name):
+        """resolve() without creating an ID for a name nobody has seen."""
+        if self._seed is not None:
+            self._seed_places()
+        place_id = self._cache.get(name)
+        if place_id is None:
+            place_id = self._match(clean_place(name))
+        return UNKNOWN if place_id is None else place_id
+
+    def __iter__(self):
+        return (name for name, record in zip(self.names, self.records) if record is not None)
+
+    def __len__(self):
+        return self._size
+
+
+def demographic_place_names(file_path=SEED_FILE):
+    """Place names of a demographic JSON file (none if it is missing)."""
+    try:
+        with open(file_path, "r") as f:
+            return list(json.load(f))
+    except (OSError, ValueError):
+        return []
+
+
+# Process-wide resolver used by filtering / indexes (IDs are stable for the process)
+PLACES = PlaceResolver(seed=demographic_place_names)
@@ -0,0 +1,153 @@
+# ranking.py
+"""
+"Which cities show the highest market opportunity for a given industry?"
+
+rank_cities scores every place in the demographic data on its own (not as
+one combined aggregate) and returns the top K by demand score:
+  1. one pass over the industry's businesses -> per-city count / revenue
+  2. one vectorized score_markets_batch call over all places
+  3. optional population / confidence / income filters as array masks
+  4. heapq.nlargest over the survivors (no full sort)
+
+  python ranking.py cafes --top 10 --min-population 20000
+"""
+import argparse
+import heapq
+
+import numpy as np
+
+import instrumentation as instr
+from analyzer import BENCHMARK_INCOME, place_lookup
+from batch_scoring import score_markets_batch
+from filtering import filter_businesses
+from place_resolver import PLACES
+
+RESULT_FIELDS = (
+    "demand_score", "tam", "remaining_tam", "competition_norm", "rev_opp_score",
+    "confidence_score", "population", "weighted_income", "businesses", "spend_per_capita",
+)
+
+
+def city_aggregates(business_data, industry):
+    """One pass: {city (lowercase): [count, revenue_sum, revenue_count]} for one industry."""
+    per_city = {}
+    for b in filter_businesses(business_data, {"industry": industry, "cities": []}):
+        city = (b.get("city") or "").lower()
+        entry = per_city.get(city)
+        if entry is None:
+            entry = per_city[city] = [0, 0, 0]
+        entry[0] += 1
+        rev = b.get("revenue")
+        if rev is not None:
+            entry[1] += rev
+            if rev > 0:
+                entry[2] += 1
+    return per_city
+
+
+@instr.timed("rank")
+def rank_cities(
+    business_data,
+    population_data,
+    industry,
+    industry_params,
+    k=10,
+    min_population=None,
+    min_confidence=None,
+    min_income=None,
+    max_income=None,
+    USE_DYNAMIC_SPC=True
+):
+    """
+    Top k places for an industry by demand score (highest first).
+    Each place is scored exactly as analyze_market with cities=[place].
+    Returns a list of {"city", "rank", <RESULT_FIELDS>} dicts.
+    """
+    by_lower = place_lookup(population_data)
+    cities = list(by_lower.keys())
+    records = by_lower.values()
+    population = np.array([v["population"] for v in records], dtype=float)
+    income = np.array([v["avg_income"] for v in records], dtype=float)
+
+    with instr.span("rank.group"):
+        per_city = city_aggregates(business_data, industry)
+        # merge spellings of one place ("provo" / "Provo city") by place ID
+        by_id = {}
+        for city, entry in per_city.items():
+            merged = by_id.setdefault(PLACES.resolve(city), [0, 0, 0])
+            for i, v in enumerate(entry):
+                merged[i] += v
+    counts = np.zeros((3, len(cities)))
+    for j, place_id in enumerate(PLACES.resolve_many(cities).tolist()):
+        entry = by_id.get(place_id)
+        if entry is not None:
+            counts[:, j] = entry
+
+    with instr.span("rank.score"):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # same expression as aggregate_income for a single city
+            weighted_income = np.where(population > 0, (income * population) / population, 0.0)
+        scores = score_markets_batch(
+            population=population,
+            weighted_income=weighted_income,
+            biz_count=counts[0],
+            current_revenue=counts[1],
+            revenue_count=counts[2],
+            ideal_ppb=industry_params["ideal_ppb"],
+            spend_per_capita=industry_params["spend_per_capita"],
+            tam_weight=industry_params.get("tam_weight", 0.5),
+            rev_weight=industry_params.get("rev_weight", 0.2),
+            income_elasticity=industry_params.get("income_elasticity", 1.0),
+            benchmark_income=industry_params.get("benchmark_income", BENCHMARK_INCOME),
+            USE_DYNAMIC_SPC=USE_DYNAMIC_SPC
+        )
+
+    keep = np.ones(len(cities), dtype=bool)
+    if min_population is not None:
+        keep &= population >= min_population
+    if min_confidence is not None:
+        keep &= scores["confidence_score"] >= min_confidence
+    if min_income is not None:
+        keep &= weighted_income >= min_income
+    if max_income is not None:
+        keep &= weighted_income <= max_income
+
+    demand = scores["demand_score"]
+    with instr.span("rank.select"):
+        top = heapq.nlargest(k, np.flatnonzero(keep).tolist(), key=demand.__getitem__)
+    return [
+        dict({"city": cities[j], "rank": rank}, **{f: float(scores[f][j]) for f in RESULT_FIELDS})
+        for rank, j in enumerate(top, start=1)
+    ]
+
+
+def main(argv=None):
+    from data_sources import get_business_data, get_demographic_data, get_industry_data
+
+    parser = argparse.ArgumentParser(description="Rank cities by market opportunity for an industry.")
+    parser.add_argument("industry")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--min-population", type=int)
+    parser.add_argument("--min-confidence", type=float)
+    parser.add_argument("--min-income", type=float)
+    parser.add_argument("--max-income", type=float)
+    parser.add_argument("--static-spc", action="store_true", help="disable dynamic spend per capita")
+    args = parser.parse_args(argv)
+
+    industries = get_industry_data()
+    params = industries.get(args.industry.lower())
+    if params is None:
+        print(f"⚠️ Industry '{args.industry}' not found in industry_data.json.")
+        return
+    ranked = rank_cities(
+        get_business_data(), get_demographic_data(), args.industry, params,
+        k=args.top, min_population=args.min_population, min_confidence=args.min_confidence,
+        min_income=args.min_income, max_income=args.max_income, USE_DYNAMIC_SPC=not args.static_spc
+    )
+    for r in ranked:
+        print(f"{r['rank']:>3}. {r['city'].title():<24} demand {r['demand_score']:6.1f}  "
+              f"TAM ${r['tam']:,.0f}  businesses {int(r['businesses'])}  confidence {r['confidence_score']:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
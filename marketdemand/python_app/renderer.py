@@ -1,4 +1,7 @@
 # renderer.py
+import instrumentation as instr
+
+
 def render_bar(value, label, width=25, color=True):
     """
     Render a horizontal bar (0–100%) with color and qualitative label.
@@ -25,6 +28,7 @@ def render_bar(value, label, width=25, color=True):
     print(f"{label:<18} {value:6.1f}%  {bar_colored}  ({status})")
 
 
+@instr.timed("render")
 def render_results(business_list, analysis):
     """
     Dashboard-style results display.
@@ -0,0 +1,276 @@
+# scheduler.py
+"""
+Outbound request scheduling for the external APIs (Census, Places).
+
+Every HTTP call in data_sources goes through its API's RequestScheduler:
+  - token bucket: at most `rate` requests/s (bursts up to `burst`)
+  - daily quota: at most `daily_quota` calls per UTC day, then QuotaExceeded
+  - retries: 429 / 5xx / connection errors are retried with exponential
+    backoff + full jitter (Retry-After honoured), then ApiError is raised
+  - coalescing: identical requests already in flight share one call
+so failures surface as ApiError instead of looking like "no data".
+
+Limits default to unlimited (quotas depend on the API project); set them
+with configure_scheduler() or MDA_<API>_RATE / _BURST / _DAILY_QUOTA,
+e.g. MDA_PLACES_RATE=10 MDA_PLACES_DAILY_QUOTA=5000.
+
+  response = schedule("places", lambda: session.post(url, json=payload), key=("POST", url, payload))
+  scheduler_stats()   # {"places": {"requests", "retries", "throttled_s", ...}, "census": {...}}
+"""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import instrumentation as instr
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BASE_DELAY = 0.25
+DEFAULT_MAX_DELAY = 30.0
+
+
+class ApiError(Exception):
+    """An external API call that failed for good (after retries)."""
+
+    def __init__(self, api, message, status=None):
+        super().__init__(f"{api}: {message}")
+        self.api = api
+        self.status = status
+
+
+class QuotaExceeded(ApiError):
+    """The API's daily quota is used up; no request was sent."""
+
+
+class TokenBucket:
+    """`rate` tokens/s, holding at most `burst`; acquire() blocks until one is free."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token; returns the seconds spent waiting for it."""
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+            # reserve the token now (tokens may go negative), then wait out the deficit
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens) / self.rate
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class DailyQuota:
+    """At most `limit` calls per UTC day."""
+
+    def __init__(self, limit, clock=time.time):
+        self.limit = limit
+        self._clock = clock
+        self._day = None
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Use one call of today's budget; False if none is left."""
+        with self._lock:
+            day = time.strftime("%Y-%m-%d", time.gmtime(self._clock()))
+            if day != self._day:
+                self._day, self.used = day, 0
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        api,
+        rate=None,
+        burst=None,
+        daily_quota=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+        base_delay=DEFAULT_BASE_DELAY,
+        max_delay=DEFAULT_MAX_DELAY,
+        sleep=time.sleep,
+        rng=None
+    ):
+        self.api = api
+        self.bucket = TokenBucket(rate, burst, sleep=sleep) if rate else None
+        self.quota = DailyQuota(daily_quota) if daily_quota else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("requests", "calls", "retries", "rate_limited", "server_errors", "connection_errors",
+             "coalesced", "quota_rejections", "failures"), 0)
+        self._stats["throttled_s"] = 0.0
+        self._stats["backoff_s"] = 0.0
+
+    # ======================
+    # METRICS
+    # ======================
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+        instr.count(f"sched.{self.api}.{name}", n)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # ======================
+    # REQUESTS
+    # ======================
+    def request(self, send, key=None):
+        """
+        send() -> response (requests.Response-like), scheduled + retried.
+        Requests with the same key that are already in flight wait for that
+        call and get its response. Raises ApiError / QuotaExceeded on failure.
+        """
+        self._count("requests")
+        if key is None:
+            return self._send_with_retries(send)
+        key = _freeze(key)
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = Future()
+        if not leader:
+            self._count("coalesced")
+            return pending.result()
+        try:
+            response = self._send_with_retries(send)
+            pending.set_result(response)
+            return response
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _send_with_retries(self, send):
+        attempt = 0
+        while True:
+            if self.quota is not None and not self.quota.take():
+                self._count("quota_rejections")
+                raise QuotaExceeded(self.api, f"daily quota of {self.quota.limit} requests used up")
+            if self.bucket is not None:
+                waited = self.bucket.acquire()
+                if waited:
+                    self._count("throttled_s", waited)
+
+            self._count("calls")
+            retry_after = None
+            try:
+                response = send()
+            except OSError as e:  # includes requests' ConnectionError / Timeout
+                problem, status = f"{type(e).__name__}: {e}", None
+                self._count("connection_errors")
+            else:
+                status = response.status_code
+                if status not in RETRY_STATUSES:
+                    return response
+                problem = f"HTTP {status}"
+                self._count("rate_limited" if status == 429 else "server_errors")
+                retry_after = _retry_after(response)
+
+            if attempt >= self.max_retries:
+                self._count("failures")
+                raise ApiError(self.api, f"{problem} after {attempt + 1} attempts", status)
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            self._count("retries")
+            self._count("backoff_s", delay)
+            self._sleep(delay)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full jitter: uniform(0, min(max_delay, base * 2^attempt)); Retry-After wins if given."""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def _retry_after(response):
+    value = (getattr(response, "headers", None) or {}).get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _freeze(key):
+    """Hashable form of a key that may hold dicts / lists (request payloads)."""
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return json.dumps(key, sort_keys=True, default=str)
+
+
+# ======================
+# PER-API REGISTRY
+# ======================
+_schedulers = {}
+_registry_lock = threading.Lock()
+
+
+def _env_number(name):
+    value = os.environ.get(name)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        print(f"⚠️ Ignoring {name}={value!r} (not a number).")
+        return None
+
+
+def get_scheduler(api):
+    """The shared scheduler for an API, created from MDA_<API>_* settings on first use."""
+    with _registry_lock:
+        scheduler = _schedulers.get(api)
+        if scheduler is None:
+            prefix = f"MDA_{api.upper()}_"
+            quota = _env_number(prefix + "DAILY_QUOTA")
+            scheduler = _schedulers[api] = RequestScheduler(
+                api,
+                rate=_env_number(prefix + "RATE"),
+                burst=_env_number(prefix + "BURST"),
+                daily_quota=int(quota) if quota else None,
+            )
+        return scheduler
+
+
+def configure_scheduler(api, **options):
+    """Replace an API's scheduler (options as RequestScheduler); returns it."""
+    scheduler = RequestScheduler(api, **options)
+    with _registry_lock:
+        _schedulers[api] = scheduler
+    return scheduler
+
+
+def schedule(api, send, key=None):
+    """get_scheduler(api).request(send, key)."""
+    return get_scheduler(api).request(send, key)
+
+
+def scheduler_stats():
+    with _registry_lock:
+        schedulers = dict(_schedulers)
+    return {api: s.stats() for api, s in schedulers.items()}
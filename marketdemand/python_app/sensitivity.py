@@ -0,0 +1,130 @@
+# sensitivity.py
+"""
+Monte Carlo sensitivity of the demand score to the heuristic model inputs.
+
+The market aggregates (population, income, business count, revenue) are
+computed once; each draw only changes the industry parameters, so every
+draw is scored in one vectorized score_markets_batch call.
+
+  result = run_sensitivity(businesses, population, filters, industry_params,
+                           n_draws=100_000, seed=1)
+  result["bands"]["demand_score"]  # {"p5": .., "p25": .., "p50": .., "p75": .., "p95": ..}
+"""
+import numpy as np
+
+from aggregation import BusinessAccumulator
+from analyzer import BENCHMARK_INCOME, aggregate_income, aggregate_population, place_lookup, score_market
+from batch_scoring import score_markets_batch
+from business_table import BusinessTable
+
+# param -> (distribution, spread); the industry value is the center
+#   lognormal: median = value, sigma = spread (log space)
+#   normal:    sd = spread * value
+#   uniform:   value * (1 ± spread)
+#   fixed:     always value
+DEFAULT_SPREADS = {
+    "ideal_ppb": ("lognormal", 0.3),
+    "spend_per_capita": ("lognormal", 0.3),
+    "income_elasticity": ("normal", 0.15),
+    "tam_weight": ("uniform", 0.2),
+    "benchmark_income": ("lognormal", 0.15),
+}
+PERCENTILES = (5, 25, 50, 75, 95)
+BAND_FIELDS = ("demand_score", "tam", "remaining_tam", "spend_per_capita")
+
+
+def market_aggregates(business_data, population_data, cities):
+    """The score_market inputs for one (already filtered) market."""
+    if isinstance(business_data, BusinessTable):
+        revenue_count, current_revenue = business_data.revenue_stats()
+        biz_count = len(business_data)
+    else:
+        acc = BusinessAccumulator(track_distribution=False).add_all(business_data)
+        biz_count, current_revenue, revenue_count = acc.count, acc.revenue_sum, acc.revenue_positive
+    by_lower = place_lookup(population_data)
+    return {
+        "population": aggregate_population(population_data, cities, by_lower=by_lower),
+        "weighted_income": aggregate_income(population_data, cities, by_lower=by_lower),
+        "biz_count": biz_count,
+        "current_revenue": current_revenue,
+        "revenue_count": revenue_count,
+    }
+
+
+def sample_parameters(industry_params, n_draws, spreads=None, rng=None):
+    """{param: array of n_draws} drawn around the industry's values."""
+    rng = rng if rng is not None else np.random.default_rng()
+    spreads = dict(DEFAULT_SPREADS, **(spreads or {}))
+    centers = {
+        "ideal_ppb": industry_params["ideal_ppb"],
+        "spend_per_capita": industry_params["spend_per_capita"],
+        "income_elasticity": industry_params.get("income_elasticity", 1.0),
+        "tam_weight": industry_params.get("tam_weight", 0.5),
+        "benchmark_income": industry_params.get("benchmark_income", BENCHMARK_INCOME),
+    }
+
+    draws = {}
+    for name, center in centers.items():
+        kind, spread = spreads.get(name, ("fixed", 0.0))
+        center = float(center)
+        if kind == "lognormal" and center > 0:
+            values = center * np.exp(rng.normal(0.0, spread, n_draws))
+        elif kind == "normal":
+            values = rng.normal(center, abs(center) * spread, n_draws)
+        elif kind == "uniform":
+            values = rng.uniform(center * (1 - spread), center * (1 + spread), n_draws)
+        elif kind in ("fixed", "lognormal"):
+            values = np.full(n_draws, center)
+        else:
+            raise ValueError(f"Unknown distribution '{kind}' for {name}.")
+        draws[name] = values
+
+    # keep the weights meaningful: tam_weight + rev_weight <= 1
+    rev_weight = industry_params.get("rev_weight", 0.2)
+    draws["tam_weight"] = np.clip(draws["tam_weight"], 0.0, 1.0 - rev_weight)
+    return draws
+
+
+def run_sensitivity(
+    business_data,
+    population_data,
+    filters,
+    industry_params,
+    n_draws=100_000,
+    spreads=None,
+    seed=None,
+    USE_DYNAMIC_SPC=True,
+    percentiles=PERCENTILES
+):
+    """
+    Score n_draws parameter draws for one (industry, city set).
+    business_data: the filtered businesses (same as analyze_market).
+    spreads: overrides for DEFAULT_SPREADS, e.g. {"tam_weight": ("fixed", 0)}.
+    Returns {"draws", "baseline": score_market result at the industry's own
+    values, "bands": {field: {"p5": .., ...}}}.
+    """
+    agg = market_aggregates(business_data, population_data, filters["cities"])
+    revenue_coverage = (agg["revenue_count"] / agg["biz_count"]) if agg["biz_count"] else 0.0
+    baseline = score_market(
+        total_population=agg["population"],
+        weighted_income=agg["weighted_income"],
+        biz_count=agg["biz_count"],
+        current_rev=agg["current_revenue"],
+        revenue_coverage=revenue_coverage,
+        industry_params=industry_params,
+        USE_DYNAMIC_SPC=USE_DYNAMIC_SPC
+    )
+
+    draws = sample_parameters(industry_params, n_draws, spreads, np.random.default_rng(seed))
+    scores = score_markets_batch(
+        rev_weight=industry_params.get("rev_weight", 0.2),
+        USE_DYNAMIC_SPC=USE_DYNAMIC_SPC,
+        **agg,
+        **draws
+    )
+
+    bands = {}
+    for field in BAND_FIELDS:
+        values = np.percentile(scores[field], percentiles)
+        bands[field] = {f"p{p:g}": float(v) for p, v in zip(percentiles, values)}
+    return {"draws": n_draws, "baseline": baseline, "bands": bands}
@@ -0,0 +1,238 @@
+# service.py
+"""
+Long-running local analysis service (asyncio, stdlib only).
+
+Datasets are loaded and indexed once; requests are answered from memory
+(the filter / sort / score work runs in worker threads, so one large query
+doesn't stall other connections), and a background task reloads the datasets on an interval (in a worker
+thread) and swaps them in atomically, so requests never wait on a reload.
+
+  python service.py --port 8765 --refresh 600
+
+  GET  /health      dataset sizes + per-API request stats (retries, throttling)
+  POST /analyze     {"industry", "cities", "sort_by", "limit", "dynamic_spc", "exact_stats"}
+                    -> same result as a batch_runner query
+  POST /businesses  {"industry", "cities", "sort_by", "limit"} -> filtered + sorted rows
+  POST /rank        {"industry", "top", "min_population", "min_confidence",
+                     "min_income", "max_income", "dynamic_spc"}
+  POST /refresh     reload the datasets now
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import instrumentation as instr
+from batch_runner import _json_ready, build_datasets, int_option, normalize_query, run_query
+from filtering import filter_businesses, sort_businesses
+from ranking import rank_cities
+from scheduler import scheduler_stats
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class AnalysisService:
+    def __init__(self, business_file=None, demographic_source="file", refresh_interval=None):
+        self.business_file = business_file
+        self.demographic_source = demographic_source
+        self.refresh_interval = refresh_interval
+        self.datasets = None
+        self.loaded_at = None
+        self._refresh_lock = None
+        self._refresh_task = None
+
+    # ======================
+    # DATA
+    # ======================
+    async def refresh(self):
+        """Reload in a worker thread; requests keep using the old datasets until the swap."""
+        async with self._refresh_lock:
+            with instr.span("service.refresh"):
+                datasets = await asyncio.to_thread(instr.bind(build_datasets), self.business_file, self.demographic_source)
+            self.datasets = datasets  # single reference swap
+            self.loaded_at = time.time()
+            instr.count("service.refreshes")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ Dataset refresh failed (keeping previous data): {e}")
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Load the datasets, then start listening; returns the asyncio server."""
+        self._refresh_lock = asyncio.Lock()
+        await self.refresh()
+        if self.refresh_interval:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+
+    # ======================
+    # ROUTES
+    # ======================
+    async def route(self, method, path, body):
+        """(status, payload) for one request."""
+        datasets = self.datasets
+        if path == "/health":
+            return 200, {"status": "ok", "loaded_at": self.loaded_at,
+                         "businesses": len(datasets["businesses"]), "places": len(datasets["population"]),
+                         "apis": scheduler_stats()}
+        if path == "/refresh":
+            if method != "POST":
+                return 405, {"error": "POST required"}
+            await self.refresh()
+            return 200, {"status": "refreshed", "loaded_at": self.loaded_at}
+        if method != "POST":
+            return 405, {"error": "POST required"}
+
+        handler = {"/analyze": _analyze, "/businesses": _businesses, "/rank": _rank}.get(path)
+        if handler is None:
+            return 404, {"error": f"Unknown path {path}"}
+        return await asyncio.to_thread(instr.bind(handler), body, datasets)
+
+    # ======================
+    # HTTP/1.1 (keep-alive)
+    # ======================
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, close=True)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                close = (headers.get("connection", "").lower() == "close"
+                         or (version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive"))
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Body too large"}, close=True)
+                    break
+                raw = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._dispatch(method, target.split("?")[0], raw)
+                await self._respond(writer, status, payload, close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, raw):
+        instr.count("service.requests")
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                return 400, {"error": "Body must be a JSON object"}
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        try:
+            with instr.span(f"service{path.replace('/', '.')}"):
+                return await self.route(method, path, body)
+        except Exception as e:
+            instr.count("service.errors")
+            return 500, {"error": str(e)}
+
+    @staticmethod
+    async def _respond(writer, status, payload, close=False):
+        data = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+
+# ======================
+# HANDLERS (worker threads)
+# ======================
+def _analyze(body, datasets):
+    try:
+        query = normalize_query(body, body.get("id", 0))
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    result = run_query(query, datasets)
+    return (404 if "error" in result else 200), result
+
+
+def _businesses(body, datasets):
+    try:
+        query = normalize_query(body, 0)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    filters = {"industry": query["industry"], "cities": query["cities"], "sort_by": query["sort_by"]}
+    rows = sort_businesses(filter_businesses(datasets["businesses"], filters), filters)
+    return 200, {"businesses": _json_ready(list(rows[:query["num_to_display"]]))}
+
+
+def _rank(body, datasets):
+    industry = (body.get("industry") or "").strip()
+    params = datasets["industries"].get(industry.lower())
+    if params is None:
+        return 404, {"error": f"Industry '{industry.lower()}' not found in industry_data.json."}
+    try:
+        top = int_option(body, "top", 10)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    ranked = rank_cities(
+        datasets["businesses"], datasets["population"], industry, params,
+        k=top,
+        min_population=body.get("min_population"),
+        min_confidence=body.get("min_confidence"),
+        min_income=body.get("min_income"),
+        max_income=body.get("max_income"),
+        USE_DYNAMIC_SPC=bool(body.get("dynamic_spc", True))
+    )
+    return 200, {"industry": industry, "cities": _json_ready(ranked)}
+
+
+async def serve(host, port, **options):
+    service = AnalysisService(**options)
+    server = await service.start(host, port)
+    print(f"Market Demand Analyzer service on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve market analyses over HTTP from in-memory datasets.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--business-file", help="business JSON file (default: sample data)")
+    parser.add_argument("--demographics", choices=["file", "api"], default="file")
+    parser.add_argument("--refresh", type=float, help="reload datasets every N seconds")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, business_file=args.business_file,
+                          demographic_source=args.demographics, refresh_interval=args.refresh))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
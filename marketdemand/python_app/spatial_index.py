@@ -0,0 +1,193 @@
+# spatial_index.py
+"""
+KD-tree over business coordinates (lat / lon from Places `places.location`).
+
+Points are stored as 3-D unit vectors, so straight-line (chord) distance
+orders exactly like great-circle distance and the tree needs no special
+cases at the poles or the antimeridian. Every node keeps its bounding box;
+queries skip boxes that can't hold a match, so radius and k-nearest
+queries touch O(log n + matches) nodes.
+
+  index = SpatialIndex(businesses)                # build once per dataset
+  index.within(40.2338, -111.6585, radius_km=5)   # [(km, row), ...] nearest first
+  index.nearest(40.2338, -111.6585, k=10)
+  sort_by_distance(rows, (40.2338, -111.6585))    # any row list, no index needed
+"""
+import heapq
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 32
+
+
+def _unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _chord_for_km(km):
+    return 2 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def _km_for_chord(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+def coordinates(business_data):
+    """(lat, lon) float arrays for rows / a BusinessTable; NaN where missing."""
+    if hasattr(business_data, "numeric"):  # BusinessTable: columns already
+        lat, lat_missing = business_data.numeric("lat")
+        lon, lon_missing = business_data.numeric("lon")
+        missing = lat_missing | lon_missing
+        return np.where(missing, np.nan, lat), np.where(missing, np.nan, lon)
+    lat = np.array([_number(b.get("lat")) for b in business_data], dtype=float)
+    lon = np.array([_number(b.get("lon")) for b in business_data], dtype=float)
+    missing = np.isnan(lat) | np.isnan(lon)
+    lat[missing] = np.nan
+    lon[missing] = np.nan
+    return lat, lon
+
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return np.nan
+
+
+def distances_km(business_data, origin):
+    """Great-circle km from origin (lat, lon) to every row; NaN without coordinates."""
+    lat, lon = coordinates(business_data)
+    q = _unit_vectors(*origin)
+    return _km_for_chord(np.linalg.norm(_unit_vectors(lat, lon) - q, axis=1))
+
+
+def sort_by_distance(business_data, origin):
+    """Rows nearest first (stable); rows without coordinates go last."""
+    rows = business_data if isinstance(business_data, list) else list(business_data)
+    dist = distances_km(rows, origin)
+    order = np.argsort(np.where(np.isnan(dist), np.inf, dist), kind="stable")
+    return [rows[i] for i in order]
+
+
+def within_radius(business_data, origin, radius_km):
+    """Linear-scan radius filter (original order kept) for data without an index."""
+    rows = business_data if isinstance(business_data, list) else list(business_data)
+    dist = distances_km(rows, origin)
+    return [rows[i] for i in np.flatnonzero(dist <= radius_km)]
+
+
+class SpatialIndex:
+    """Static KD-tree over the rows that have coordinates (the rest are counted in .missing)."""
+
+    def __init__(self, business_data, leaf_size=LEAF_SIZE):
+        self.rows = business_data if isinstance(business_data, list) else list(business_data)
+        lat, lon = coordinates(self.rows)
+        has_coords = ~np.isnan(lat)
+        ids = np.flatnonzero(has_coords)
+        self.missing = int(len(self.rows) - len(ids))
+        points = _unit_vectors(lat[ids], lon[ids]).reshape(-1, 3)
+
+        # node arrays (lists while building)
+        self._start, self._end, self._left, self._right = [], [], [], []
+        self._lo, self._hi = [], []
+        order = np.arange(len(ids))
+        if len(ids):
+            self._build(points, order, 0, len(ids), leaf_size)
+        self.points = points[order]
+        self.row_ids = ids[order]
+
+    def _build(self, points, order, start, end, leaf_size):
+        node = len(self._start)
+        box = points[order[start:end]]
+        self._start.append(start)
+        self._end.append(end)
+        self._lo.append(tuple(box.min(axis=0).tolist()))
+        self._hi.append(tuple(box.max(axis=0).tolist()))
+        self._left.append(-1)
+        self._right.append(-1)
+        if end - start <= leaf_size:
+            return node
+        dim = int(np.argmax(np.subtract(self._hi[node], self._lo[node])))
+        mid = (start + end) // 2
+        segment = order[start:end]
+        order[start:end] = segment[np.argpartition(points[segment, dim], mid - start)]
+        self._left[node] = self._build(points, order, start, mid, leaf_size)
+        self._right[node] = self._build(points, order, mid, end, leaf_size)
+        return node
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def _box_distance(self, node, q):
+        """Lower bound on the chord distance from q to anything in node."""
+        total = 0.0
+        for qi, lo, hi in zip(q, self._lo[node], self._hi[node]):
+            gap = lo - qi if qi < lo else (qi - hi if qi > hi else 0.0)
+            total += gap * gap
+        return total ** 0.5
+
+    def _leaf_distances(self, node, q):
+        start, end = self._start[node], self._end[node]
+        return start, np.linalg.norm(self.points[start:end] - q, axis=1)
+
+    def query_radius(self, lat, lon, radius_km):
+        """(row_ids, km) arrays within radius_km of (lat, lon), nearest first."""
+        if not len(self.row_ids):
+            return np.array([], dtype=np.int64), np.array([])
+        q = _unit_vectors(lat, lon).tolist()
+        q_arr = np.array(q)
+        limit = _chord_for_km(radius_km)
+        hits, dists = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, q) > limit:
+                continue
+            if self._left[node] < 0:
+                start, d = self._leaf_distances(node, q_arr)
+                inside = np.flatnonzero(d <= limit)
+                hits.append(inside + start)
+                dists.append(d[inside])
+            else:
+                stack.append(self._left[node])
+                stack.append(self._right[node])
+        if not hits:
+            return np.array([], dtype=np.int64), np.array([])
+        row_ids = self.row_ids[np.concatenate(hits)]
+        chord = np.concatenate(dists)
+        order = np.lexsort((row_ids, chord))  # nearest first, ties by row order
+        return row_ids[order], _km_for_chord(chord[order])
+
+    def within(self, lat, lon, radius_km):
+        """[(km, row), ...] within radius_km of (lat, lon), nearest first."""
+        row_ids, km = self.query_radius(lat, lon, radius_km)
+        return [(k, self.rows[i]) for k, i in zip(km.tolist(), row_ids.tolist())]
+
+    def nearest(self, lat, lon, k=10):
+        """The k closest [(km, row), ...], nearest first."""
+        if k <= 0 or not len(self.row_ids):
+            return []
+        q = _unit_vectors(lat, lon).tolist()
+        q_arr = np.array(q)
+        best = []  # max-heap of (-chord, -row_id)
+        frontier = [(0.0, 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if self._left[node] < 0:
+                start, d = self._leaf_distances(node, q_arr)
+                for chord, row_id in zip(d.tolist(), self.row_ids[start:start + len(d)].tolist()):
+                    item = (-chord, -row_id)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+            else:
+                for child in (self._left[node], self._right[node]):
+                    heapq.heappush(frontier, (self._box_distance(child, q), child))
+        ranked = sorted((-c, -r) for c, r in best)
+        return [(float(_km_for_chord(c)), self.rows[r]) for c, r in ranked]
@@ -0,0 +1,374 @@
+# sql_backend.py
+"""
+Optional SQLite backend built from sql_analysis/schema.sql.
+
+Businesses, places and industries are bulk-loaded once into a local file;
+each analysis then runs the sums / counts / income weighting in SQL (over
+the (industry_id, city_id, annual_revenue) index) and only the aggregates
+reach Python, where analyzer.score_market turns them into scores.
+
+  python sql_backend.py build market.db --business-file big.ndjson
+  python sql_backend.py analyze market.db cafes Provo Orem
+
+Names match case-insensitively (COLLATE NOCASE), and city spellings
+("Provo city", "provo, UT") are resolved to a stored city the way
+PlaceResolver does, both when businesses are loaded and in filters.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+import instrumentation as instr
+from analyzer import score_market
+from data_sources import fetch_demographic_data, fetch_industry_data, iter_business_file
+from place_resolver import clean_place, lookup_place
+from validation import ValidationReport, iter_businesses, validate_demographics, validate_industries
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(BASE_DIR, "..", "sql_analysis", "schema.sql")
+
+INDUSTRY_COLUMNS = ("ideal_ppb", "spend_per_capita", "tam_weight", "rev_weight", "income_elasticity",
+                    "benchmark_income")
+SORT_COLUMNS = {
+    "revenue": "b.annual_revenue IS NULL, b.annual_revenue DESC",
+    "business_name": "b.name COLLATE NOCASE",
+    "industry": "i.name COLLATE NOCASE",
+}
+
+
+# ======================
+# DATABASE
+# ======================
+def connect(db_path):
+    """Open (and create, if new) an analysis database."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    with open(SCHEMA_PATH, "r") as f:
+        conn.executescript(f.read())
+    # databases built before a column was added to the schema
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(industries)")}
+    for column in INDUSTRY_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE industries ADD COLUMN {column} REAL")
+    return conn
+
+
+def _upsert_names(conn, table, names):
+    """Insert missing names; return {lower name: id} for them."""
+    names = list(names)
+    conn.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", ((n,) for n in names))
+    ids = {}
+    for start in range(0, len(names), 500):  # stay under SQLite's bound-variable limit
+        chunk = names[start:start + 500]
+        rows = conn.execute(f"SELECT name, id FROM {table} WHERE name IN ({','.join('?' * len(chunk))})", chunk)
+        ids.update((name.lower(), row_id) for name, row_id in rows)
+    return ids
+
+
+class _CityTable:
+    """lookup_place adapter over the cities table: cleaned spelling -> (id, name) or None."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get(self, name):
+        return self.conn.execute("SELECT id, name FROM cities WHERE name = ?", (name,)).fetchone()
+
+
+def resolve_cities(conn, cities):
+    """Filter spellings -> stored city names (unknown places are kept as given and match nothing)."""
+    table = _CityTable(conn)
+    resolved = []
+    for c in cities:
+        row = lookup_place(table, c)
+        resolved.append(row[1] if row is not None else (c or "").strip())
+    return resolved
+
+
+# ======================
+# BULK LOAD
+# ======================
+@instr.timed("sql.load.demographic")
+def load_demographics(conn, population_data):
+    """{place: {"population", "avg_income"}} -> cities (validated like get_demographic_data)."""
+    population_data, report = validate_demographics(population_data)
+    report.warn()
+    with conn:
+        conn.executemany(
+            "INSERT INTO cities (name, population, median_income) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET population = excluded.population, "
+            "median_income = excluded.median_income",
+            (
+                (name, v["population"], v["avg_income"])
+                for name, v in population_data.items()
+            )
+        )
+
+
+@instr.timed("sql.load.industry")
+def load_industries(conn, industry_data):
+    """{industry: params} -> industries (validated like get_industry_data)."""
+    industry_data, report = validate_industries(industry_data)
+    report.warn()
+    with conn:
+        conn.executemany(
+            f"INSERT INTO industries (name, {', '.join(INDUSTRY_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (len(INDUSTRY_COLUMNS) + 1))}) "
+            "ON CONFLICT (name) DO UPDATE SET "
+            + ", ".join(f"{c} = excluded.{c}" for c in INDUSTRY_COLUMNS),
+            (
+                (name, *(params.get(c) for c in INDUSTRY_COLUMNS))
+                for name, params in industry_data.items()
+            )
+        )
+
+
+@instr.timed("sql.load.business")
+def load_businesses(conn, business_data, batch_size=50_000):
+    """
+    Append businesses from any iterable (e.g. iter_business_file) in
+    batches, so the source never has to fit in memory. Rows are validated
+    on the way in (validation.clean_business), same as get_business_data.
+    City spellings resolve to an existing city like PlaceResolver; cities /
+    industries not seen yet are created (population 0).
+    Returns the number of rows loaded.
+    """
+    report = ValidationReport("business")
+    city_ids, industry_ids = {}, {}
+    city_table = _CityTable(conn)
+    loaded = 0
+    batch = []
+
+    def flush():
+        new_cities = {}
+        for spelling in {b["city"] for b in batch if b["city"].lower() not in city_ids}:
+            row = lookup_place(city_table, spelling)
+            if row is not None:
+                city_ids[spelling.lower()] = row[0]
+            else:
+                new_cities.setdefault(clean_place(spelling), []).append(spelling)
+        if new_cities:
+            created = _upsert_names(conn, "cities", new_cities)
+            for name, spellings in new_cities.items():
+                for spelling in spellings:
+                    city_ids[spelling.lower()] = created[name]
+        new_industries = {b["industry"] for b in batch if b["industry"].lower() not in industry_ids}
+        if new_industries:
+            industry_ids.update(_upsert_names(conn, "industries", new_industries))
+        conn.executemany(
+            "INSERT INTO businesses (name, city_id, industry_id, annual_revenue, place_id, rating, "
+            "user_ratings_total) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    b["business_name"],
+                    city_ids[b["city"].lower()],
+                    industry_ids[b["industry"].lower()],
+                    b["revenue"],
+                    b.get("place_id"),
+                    b.get("rating"),
+                    b.get("user_ratings_total"),
+                )
+                for b in batch
+            )
+        )
+        batch.clear()
+
+    with conn:
+        for b in iter_businesses(business_data, report):
+            batch.append(b)
+            if len(batch) >= batch_size:
+                loaded += len(batch)
+                flush()
+        loaded += len(batch)
+        if batch:
+            flush()
+    report.warn()
+    conn.execute("ANALYZE")
+    instr.count("sql.businesses_loaded", loaded)
+    return loaded
+
+
+def build_database(db_path, business_data, population_data, industry_data):
+    """Create db_path (replacing any old file) and load all three datasets."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = connect(db_path)
+    load_demographics(conn, population_data)
+    load_industries(conn, industry_data)
+    load_businesses(conn, business_data)
+    return conn
+
+
+# ======================
+# AGGREGATES (in SQL)
+# ======================
+def _business_where(industry, cities):
+    """(["... = ?", ...], params) selecting one industry's businesses in cities."""
+    where, params = [], []
+    if industry:
+        where.append("b.industry_id = (SELECT id FROM industries WHERE name = ?)")
+        params.append(industry.strip())
+    if cities:
+        where.append(f"b.city_id IN (SELECT id FROM cities WHERE name IN ({','.join('?' * len(cities))}))")
+        params.extend(cities)
+    return where, params
+
+
+@instr.timed("sql.aggregate")
+def market_aggregates(conn, industry, cities):
+    """
+    score_market inputs for an industry across cities (empty = all):
+    {"population", "weighted_income", "biz_count", "current_revenue",
+     "revenue_count", "revenue_n"} - the same numbers analyze_market computes in Python.
+    """
+    cities = resolve_cities(conn, cities or [])
+    if cities:
+        # VALUES keeps repeated cities repeated, like aggregate_population's loop
+        wanted = ",".join("(?)" for _ in cities)
+        pop_sql = (f"WITH wanted(name) AS (VALUES {wanted}) SELECT {{}} "
+                   "FROM wanted w JOIN cities c ON c.name = w.name")
+        pop_params = cities
+    else:
+        pop_sql, pop_params = "SELECT {} FROM cities c", []
+    total_pop, income_x_pop = conn.execute(
+        pop_sql.format("COALESCE(SUM(c.population), 0), "
+                       "COALESCE(SUM(COALESCE(c.median_income, 0) * c.population), 0)"),
+        pop_params
+    ).fetchone()
+
+    where, params = _business_where(industry, cities)
+    biz_count, revenue_sum, revenue_n, revenue_count = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(b.annual_revenue), 0), COUNT(b.annual_revenue), "
+        "COALESCE(SUM(b.annual_revenue > 0), 0) FROM businesses b"
+        + (" WHERE " + " AND ".join(where) if where else ""),
+        params
+    ).fetchone()
+
+    return {
+        "population": total_pop,
+        "weighted_income": income_x_pop / total_pop if total_pop else 0,
+        "biz_count": biz_count,
+        "current_revenue": revenue_sum,
+        "revenue_count": revenue_count,
+        "revenue_n": revenue_n,
+    }
+
+
+def _revenue_median(conn, industry, cities, revenue_n):
+    """Exact median of the non-null revenues (same as pandas .median())."""
+    if not revenue_n:
+        return float("nan")
+    where, params = _business_where(industry, resolve_cities(conn, cities or []))
+    clauses = ["b.annual_revenue IS NOT NULL"] + where
+    rows = conn.execute(
+        f"SELECT b.annual_revenue FROM businesses b WHERE {' AND '.join(clauses)} "
+        "ORDER BY b.annual_revenue LIMIT ? OFFSET ?",
+        params + [2 - revenue_n % 2, (revenue_n - 1) // 2]
+    ).fetchall()
+    return sum(r[0] for r in rows) / len(rows)
+
+
+def get_industry_params(conn, industry):
+    """Industry params from the database (None if unknown)."""
+    row = conn.execute(
+        f"SELECT {', '.join(INDUSTRY_COLUMNS)} FROM industries WHERE name = ?", (industry.strip(),)
+    ).fetchone()
+    if row is None or row[0] is None:
+        return None
+    return {k: v for k, v in zip(INDUSTRY_COLUMNS, row) if v is not None}
+
+
+@instr.timed("sql.analyze")
+def analyze_market_sql(conn, filters, industry_params=None, USE_DYNAMIC_SPC=True):
+    """
+    analyze_market over the database: same result keys, but the businesses
+    never leave SQLite. industry_params defaults to the industries table.
+    """
+    industry_params = industry_params or get_industry_params(conn, filters["industry"])
+    if industry_params is None:
+        raise KeyError(f"Industry '{filters['industry']}' has no parameters in the database.")
+
+    agg = market_aggregates(conn, filters["industry"], filters["cities"])
+    biz_count = agg["biz_count"]
+    results = score_market(
+        total_population=agg["population"],
+        weighted_income=agg["weighted_income"],
+        biz_count=biz_count,
+        current_rev=agg["current_revenue"],
+        revenue_coverage=(agg["revenue_count"] / biz_count) if biz_count else 0.0,
+        industry_params=industry_params,
+        USE_DYNAMIC_SPC=USE_DYNAMIC_SPC
+    )
+    results["stats_dif"] = {
+        "average_revenue": (agg["current_revenue"] / agg["revenue_n"]) if agg["revenue_n"] else float("nan"),
+        "median_revenue": _revenue_median(conn, filters["industry"], filters["cities"], agg["revenue_n"]),
+        "count": biz_count
+    }
+    return results
+
+
+def query_businesses(conn, filters, limit=None):
+    """Matching businesses as dicts (same shape as the JSON rows), sorted by filters["sort_by"]."""
+    where, params = [], []
+    if filters.get("industry"):
+        where.append("i.name = ?")
+        params.append(filters["industry"].strip())
+    cities = resolve_cities(conn, filters.get("cities") or [])
+    if cities:
+        where.append(f"c.name IN ({','.join('?' * len(cities))})")
+        params.extend(cities)
+    order = SORT_COLUMNS.get(filters.get("sort_by"), "b.id")
+    sql = (
+        "SELECT b.name, c.name, i.name, b.annual_revenue, b.place_id, b.rating, b.user_ratings_total "
+        "FROM businesses b JOIN cities c ON c.id = b.city_id JOIN industries i ON i.id = b.industry_id"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + f" ORDER BY {order}, b.id"
+        + (" LIMIT ?" if limit is not None else "")
+    )
+    if limit is not None:
+        params.append(int(limit))
+    keys = ("business_name", "city", "industry", "revenue", "place_id", "rating", "user_ratings_total")
+    return [dict(zip(keys, row)) for row in conn.execute(sql, params)]
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite backend for the Market Demand Analyzer.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="load JSON / NDJSON data into a database")
+    build.add_argument("db")
+    build.add_argument("--business-file", help="business .json / .ndjson (default: sample data)")
+    build.add_argument("--demographic-file")
+    build.add_argument("--industry-file")
+    analyze = sub.add_parser("analyze", help="score one industry over cities (all if none given)")
+    analyze.add_argument("db")
+    analyze.add_argument("industry")
+    analyze.add_argument("cities", nargs="*")
+    analyze.add_argument("--static-spc", action="store_true", help="disable dynamic spend per capita")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        business_file = args.business_file or os.path.join(BASE_DIR, "..", "data", "sample_business_data.json")
+        conn = build_database(
+            args.db,
+            iter_business_file(business_file, validate=False),  # load_businesses validates
+            fetch_demographic_data(args.demographic_file),
+            fetch_industry_data(args.industry_file)
+        )
+        count = conn.execute("SELECT COUNT(*) FROM businesses").fetchone()[0]
+        print(f"Loaded {count} businesses into {args.db}")
+    else:
+        conn = connect(args.db)
+        filters = {"industry": args.industry, "cities": args.cities}
+        result = analyze_market_sql(conn, filters, USE_DYNAMIC_SPC=not args.static_spc)
+        json.dump(result, sys.stdout, indent=2, default=float)
+        print()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# sweeps.py
+"""
+"What if" sweeps: every industry × every window of neighbouring cities ×
+dynamic SPC on / off, spread over a process pool.
+
+Cities are taken in neighbour order (the demographic table's order unless
+a list is passed), and a scenario's region is a contiguous window of that
+order. The per-(industry, city) aggregates are prefix-summed once and
+placed in one shared-memory block: workers attach to it instead of
+receiving pickled dicts, each scenario's aggregates are two subtractions,
+and each chunk of scenarios is scored with one score_markets_batch call.
+Results stream back as chunks finish (completion order).
+
+  for r in run_sweep(businesses, population, industries, max_window=3, workers=8):
+      r["industry"], r["cities"], r["dynamic_spc"], r["demand_score"]
+
+  python sweeps.py --max-window 3 --workers 8 --out sweep.ndjson.gz
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import instrumentation as instr
+from analyzer import place_lookup
+from batch_scoring import build_market_matrix, industry_param_arrays, score_markets_batch
+from place_resolver import lookup_place
+from ranking import RESULT_FIELDS
+
+CHUNK_SIZE = 4096
+PARAM_FIELDS = ("ideal_ppb", "spend_per_capita", "tam_weight", "rev_weight", "income_elasticity",
+                "benchmark_income")
+
+
+# ======================
+# AGGREGATES
+# ======================
+def build_sweep_arrays(business_data, population_data, industry_data, cities=None):
+    """
+    Prefix sums over the city order, so any window [start, stop) is
+    cum[stop] - cum[start]. Returns (arrays, industries, cities).
+    """
+    by_lower = place_lookup(population_data)
+    if cities is None:
+        ordered_population = dict(by_lower.items())
+    else:
+        ordered_population = {}
+        for c in cities:
+            record = lookup_place(by_lower, c)
+            if record is None:
+                print(f"⚠️ No demographic data for '{c}'; left out of the sweep.")
+            else:
+                ordered_population[c] = record
+    matrix = build_market_matrix(business_data, ordered_population, industry_data)
+
+    population = matrix["population"]
+    income = np.array([v["avg_income"] for v in ordered_population.values()], dtype=float)
+
+    def prefix(values):
+        values = np.asarray(values, dtype=float)
+        zeros = np.zeros(values.shape[:-1] + (1,))
+        return np.concatenate([zeros, np.cumsum(values, axis=-1)], axis=-1)
+
+    arrays = {
+        "cum_population": prefix(population),
+        "cum_income_pop": prefix(income * population),  # aggregate_income numerator
+        "cum_biz_count": prefix(matrix["biz_count"]),
+        "cum_revenue": prefix(matrix["current_revenue"]),
+        "cum_revenue_count": prefix(matrix["revenue_count"]),
+    }
+    params = industry_param_arrays(industry_data, matrix["industries"])
+    for name in PARAM_FIELDS:
+        arrays[name] = params[name].ravel()
+    return arrays, matrix["industries"], matrix["cities"]
+
+
+def city_windows(n_cities, max_window):
+    """All [start, stop) windows of 1..max_window neighbouring cities."""
+    return [(start, start + size)
+            for size in range(1, max_window + 1)
+            for start in range(n_cities - size + 1)]
+
+
+def sweep_scenarios(n_industries, windows, spc_options=(True, False)):
+    """(n, 4) int64 array of (industry, start, stop, dynamic_spc) rows."""
+    rows = [(i, start, stop, int(spc))
+            for i in range(n_industries)
+            for start, stop in windows
+            for spc in spc_options]
+    return np.array(rows, dtype=np.int64).reshape(-1, 4)
+
+
+def score_scenarios(arrays, scenarios):
+    """Score a block of scenarios in one vectorized pass -> {field: 1-D array}."""
+    ind, start, stop = scenarios[:, 0], scenarios[:, 1], scenarios[:, 2]
+    dynamic = scenarios[:, 3].astype(bool)
+
+    def window(name):
+        cum = arrays[name]
+        if cum.ndim == 1:
+            return cum[stop] - cum[start]
+        return cum[ind, stop] - cum[ind, start]
+
+    population = window("cum_population")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted_income = np.where(population > 0, window("cum_income_pop") / population, 0.0)
+    inputs = dict(
+        population=population,
+        weighted_income=weighted_income,
+        biz_count=window("cum_biz_count"),
+        current_revenue=window("cum_revenue"),
+        revenue_count=window("cum_revenue_count"),
+        **{name: arrays[name][ind] for name in PARAM_FIELDS}
+    )
+
+    out = {}
+    for spc in (True, False):
+        rows = np.flatnonzero(dynamic == spc)
+        if not len(rows):
+            continue
+        scores = score_markets_batch(USE_DYNAMIC_SPC=spc, **{k: v[rows] for k, v in inputs.items()})
+        for field in RESULT_FIELDS:
+            out.setdefault(field, np.empty(len(scenarios)))[rows] = scores[field]
+    return out
+
+
+# ======================
+# SHARED MEMORY
+# ======================
+class SharedArrays:
+    """A dict of float64 / int64 arrays packed into one shared-memory block."""
+
+    def __init__(self, shm, layout, owner):
+        self.shm = shm
+        self.layout = layout  # name -> (offset, shape, dtype)
+        self.owner = owner
+        self.arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()
+        }
+
+    @classmethod
+    def create(cls, arrays):
+        layout, offset = {}, 0
+        for name, a in arrays.items():
+            a = np.ascontiguousarray(a)
+            layout[name] = (offset, a.shape, a.dtype.str)
+            offset += (a.nbytes + 7) & ~7
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        shared = cls(shm, layout, owner=True)
+        for name, a in arrays.items():
+            shared.arrays[name][...] = a
+        return shared
+
+    @classmethod
+    def attach(cls, name, layout):
+        # pool workers share the parent's resource tracker, so attaching
+        # registers nothing new; only the creating process unlinks the block
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, layout, owner=False)
+
+    @property
+    def spec(self):
+        """What a worker needs to attach: (name, layout)."""
+        return self.shm.name, self.layout
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+_shared = None
+
+
+def _init_worker(name, layout):
+    global _shared
+    _shared = SharedArrays.attach(name, layout)
+
+
+def _score_chunk(lo, hi):
+    arrays = _shared.arrays
+    return lo, hi, score_scenarios(arrays, arrays["scenarios"][lo:hi])
+
+
+# ======================
+# RUNNER
+# ======================
+def run_sweep(
+    business_data,
+    population_data,
+    industry_data,
+    cities=None,
+    max_window=3,
+    spc_options=(True, False),
+    workers=None,
+    chunk_size=CHUNK_SIZE
+):
+    """
+    Yield one result per scenario as its chunk finishes:
+    {"industry", "cities", "dynamic_spc", <ranking.RESULT_FIELDS>}.
+    Each equals analyze_market over the window's cities. workers=1 runs in-process.
+    """
+    with instr.span("sweep.prepare"):
+        arrays, industries, city_names = build_sweep_arrays(business_data, population_data, industry_data, cities)
+        windows = city_windows(len(city_names), max_window)
+        arrays["scenarios"] = sweep_scenarios(len(industries), windows, spc_options)
+    total = len(arrays["scenarios"])
+    chunks = [(lo, min(lo + chunk_size, total)) for lo in range(0, total, chunk_size)]
+
+    def results(lo, hi, scores):
+        instr.count("sweep.scenarios", hi - lo)
+        columns = {f: scores[f].tolist() for f in RESULT_FIELDS}
+        for k, (i, start, stop, spc) in enumerate(arrays["scenarios"][lo:hi].tolist()):
+            result = {"industry": industries[i], "cities": city_names[start:stop], "dynamic_spc": bool(spc)}
+            for f in RESULT_FIELDS:
+                result[f] = columns[f][k]
+            yield result
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        for lo, hi in chunks:
+            yield from results(lo, hi, score_scenarios(arrays, arrays["scenarios"][lo:hi]))
+        return
+
+    shared = SharedArrays.create(arrays)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=shared.spec)
+    try:
+        futures = [pool.submit(_score_chunk, lo, hi) for lo, hi in chunks]
+        for future in as_completed(futures):
+            yield from results(*future.result())
+    finally:
+        pool.shutdown(cancel_futures=True)  # consumer may stop early
+        shared.close()
+
+
+def main(argv=None):
+    from data_sources import get_business_data, get_demographic_data, get_industry_data
+    from exporters import export_rows
+
+    parser = argparse.ArgumentParser(description="Score every industry × neighbouring-city window × SPC mode.")
+    parser.add_argument("--max-window", type=int, default=3, help="largest group of neighbouring cities")
+    parser.add_argument("--cities", help="comma separated city order (default: demographic data order)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default="-", help="results file (.csv / .ndjson / .parquet, .gz ok); default stdout")
+    args = parser.parse_args(argv)
+
+    cities = [c.strip() for c in args.cities.split(",")] if args.cities else None
+    results = run_sweep(get_business_data(), get_demographic_data(), get_industry_data(),
+                        cities=cities, max_window=args.max_window, workers=args.workers)
+    columns = ("industry", "cities", "dynamic_spc") + RESULT_FIELDS
+    fmt = "ndjson" if args.out == "-" else None
+    n = export_rows(results, args.out, columns, fmt=fmt)
+    print(f"{n} scenarios scored.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+# transport.py
+"""
+Pluggable HTTP transport for the Places / Census fetchers.
+
+data_sources sends every request through an object with requests.Session's
+get / post signature. By default that is a pooled requests.Session;
+instead it can be:
+  RecordingTransport  live requests, each response also saved as a fixture file
+  ReplayTransport     responses served from fixture files (no network at all)
+and FakeApiServer is a local stand-in for Places searchText + ACS with
+configurable latency, error rate and page size, for offline load tests of
+the concurrency / caching / retry code.
+
+  MDA_HTTP_MODE=record MDA_HTTP_FIXTURES=fixtures/ python main.py   # capture once
+  MDA_HTTP_MODE=replay MDA_HTTP_FIXTURES=fixtures/ python main.py   # then offline
+
+  with FakeApiServer(latency=0.05, error_rate=0.1) as fake:
+      fetch_demographic_api("49", base_url=fake.census_url)
+
+  python transport.py serve --port 8900 --latency 0.05 --error-rate 0.05
+  MDA_PLACES_URL=http://127.0.0.1:8900/v1/places:searchText \
+  MDA_CENSUS_URL=http://127.0.0.1:8900/data/2022/acs/acs5 python main.py
+
+Fixture keys hash method + URL + params + JSON body + field mask; API keys
+are never part of a key and never written to a fixture.
+"""
+import argparse
+import hashlib
+import http.server
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from requests.structures import CaseInsensitiveDict
+
+MODE_ENV = "MDA_HTTP_MODE"
+FIXTURES_ENV = "MDA_HTTP_FIXTURES"
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "http_fixtures")
+SECRET_PARAMS = {"key"}
+SECRET_HEADERS = {"x-goog-api-key"}
+KEY_HEADERS = ("x-goog-fieldmask",)
+
+
+class FixtureNotFound(LookupError):
+    """Replay mode got a request that was never recorded."""
+
+
+class FixtureResponse:
+    """The parts of requests.Response the fetchers use."""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def request_fingerprint(method, url, params=None, json_body=None, headers=None):
+    """Stable id of a request, secrets excluded."""
+    parsed = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(parsed.query) + sorted((params or {}).items())
+    query = sorted((k, str(v)) for k, v in query if k not in SECRET_PARAMS)
+    lowered = {k.lower(): v for k, v in (headers or {}).items()}
+    described = {
+        "method": method.upper(),
+        "url": f"{parsed.scheme}://{parsed.netloc}{parsed.path}",
+        "params": query,
+        "json": json_body,
+        "headers": {h: lowered.get(h) for h in KEY_HEADERS if h in lowered},
+    }
+    digest = hashlib.sha1(json.dumps(described, sort_keys=True).encode()).hexdigest()
+    return digest, described
+
+
+def _fixture_path(folder, digest):
+    return os.path.join(folder, f"{digest}.json")
+
+
+class RecordingTransport:
+    """Send live requests through `session` and save every response as a fixture."""
+
+    def __init__(self, fixtures_dir, session=None):
+        import requests
+
+        self.fixtures_dir = fixtures_dir
+        self.session = session or requests.Session()
+        self.recorded = 0
+        self._lock = threading.Lock()
+        os.makedirs(fixtures_dir, exist_ok=True)
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+        self._save("GET", url, params, None, headers, response)
+        return response
+
+    def post(self, url, json=None, headers=None, timeout=None, **kwargs):
+        response = self.session.post(url, json=json, headers=headers, timeout=timeout, **kwargs)
+        self._save("POST", url, None, json, headers, response)
+        return response
+
+    def _save(self, method, url, params, json_body, headers, response):
+        digest, described = request_fingerprint(method, url, params, json_body, headers)
+        fixture = {
+            "request": described,
+            "status": response.status_code,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "body": response.content.decode("utf-8", errors="replace"),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.fixtures_dir, prefix=".tmp_", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(fixture, f, indent=1)
+            os.replace(tmp_path, _fixture_path(self.fixtures_dir, digest))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self.recorded += 1
+
+
+class ReplayTransport:
+    """Serve recorded fixtures; an unrecorded request raises FixtureNotFound."""
+
+    def __init__(self, fixtures_dir, latency=0.0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._loaded = {}
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        return self._replay("GET", url, params, None, headers)
+
+    def post(self, url, json=None, headers=None, timeout=None, **kwargs):
+        return self._replay("POST", url, None, json, headers)
+
+    def _replay(self, method, url, params, json_body, headers):
+        digest, described = request_fingerprint(method, url, params, json_body, headers)
+        fixture = self._loaded.get(digest)
+        if fixture is None:
+            try:
+                with open(_fixture_path(self.fixtures_dir, digest)) as f:
+                    fixture = json.load(f)
+            except FileNotFoundError:
+                raise FixtureNotFound(f"No recorded response for {described['method']} {described['url']} "
+                                      f"{described['params'] or described['json']}")
+            self._loaded[digest] = fixture
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.replayed += 1
+        return FixtureResponse(fixture["status"], fixture["headers"], fixture["body"].encode())
+
+
+# ======================
+# ACTIVE TRANSPORT
+# ======================
+_active = None
+_configured = False
+_active_lock = threading.Lock()
+
+
+def set_transport(transport):
+    """Route data_sources HTTP through transport (None = live pooled session)."""
+    global _active, _configured
+    with _active_lock:
+        _active = transport
+        _configured = True
+
+
+def active_transport():
+    """The transport set in code, else the one MDA_HTTP_MODE asks for, else None (live)."""
+    global _active, _configured
+    with _active_lock:
+        if not _configured:
+            mode = os.environ.get(MODE_ENV, "live").lower()
+            folder = os.environ.get(FIXTURES_ENV, DEFAULT_FIXTURES)
+            if mode == "record":
+                _active = RecordingTransport(folder)
+            elif mode == "replay":
+                _active = ReplayTransport(folder)
+            elif mode != "live":
+                print(f"⚠️ Unknown {MODE_ENV}={mode!r}; using live HTTP.")
+            _configured = True
+        return _active
+
+
+# ======================
+# FAKE PLACES + ACS SERVER
+# ======================
+STATE_NAMES = {"49": "Utah", "06": "California", "17": "Illinois", "29": "Missouri", "48": "Texas"}
+
+
+class FakeApiServer:
+    """
+    Local Places searchText (POST .../v1/places:searchText) and ACS
+    (GET .../data/2022/acs/acs5) stand-in. Results are deterministic per
+    query; latency (seconds, + up to `jitter`), error_rate (share of 500 /
+    429 answers, seeded) and page_size are adjustable while it runs.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 page_size=20, places_per_query=60, places_per_state=200, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.places_per_query = places_per_query
+        self.places_per_state = places_per_state
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.active = 0
+        self.peak = 0
+        self._server = http.server.ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def places_url(self):
+        return f"{self.url}/v1/places:searchText"
+
+    @property
+    def census_url(self):
+        return f"{self.url}/data/2022/acs/acs5"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors, "peak_concurrency": self.peak}
+
+    # ---- request handling ----
+    def _begin(self):
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            failure = None
+            if self.error_rate and self._rng.random() < self.error_rate:
+                failure = self._rng.choice([500, 429])
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        return failure
+
+    def _end(self):
+        with self._lock:
+            self.active -= 1
+
+    def places_page(self, body):
+        """searchText response for a request body (viewport lookups included)."""
+        query = body.get("textQuery", "")
+        city = query.split(" in ")[-1].split(",")[0].strip() or "Provo"
+        seed = int(hashlib.sha1(city.lower().encode()).hexdigest()[:8], 16)
+        lat0, lon0 = 37.0 + (seed % 400) / 100, -114.0 + (seed // 400 % 500) / 100
+        viewport = {"low": {"latitude": lat0, "longitude": lon0},
+                    "high": {"latitude": lat0 + 0.2, "longitude": lon0 + 0.2}}
+        if body.get("_viewport"):
+            return {"places": [{"viewport": viewport}]}
+
+        slug = "-".join(query.lower().split())
+        places = []
+        for n in range(self.places_per_query):
+            h = int(hashlib.sha1(f"{slug}/{n}".encode()).hexdigest()[:8], 16)
+            places.append({
+                "id": f"{slug}-{n}",
+                "displayName": {"text": f"{query.split(' in ')[0].title()} {n}"},
+                "formattedAddress": f"{n + 1} Main St, {city}, UT 84601, USA",
+                "location": {"latitude": lat0 + (h % 1000) / 5000, "longitude": lon0 + (h // 1000 % 1000) / 5000},
+                "rating": round(3 + (h % 20) / 10, 1),
+                "userRatingCount": h % 500,
+            })
+        rect = (body.get("locationBias") or {}).get("rectangle")
+        if rect:
+            places = [p for p in places
+                      if rect["low"]["latitude"] <= p["location"]["latitude"] < rect["high"]["latitude"]
+                      and rect["low"]["longitude"] <= p["location"]["longitude"] < rect["high"]["longitude"]]
+
+        size = min(body.get("pageSize") or body.get("maxResultCount") or self.page_size, self.page_size)
+        start = int(body.get("pageToken") or 0)
+        out = {"places": places[start:start + size]}
+        if start + size < len(places):
+            out["nextPageToken"] = str(start + size)
+        return out
+
+    def census_rows(self, params):
+        """ACS [header, *rows] for the `in=state:XX` parameter."""
+        state = (params.get("in") or "state:49").split(":")[-1]
+        state_name = STATE_NAMES.get(state, f"State {state}")
+        header = params.get("get", "NAME,B01003_001E,B19013_001E").split(",") + ["state", "place"]
+        rows = [header]
+        for n in range(self.places_per_state):
+            h = int(hashlib.sha1(f"{state}/{n}".encode()).hexdigest()[:8], 16)
+            rows.append([f"Place {n} city, {state_name}", str(500 + h % 400_000),
+                         str(30_000 + h % 120_000), state, f"{n:05d}"])
+        return rows
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                failure = fake._begin()
+                try:
+                    parsed = urllib.parse.urlsplit(self.path)
+                    if failure:
+                        return self._send(failure, {"error": "injected failure"})
+                    if not parsed.path.endswith("/acs5"):
+                        return self._send(404, {"error": "unknown path"})
+                    params = dict(urllib.parse.parse_qsl(parsed.query))
+                    self._send(200, fake.census_rows(params))
+                finally:
+                    fake._end()
+
+            def do_POST(self):
+                failure = fake._begin()
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                    if failure:
+                        return self._send(failure, {"error": {"code": failure, "message": "injected failure"}})
+                    if not self.path.endswith("places:searchText"):
+                        return self._send(404, {"error": "unknown path"})
+                    if self.headers.get("X-Goog-FieldMask") == "places.viewport":
+                        body["_viewport"] = True
+                    self._send(200, fake.places_page(body))
+                finally:
+                    fake._end()
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local fake Places searchText + ACS server.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8900)
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    serve.add_argument("--jitter", type=float, default=0.0, help="extra random seconds (0..jitter)")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 500 / 429")
+    serve.add_argument("--page-size", type=int, default=20)
+    serve.add_argument("--places-per-query", type=int, default=60)
+    serve.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    fake = FakeApiServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate, page_size=args.page_size,
+                         places_per_query=args.places_per_query, seed=args.seed)
+    print(f"Fake Places: {fake.places_url}\nFake ACS:    {fake.census_url}")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# validation.py
+"""
+Load-time schema validation + type coercion for the three datasets.
+
+get_business_data / get_demographic_data / get_industry_data run their data
+through here once, so the analysis code can rely on clean columns instead
+of re-checking every row:
+  businesses   business_name / city / industry: stripped str (city and
+               industry required); revenue: int / float >= 0 or None;
+               rating 0..5, user_ratings_total >= 0, lat / lon in range,
+               each or None
+  demographic  {place (lowercase): {"population": int >= 0,
+               "avg_income": 0 < int / float <= 1M}}; places with Census
+               sentinel incomes (-666666666, ...) or no numbers are dropped
+  industry     {industry (lowercase): {"ideal_ppb" > 0, "spend_per_capita"
+               >= 0, optional numeric tam_weight / rev_weight /
+               income_elasticity / benchmark_income}}
+
+Numbers given as text ("$12,500") are parsed; values that cannot be used
+become None (optional fields) or reject the record (required fields).
+Every call returns (clean_data, ValidationReport); iter_businesses does
+the same for a row stream, filling the report as rows go by.
+
+  businesses, report = validate_businesses(rows)
+  print(report.summary())   # "business: 118 of 120 kept; rejected: missing city × 2"
+"""
+import math
+from collections import Counter
+
+MAX_INCOME = 1_000_000
+OPTIONAL_INDUSTRY_FIELDS = ("tam_weight", "rev_weight", "income_elasticity", "benchmark_income")
+
+
+class ValidationReport:
+    """What validation kept, rejected (by reason) and coerced (by field)."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.total = 0
+        self.kept = 0
+        self.rejected = Counter()
+        self.coerced = Counter()
+
+    def reject(self, reason):
+        self.rejected[reason] += 1
+
+    @property
+    def rejected_count(self):
+        return sum(self.rejected.values())
+
+    def summary(self):
+        parts = [f"{self.dataset}: {self.kept} of {self.total} kept"]
+        if self.rejected:
+            parts.append("rejected: " + ", ".join(f"{r} × {n}" for r, n in self.rejected.most_common()))
+        if self.coerced:
+            parts.append("cleared / converted: " + ", ".join(f"{f} × {n}" for f, n in self.coerced.most_common()))
+        return "; ".join(parts)
+
+    def warn(self):
+        """Print the summary if anything was rejected or changed."""
+        if self.rejected or self.coerced:
+            print(f"⚠️ Validation — {self.summary()}")
+
+
+# ======================
+# VALUES
+# ======================
+def to_number(value):
+    """int / float / numeric text ("$1,200", "3.5") -> int or float; anything else -> None."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, str):
+        text = value.strip().replace(",", "").replace("$", "")
+        try:
+            number = float(text)
+        except ValueError:
+            return None
+        if not math.isfinite(number):
+            return None
+        return int(number) if number.is_integer() and "." not in text else number
+    return None
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value).strip()
+
+
+def _set_number(record, field, low, high, report, integer=False):
+    """record[field] -> number in [low, high] or None, counting changed values."""
+    raw = record.get(field)
+    number = to_number(raw)
+    if number is not None and not (low <= number <= high):
+        number = None
+    if number is not None and integer:
+        number = int(number)
+    if type(number) is not type(raw) or number != raw:
+        report.coerced[field] += 1
+    record[field] = number
+
+
+# ======================
+# DATASETS
+# ======================
+def clean_business(row, report):
+    """A cleaned copy of one business row, or None (rejected); row is not modified."""
+    if not hasattr(row, "get"):
+        report.reject("not a record")
+        return None
+    row = dict(row)
+    for field in ("business_name", "city", "industry"):
+        value = row.get(field)
+        text = _text(value)
+        if text != value:
+            if value is not None:
+                report.coerced[field] += 1
+            row[field] = text
+    if not row["city"]:
+        report.reject("missing city")
+        return None
+    if not row["industry"]:
+        report.reject("missing industry")
+        return None
+
+    _set_number(row, "revenue", 0, math.inf, report)
+    if "rating" in row:
+        _set_number(row, "rating", 0, 5, report)
+    if "user_ratings_total" in row:
+        _set_number(row, "user_ratings_total", 0, math.inf, report, integer=True)
+    if "lat" in row or "lon" in row:
+        _set_number(row, "lat", -90, 90, report)
+        _set_number(row, "lon", -180, 180, report)
+        if (row["lat"] is None) != (row["lon"] is None):  # half a coordinate is no coordinate
+            report.coerced["lat/lon"] += 1
+            row["lat"] = row["lon"] = None
+    return row
+
+
+def iter_businesses(rows, report):
+    """Clean rows yielded one at a time (constant memory), counted in report."""
+    for row in rows:
+        report.total += 1
+        row = clean_business(row, report)
+        if row is not None:
+            report.kept += 1
+            yield row
+
+
+def validate_businesses(rows):
+    """Iterable of business rows -> (list of clean rows, report)."""
+    report = ValidationReport("business")
+    clean = list(iter_businesses(rows, report))
+    return clean, report
+
+
+def validate_demographics(data):
+    """{place: {"population", "avg_income"}} -> (clean dict with lowercase keys, report)."""
+    report = ValidationReport("demographic")
+    if getattr(data, "normalized_keys", False):
+        # compiled snapshot / resolver: typed when it was built
+        report.total = report.kept = len(data)
+        return data, report
+
+    clean = {}
+    for name, record in data.items():
+        report.total += 1
+        key = _text(name).lower()
+        if not key:
+            report.reject("missing place name")
+            continue
+        if not hasattr(record, "get"):
+            report.reject("not a record")
+            continue
+        population = to_number(record.get("population"))
+        income = to_number(record.get("avg_income"))
+        if population is None or population < 0:
+            report.reject("missing / negative population")
+            continue
+        population = int(population)
+        if income is None or not (0 < income <= MAX_INCOME):
+            report.reject("missing / sentinel income")
+            continue
+        if population != record["population"] or type(population) is not type(record["population"]):
+            report.coerced["population"] += 1
+        if income != record["avg_income"] or type(income) is not type(record["avg_income"]):
+            report.coerced["avg_income"] += 1
+        clean[key] = dict(record, population=population, avg_income=income)
+    report.kept = len(clean)
+    return clean, report
+
+
+def validate_industries(data):
+    """{industry: params} -> (clean dict with lowercase keys, report)."""
+    report = ValidationReport("industry")
+    clean = {}
+    for name, params in data.items():
+        report.total += 1
+        key = _text(name).lower()
+        if not key or not hasattr(params, "get"):
+            report.reject("not a record")
+            continue
+        ideal_ppb = to_number(params.get("ideal_ppb"))
+        spend = to_number(params.get("spend_per_capita"))
+        if ideal_ppb is None or ideal_ppb <= 0:
+            report.reject("missing / non-positive ideal_ppb")
+            continue
+        if spend is None or spend < 0:
+            report.reject("missing / negative spend_per_capita")
+            continue
+        record = dict(params, ideal_ppb=ideal_ppb, spend_per_capita=spend)
+        for field in OPTIONAL_INDUSTRY_FIELDS:
+            if field in record:
+                value = to_number(record[field])
+                if value is None:  # unusable: fall back to the scorer's default
+                    report.coerced[field] += 1
+                    del record[field]
+                else:
+                    record[field] = value
+        clean[key] = record
+    report.kept = len(clean)
+    return clean, report
+
+
+VALIDATORS = {
+    "business": validate_businesses,
+    "demographic": validate_demographics,
+    "industry": validate_industries,
+}
@@ -1,3 +1,3 @@
-DROP TABLE IF ESISTS businesses;
+DROP TABLE IF EXISTS businesses;
 DROP TABLE IF EXISTS cities;
 DROP TABLE IF EXISTS industries;
\ No newline at end of file
@@ -1,18 +1,34 @@
 
-CREATE TABLE cities (
+CREATE TABLE IF NOT EXISTS cities (
   id INTEGER PRIMARY KEY,
-  name TEXT NOT NULL UNIQUE,
-  population INTEGER NOT NULL,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+  population INTEGER NOT NULL DEFAULT 0,
   median_income INTEGER
 );
 
-CREATE TABLE industries (
+CREATE TABLE IF NOT EXISTS industries (
   id INTEGER PRIMARY KEY, 
-  name TEXT NOT NULL UNIQUE,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
   ideal_ppb INTEGER,
   spend_per_capita INTEGER,
   tam_weight REAL,
+  rev_weight REAL,
+  income_elasticity REAL,
+  benchmark_income REAL
+);
+
+CREATE TABLE IF NOT EXISTS businesses (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  city_id INTEGER NOT NULL,
+  industry_id INTEGER NOT NULL,
+  annual_revenue NUMERIC,
+  place_id TEXT,
+  rating REAL,
+  user_ratings_total INTEGER,
 
   FOREIGN KEY (city_id) REFERENCES cities(id),
   FOREIGN KEY (industry_id) REFERENCES industries(id)
-);
\ No newline at end of file
+);
+
+CREATE INDEX IF NOT EXISTS idx_businesses_industry_city ON businesses (industry_id, city_id, annual_revenue);
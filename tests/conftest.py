@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app modules use flat imports (run from marketdemand/python_app).
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "marketdemand", "python_app")
+sys.path.insert(0, os.path.abspath(APP_DIR))
@@ -0,0 +1,76 @@
+import json
+import random
+import statistics
+
+from aggregation import BusinessAccumulator, RevenueSketch
+from analyzer import analyze_market
+from data_sources import (
+    fetch_business_data,
+    fetch_demographic_data,
+    fetch_industry_data,
+    iter_business_file,
+)
+from filtering import filter_businesses, iter_filter_businesses
+
+
+def test_sketch_median_within_accuracy_and_mergeable():
+    rng = random.Random(11)
+    values = [rng.lognormvariate(11, 1) for _ in range(20_001)]
+    left, right = RevenueSketch(), RevenueSketch()
+    for i, v in enumerate(values):
+        (left if i % 2 else right).add(v)
+    merged = left.merge(right)
+    true_median = statistics.median(values)
+    assert abs(merged.quantile(0.5) - true_median) / true_median < 0.02
+
+    for v in values[:10_000]:
+        merged.remove(v)
+    rest_median = statistics.median(values[10_000:])
+    assert abs(merged.quantile(0.5) - rest_median) / rest_median < 0.02
+
+
+def test_streaming_analysis_from_file_matches_list(tmp_path, capsys):
+    businesses = fetch_business_data()
+    population, industries = fetch_demographic_data(), fetch_industry_data()
+    filters = {"industry": "fitness", "cities": ["Provo", "Orem", "Lehi"]}
+
+    ndjson = tmp_path / "biz.ndjson"
+    ndjson.write_text("\n".join(json.dumps(b) for b in businesses))
+    array = tmp_path / "biz.json"
+    array.write_text(json.dumps(businesses, indent=2))
+    assert list(iter_business_file(str(array), chunk_size=64)) == businesses
+
+    expected = analyze_market(filter_businesses(businesses, filters), population, filters,
+                              industries["fitness"])
+    for path in (ndjson, array):
+        stream = iter_filter_businesses(iter_business_file(str(path), chunk_size=128), filters)
+        result = analyze_market(stream, population, filters, industries["fitness"])
+        for key in ("tam", "current_revenue", "demand_score", "confidence_score", "businesses"):
+            assert result[key] == expected[key]
+        assert result["stats_dif"]["count"] == expected["stats_dif"]["count"]
+        assert result["stats_dif"]["average_revenue"] == expected["stats_dif"]["average_revenue"]
+        median = expected["stats_dif"]["median_revenue"]
+        assert abs(result["stats_dif"]["median_revenue"] - median) / median < 0.02
+
+
+def test_streamed_rows_are_validated(tmp_path, capsys):
+    path = tmp_path / "dirty.ndjson"
+    path.write_text("\n".join(json.dumps(b) for b in [
+        {"business_name": "A", "city": "Provo", "industry": "cafes", "revenue": "N/A"},
+        {"business_name": "B", "city": "Provo", "industry": "cafes", "revenue": "$1,200"},
+        {"business_name": "C", "city": "", "industry": "cafes", "revenue": 50},
+    ]))
+    filters = {"industry": "cafes", "cities": ["Provo"]}
+    stream = iter_filter_businesses(iter_business_file(str(path)), filters)
+    result = analyze_market(stream, fetch_demographic_data(), filters, fetch_industry_data()["cafes"])
+    assert result["businesses"] == 2 and result["current_revenue"] == 1200
+    assert "2 of 3 kept" in capsys.readouterr().out  # reported once the stream is drained
+    assert [b["revenue"] for b in iter_business_file(str(path), validate=False)] == ["N/A", "$1,200", 50]
+
+
+def test_accumulator_without_distribution_skips_sketch():
+    acc = BusinessAccumulator(track_distribution=False).add_all(
+        [{"revenue": 10}, {"revenue": None}, {"revenue": 0}]
+    )
+    assert (acc.count, acc.revenue_sum, acc.revenue_positive) == (3, 10, 1)
+    assert acc.sketch is None
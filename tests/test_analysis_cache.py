@@ -0,0 +1,100 @@
+import copy
+
+from analysis_cache import AnalysisCache
+from analyzer import analyze_market
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses
+
+
+def _inputs():
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    params = fetch_industry_data()["cafes"]
+    filters = {"industry": "cafes", "cities": ["Provo", "Salt Lake City"]}
+    return filter_businesses(businesses, filters), population, filters, params
+
+
+def test_hits_on_equivalent_query_and_skips_stats(monkeypatch, capsys):
+    filtered, population, filters, params = _inputs()
+    cache = AnalysisCache()
+    first = cache.analyze(filtered, population, filters, params, streaming=False)
+    assert first == analyze_market(filtered, population, filters, params, streaming=False)
+
+    import analyzer
+    monkeypatch.setattr(analyzer, "business_stats_df", lambda *_: 1 / 0)  # must not run again
+    same = {"industry": " Cafes", "cities": ["salt lake city ", "PROVO"]}
+    again = cache.analyze(list(filtered), population, same, dict(params), streaming=False)
+    assert again == first and again is not first
+    again["stats_dif"]["count"] = -1  # caller edits don't leak into the cache
+    assert cache.analyze(filtered, population, filters, params, streaming=False) == first
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 0, "size": 1, "max_entries": 512}
+
+
+def test_changed_data_or_params_miss_and_lru_evicts(capsys):
+    filtered, population, filters, params = _inputs()
+    cache = AnalysisCache(max_entries=2)
+    base = cache.analyze(filtered, population, filters, params)
+
+    changed_biz = copy.deepcopy(filtered)
+    changed_biz[0]["revenue"] += 1
+    assert cache.analyze(changed_biz, population, filters, params)["current_revenue"] == base["current_revenue"] + 1
+
+    grown = copy.deepcopy(population)
+    grown["provo"]["population"] += 1000
+    assert cache.analyze(filtered, grown, filters, params)["population"] == base["population"] + 1000
+
+    # unrelated place changes do not invalidate
+    grown["logan"]["population"] += 1
+    cache.analyze(filtered, grown, filters, params)
+    assert cache.stats()["hits"] == 1
+
+    cache.analyze(filtered, population, filters, dict(params, spend_per_capita=1))
+    assert cache.stats()["misses"] == 4
+    assert cache.stats()["evictions"] == 2 and cache.stats()["size"] == 2
+
+    # generators are passed straight through
+    cache.analyze(iter(filtered), population, filters, params)
+    assert cache.stats()["misses"] == 4
+
+
+def test_indexed_data_is_keyed_by_token_not_content(monkeypatch, capsys):
+    import analysis_cache
+    from business_index import BusinessIndex
+    from place_resolver import PlaceResolver
+
+    index = BusinessIndex(fetch_business_data())
+    population = PlaceResolver.from_population(fetch_demographic_data())
+    params = fetch_industry_data()["cafes"]
+    filters = {"industry": "cafes", "cities": []}
+    cache = AnalysisCache()
+    first = cache.analyze(index.filter(filters), population, filters, params)
+
+    # a hit must not walk the rows or the demographic table
+    monkeypatch.setattr(analysis_cache, "_digest", lambda *_: 1 / 0)
+    monkeypatch.setattr(analysis_cache, "place_lookup", lambda *_: 1 / 0)
+    assert cache.analyze(index.filter(filters), population, filters, params) == first
+    assert cache.stats()["hits"] == 1
+
+    population.add_place("New Town", {"population": 5000, "avg_income": 60000})  # bumps the version
+    monkeypatch.undo()
+    grown = cache.analyze(index.filter(filters), population, filters, params)
+    assert cache.stats()["misses"] == 2
+    assert grown["population"] == first["population"] + 5000
+
+
+def test_in_place_edits_miss(capsys):
+    filtered, population, _, params = _inputs()
+    filtered, population = copy.deepcopy(filtered), copy.deepcopy(population)
+    filters = {"industry": "cafes", "cities": []}
+    cache = AnalysisCache()
+    base = cache.analyze(filtered, population, filters, params)
+
+    filtered[0]["revenue"] += 1_000_000
+    filtered.append(dict(filtered[0], business_name="New Cafe", revenue=10))
+    edited = cache.analyze(filtered, population, filters, params)
+    assert edited["current_revenue"] == base["current_revenue"] + 1_000_010
+    assert edited["businesses"] == base["businesses"] + 1
+
+    population["provo"]["population"] += 1000
+    assert cache.analyze(filtered, population, filters, params)["population"] == base["population"] + 1000
+    assert cache.stats()["misses"] == 3 and cache.stats()["hits"] == 0
@@ -1,11 +1,12 @@
-
-
-from marketdemand.analyzer import count_businesses_by_city
+from analyzer import count_businesses_by_city
+from data_sources import fetch_business_data
 
 # Load mock data
-import json
-with open("data/sample_data.json") as f:
-    sample_data = json.load(f)
+sample_data = fetch_business_data()
+
 
-results = count_businesses_by_city(sample_data)
-print(results)
\ No newline at end of file
+def test_count_businesses_by_city():
+    results = count_businesses_by_city(sample_data)
+    assert sum(results.values()) == len(sample_data)
+    assert results["Provo"] == 13
+    assert results["Salt Lake City"] == 12
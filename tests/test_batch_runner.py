@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+import batch_runner
+
+JOBS = [
+    {"id": "a", "industry": "cafes", "cities": ["Provo", "Lehi"], "sort_by": "revenue", "limit": 2},
+    {"id": "b", "industry": "Fitness", "cities": [], "dynamic_spc": False, "exact_stats": True},
+    {"id": "c", "industry": "underwater basket weaving", "cities": ["Provo"]},
+    {"id": "d", "industry": "cafes", "cities": ["Provo"], "limit": "lots"},
+]
+
+
+def test_batch_runs_every_query_and_reports_errors(tmp_path):
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text("\n".join(json.dumps(j) for j in JOBS))
+    out = tmp_path / "results.jsonl"
+
+    batch_runner.main([str(jobs), "--out", str(out)])
+    results = [json.loads(line) for line in out.read_text().splitlines()]
+
+    assert [r["id"] for r in results] == ["a", "b", "c", "d"]
+    assert len(results[0]["businesses"]) == 2
+    assert results[0]["businesses"][0]["revenue"] >= results[0]["businesses"][1]["revenue"]
+    assert 0 <= results[0]["analysis"]["demand_score"] <= 100
+    assert results[1]["dynamic_spc"] is False
+    assert "not found" in results[2]["error"]
+    assert "'limit' must be a non-negative integer" in results[3]["error"]
+
+
+def test_parallel_results_match_serial():
+    serial = list(batch_runner.run_batch(JOBS))
+    parallel = list(batch_runner.run_batch(JOBS, workers=2))
+    assert parallel == serial
+
+
+def test_pandas_only_loads_for_exact_stats(tmp_path):
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text(json.dumps(JOBS[0]))
+    app_dir = os.path.dirname(batch_runner.__file__)
+    code = (
+        "import sys, batch_runner;"
+        f"batch_runner.main([{str(jobs)!r}, '--out', {str(tmp_path / 'r.jsonl')!r}]);"
+        "print('pandas' in sys.modules)"
+    )
+    done = subprocess.run([sys.executable, "-c", code], cwd=app_dir, capture_output=True, text=True, check=True)
+    assert done.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+
+from analyzer import analyze_market, score_market
+from batch_scoring import score_all_markets, score_markets_batch
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses
+
+FIELDS = [
+    "tam", "current_revenue", "remaining_tam", "remaining_pct", "competition_score",
+    "competition_norm", "rev_opp_score", "demand_score", "businesses", "confidence_score",
+]
+
+
+def test_matrix_matches_analyze_market_for_every_cell(capsys):
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    industries = fetch_industry_data()
+
+    for dynamic in (True, False):
+        scores = score_all_markets(businesses, population, industries, USE_DYNAMIC_SPC=dynamic)
+        for i, industry in enumerate(scores["industries"]):
+            for j, city in enumerate(scores["cities"]):
+                filters = {"industry": industry, "cities": [city]}
+                filtered = filter_businesses(businesses, filters)
+                expected = analyze_market(filtered, population, filters, industries[industry], dynamic)
+                for field in FIELDS:
+                    assert scores[field][i, j] == expected[field], (industry, city, field)
+
+
+def test_batch_is_bit_identical_to_scalar_on_random_aggregates():
+    rng = random.Random(7)
+    rows = []
+    for _ in range(2000):
+        count = rng.choice([0, 1, 2, 5, 17, 300])
+        rows.append({
+            "population": rng.choice([0, rng.randint(1, 2_000_000)]),
+            "income": rng.choice([0, rng.uniform(20_000, 200_000)]),
+            "count": count,
+            "revenue": rng.uniform(0, 5e7) if count else 0,
+            "revenue_count": rng.randint(0, count),
+            "params": {
+                "ideal_ppb": rng.choice([0, 500, 2000, 30000]),
+                "spend_per_capita": rng.uniform(10, 2000),
+                "tam_weight": rng.uniform(0, 1),
+                "rev_weight": rng.uniform(0, 0.5),
+                "income_elasticity": rng.uniform(0.5, 1.5),
+            },
+        })
+
+    def column(key, param=None):
+        return np.array([r["params"][param] if param else r[key] for r in rows], dtype=float)
+
+    batch = score_markets_batch(
+        population=column("population"),
+        weighted_income=column("income"),
+        biz_count=column("count"),
+        current_revenue=column("revenue"),
+        revenue_count=column("revenue_count"),
+        ideal_ppb=column(None, "ideal_ppb"),
+        spend_per_capita=column(None, "spend_per_capita"),
+        tam_weight=column(None, "tam_weight"),
+        rev_weight=column(None, "rev_weight"),
+        income_elasticity=column(None, "income_elasticity"),
+    )
+    for k, r in enumerate(rows):
+        coverage = (r["revenue_count"] / r["count"]) if r["count"] else 0.0
+        expected = score_market(r["population"], r["income"], r["count"], r["revenue"],
+                                coverage, r["params"])
+        for field in FIELDS:
+            assert batch[field][k] == expected[field], (k, field)
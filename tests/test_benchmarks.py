@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import run_benchmarks  # noqa: E402
+import synthetic_data  # noqa: E402
+
+
+def test_synthetic_dataset_uses_repo_schemas(tmp_path):
+    paths = synthetic_data.write_dataset("500", str(tmp_path), seed=1)
+    businesses = json.loads(open(paths["business"]).read())
+    places = json.loads(open(paths["demographic"]).read())
+    assert len(businesses) == 500
+    assert set(businesses[0]) >= {"business_name", "city", "industry", "revenue"}
+    assert all(b["city"] in places for b in businesses)
+    assert set(next(iter(places.values()))) == {"population", "avg_income"}
+    # same seed -> same data
+    again = synthetic_data.write_dataset("500", str(tmp_path / "again"), seed=1)
+    assert open(again["business"]).read() == open(paths["business"]).read()
+
+
+def test_benchmark_run_records_every_stage_and_flags_regressions(tmp_path):
+    run = run_benchmarks.benchmark_size("1k", data_dir=str(tmp_path))
+    assert set(run["stages"]) == {"load_business", "load_demographic", "filter", "sort", "sort_revenue",
+                                  "analyze", "render"}
+    assert all("seconds" in s and "peak_bytes" in s for s in run["stages"].values())
+
+    report = {"runs": [run]}
+    slower = json.loads(json.dumps(report))
+    slower["runs"][0]["stages"]["filter"]["seconds"] = run["stages"]["filter"]["seconds"] * 3 + 1
+    regressions = run_benchmarks.compare_results(slower, report)
+    assert [(r["stage"], r["metric"]) for r in regressions] == [("filter", "seconds")]
+    assert run_benchmarks.compare_results(report, report) == []
+
+
+def test_scenarios_record_every_stage():
+    run = run_benchmarks.benchmark_scenarios(trace_memory=False, scale=0.05)
+    assert run["size"] == "scenarios"
+    assert set(run["stages"]) == {"places_concurrent", "census_nationwide", "index_query", "snapshot_open", "rank_cities", "service_analyze", "spatial_radius", "resolve_places", "sweep", "sensitivity"}
+    assert all(s["seconds"] > 0 for s in run["stages"].values())
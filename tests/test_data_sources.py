@@ -0,0 +1,241 @@
+import http.server
+import json
+import random
+import threading
+import urllib.parse
+import time
+
+import pytest
+
+import data_sources
+import data_storage
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_storage, "CACHE_DIR", str(tmp_path))
+    data_storage.clear_memory_cache()
+    monkeypatch.setattr(data_sources, "fetch_API_Keys",
+                        lambda: {"google_maps_api_key": "k", "Census_API_Key": ""})
+    yield
+    data_storage.clear_memory_cache()
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+    content = b""
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class SlowPlacesSession:
+    """Every city returns its own place plus one shared place."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        city = json["textQuery"].split(" in ")[1].split(",")[0]
+        return FakeResponse({"places": [
+            {"id": f"id-{city}", "displayName": {"text": f"Shop {city}"},
+             "formattedAddress": f"1 Main St, {city}, UT 84000"},
+            {"id": "id-shared", "displayName": {"text": "Chain"},
+             "formattedAddress": "9 State St, Provo, UT 84601"},
+        ]})
+
+
+def test_business_api_fetches_cities_concurrently_and_dedupes(monkeypatch):
+    session = SlowPlacesSession(delay=0.2)
+    monkeypatch.setattr(data_sources, "_get_session", lambda *a: session)
+    cities = [f"City{i}" for i in range(30)]
+
+    rows = data_sources.fetch_business_api("cafes", cities, max_workers=30)
+
+    assert session.peak > 1
+    ids = [r["place_id"] for r in rows]
+    assert len(ids) == len(set(ids)) == 31
+
+
+def test_business_api_respects_concurrency_limit(monkeypatch):
+    session = SlowPlacesSession(delay=0.05)
+    monkeypatch.setattr(data_sources, "_get_session", lambda *a: session)
+    data_sources.fetch_business_api("cafes", [f"City{i}" for i in range(8)], max_workers=2)
+    assert session.peak <= 2
+
+
+class CensusHandler(http.server.BaseHTTPRequestHandler):
+    """Stand-in ACS endpoint: two states, one shared place name, one failing state."""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    STATES = {
+        "17": [["Springfield city, Illinois", "114000", "61000", "17", "72000"],
+               ["Chicago city, Illinois", "2700000", "71000", "17", "14000"]],
+        "29": [["Springfield city, Missouri", "169000", "45000", "29", "70000"],
+               ["Nowhere CDP, Missouri", "12", "-666666666", "29", "1"],
+               ["Blank village, Missouri", None, "50000", "29", "2"]],
+    }
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.05)
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        state = query["in"][0].split(":")[1]
+        with cls.lock:
+            cls.active -= 1
+        if state == "99":
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps([["NAME", "B01003_001E", "B19013_001E", "state", "place"]]
+                          + cls.STATES.get(state, [])).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def census_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), CensusHandler)
+    CensusHandler.peak = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/data/2022/acs/acs5"
+    server.shutdown()
+    server.server_close()
+
+
+def test_nationwide_census_keys_places_by_state(census_server, capsys):
+    table = data_sources.fetch_demographic_nationwide(["17", "29", "99"], max_workers=2,
+                                                      base_url=census_server)
+
+    assert table[("IL", "springfield")] == {"population": 114000, "avg_income": 61000}
+    assert table[("MO", "springfield")] == {"population": 169000, "avg_income": 45000}
+    assert ("MO", "nowhere") not in table and ("MO", "blank") not in table
+    assert CensusHandler.peak <= 2
+    assert "state 99" in capsys.readouterr().out
+
+    assert data_sources.demographics_for_state(table, "17") == {
+        "springfield": {"population": 114000, "avg_income": 61000},
+        "chicago": {"population": 2700000, "avg_income": 71000},
+    }
+
+
+def test_bulk_census_parse_matches_row_normalization():
+    names = ["Provo city", "Alta town", "Salt Lake City city", "Eagle Mountain CDP", "Bluff"]
+    assert data_sources.normalize_place_names(names).tolist() == [
+        data_sources.normalize_place_name(n) for n in names
+    ]
+
+
+class FakePlacesHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Stand-in Places Text Search: pageSize / pageToken paging, 60 results
+    per query, places inside the locationBias rectangle ranked first.
+    """
+    places = []
+    requests = 0
+    VIEWPORT = {"low": {"latitude": 40.0, "longitude": -112.0},
+                "high": {"latitude": 40.4, "longitude": -111.6}}
+
+    def do_POST(self):
+        cls = type(self)
+        cls.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.headers.get("X-Goog-FieldMask") == "places.viewport":
+            self._send({"places": [{"viewport": cls.VIEWPORT}]})
+            return
+        rect = (body.get("locationBias") or {}).get("rectangle")
+
+        def inside(p):
+            return rect is not None and (
+                rect["low"]["latitude"] <= p["lat"] < rect["high"]["latitude"]
+                and rect["low"]["longitude"] <= p["lng"] < rect["high"]["longitude"])
+
+        ranked = sorted(cls.places, key=lambda p: (not inside(p), p["id"]))[:60]
+        start = int(body.get("pageToken") or 0)
+        size = body.get("pageSize", 20)
+        page = ranked[start:start + size]
+        out = {"places": [{"id": p["id"], "displayName": {"text": p["id"]},
+                           "formattedAddress": "1 Main St, Provo, UT 84601"} for p in page]}
+        if start + size < len(ranked):
+            out["nextPageToken"] = str(start + size)
+        self._send(out)
+
+    def _send(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def places_server(monkeypatch):
+    monkeypatch.setattr(data_sources, "_session", None)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakePlacesHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/places:searchText"
+    server.shutdown()
+    server.server_close()
+
+
+def _fake_places(n, seed=3):
+    rng = random.Random(seed)
+    return [{"id": f"place-{i:04d}", "lat": rng.uniform(40.0, 40.4), "lng": rng.uniform(-112.0, -111.6)}
+            for i in range(n)]
+
+
+def test_harvest_pages_and_tiles_past_the_60_result_cap(places_server, monkeypatch):
+    monkeypatch.setattr(FakePlacesHandler, "places", _fake_places(400))
+    monkeypatch.setattr(FakePlacesHandler, "requests", 0)
+
+    rows = data_sources.harvest_business_api("cafes", ["Provo"], url=places_server, patience=50)
+    ids = [r["place_id"] for r in rows]
+    assert len(ids) == len(set(ids)) == 400  # vs 20 from a single query
+
+
+def test_harvest_stops_when_tiles_stop_finding_new_places(places_server, monkeypatch):
+    monkeypatch.setattr(FakePlacesHandler, "places", _fake_places(400))
+    monkeypatch.setattr(FakePlacesHandler, "requests", 0)
+    seen = {"place-0000"}
+
+    rows = list(data_sources.iter_harvest_places("cafes", ["Provo"], url=places_server,
+                                                 patience=2, max_depth=1, seen=seen))
+    assert "place-0000" not in {r["place_id"] for r in rows}
+    assert len(seen) == len(rows) + 1
+    # viewport + 3 pages for the city tile + 3 per quadrant, at most
+    assert FakePlacesHandler.requests <= 1 + 3 + 4 * 3
+
+    monkeypatch.setattr(FakePlacesHandler, "places", _fake_places(30))
+    monkeypatch.setattr(FakePlacesHandler, "requests", 0)
+    assert len(data_sources.harvest_business_api("cafes", ["Provo"], url=places_server)) == 30
+    assert FakePlacesHandler.requests == 1 + 2  # small city: no tiling, two pages
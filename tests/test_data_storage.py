@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import data_sources
+import data_storage
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_storage, "CACHE_DIR", str(tmp_path))
+    data_storage.clear_memory_cache()
+    yield tmp_path
+    data_storage.clear_memory_cache()
+
+
+def test_fetch_or_cache_persists_and_skips_second_call(cache_dir):
+    calls = []
+
+    def api():
+        calls.append(1)
+        return {"provo": {"population": 115000, "avg_income": 54000}}
+
+    key = data_storage.make_cache_key("census", state="49", field_mask="NAME")
+    assert data_storage.fetch_or_cache(key, api, source="census")["provo"]["population"] == 115000
+
+    # a new process only has the file
+    data_storage.clear_memory_cache()
+    assert data_storage.fetch_or_cache(key, api, source="census")["provo"]["avg_income"] == 54000
+    assert len(calls) == 1
+    saved = json.loads((cache_dir / "census_cache.json").read_text())
+    assert key in saved["entries"]
+
+
+def test_ttl_expiry_and_lru_eviction(cache_dir, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(data_storage.time, "time", lambda: now[0])
+    monkeypatch.setitem(data_storage.CACHE_MAX_ENTRIES, "yelp", 2)
+
+    data_storage.set_cache("a", [1], source="yelp")
+    data_storage.set_cache("b", [2], source="yelp")
+    assert data_storage.get_cached("a", source="yelp") == [1]  # "b" is now least recent
+    data_storage.set_cache("c", [3], source="yelp")
+    assert data_storage.get_cached("b", source="yelp") is None
+    assert data_storage.get_cached("a", source="yelp") == [1]
+
+    now[0] += data_storage.CACHE_TTLS["yelp"] + 1
+    assert data_storage.get_cached("a", source="yelp") is None
+
+
+def test_empty_cache_file_is_treated_as_empty(cache_dir):
+    (cache_dir / "google_places_cache.json").write_text("")
+    assert data_storage.get_cached("anything", source="google_places") is None
+
+
+def test_business_api_warm_run_skips_network(cache_dir, monkeypatch):
+    class FakeResponse:
+        status_code = 200
+        text = ""
+        content = b""
+
+        def json(self):
+            return {"places": [{"id": "p1", "displayName": {"text": "Bean"},
+                                "formattedAddress": "1 Main St, Provo, UT 84601"}]}
+
+    class FakeSession:
+        def post(self, *args, **kwargs):
+            calls.append(1)
+            return FakeResponse()
+
+    calls = []
+    monkeypatch.setattr(data_sources, "fetch_API_Keys", lambda: {"google_maps_api_key": "k"})
+    monkeypatch.setattr(data_sources, "_get_session", lambda *a: FakeSession())
+
+    first = data_sources.fetch_business_api("Cafes", ["Provo"])
+    second = data_sources.fetch_business_api("cafes", [" provo "])
+    assert first == second
+    assert first[0]["city"] == "provo"
+    assert len(calls) == 1
+
+
+def test_writes_are_batched_and_flushed(cache_dir, monkeypatch):
+    writes = []
+    write = data_storage._write_source
+    monkeypatch.setattr(data_storage, "_write_source", lambda s, e: (writes.append(len(e)), write(s, e)))
+
+    for i in range(120):
+        data_storage.set_cache(f"k{i}", [i], source="google_places")
+    assert len(writes) < 5  # not one full-file rewrite per entry
+    data_storage.flush()
+    assert writes[-1] == 120
+    saved = json.loads((cache_dir / "google_places_cache.json").read_text())
+    assert len(saved["entries"]) == 120
+    data_storage.flush()  # nothing new: no write
+    assert writes[-1] == 120 and len(writes) <= 5
@@ -0,0 +1,58 @@
+from analyzer import analyze_market, place_lookup
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from demographic_snapshot import compile_snapshot, load_snapshot
+from filtering import filter_businesses
+
+
+def test_snapshot_round_trips_and_scores_identically(tmp_path, capsys):
+    population = fetch_demographic_data()
+    path = str(tmp_path / "demo.mdsnap")
+    assert compile_snapshot(population, path) == len(population)
+
+    snapshot = fetch_demographic_data(path)
+    assert place_lookup(snapshot) is snapshot
+    assert dict(snapshot.items()) == {k.strip().lower(): v for k, v in population.items()}
+    assert snapshot["  PROVO "] == population["provo"]
+    assert "atlantis" not in snapshot
+
+    businesses = fetch_business_data()
+    industries = fetch_industry_data()
+    for cities in (["Provo", "orem"], []):
+        filters = {"industry": "cafes", "cities": cities}
+        filtered = filter_businesses(businesses, filters)
+        expected = analyze_market(filtered, population, filters, industries["cafes"])
+        got = analyze_market(filtered, snapshot, filters, industries["cafes"])
+        assert got["demand_score"] == expected["demand_score"]
+        assert got["weighted_income"] == expected["weighted_income"]
+    snapshot.close()
+
+
+def test_open_and_lookup_touch_no_other_places(tmp_path, monkeypatch):
+    import demographic_snapshot
+    path = str(tmp_path / "large.mdsnap")
+    compile_snapshot({f"place {i}": {"population": i, "avg_income": 50000} for i in range(200_000)}, path)
+    names_read = []
+    read_name = demographic_snapshot.DemographicSnapshot._name
+    monkeypatch.setattr(demographic_snapshot.DemographicSnapshot, "_name",
+                        lambda self, i: names_read.append(i) or read_name(self, i))
+
+    with load_snapshot(path) as snap:
+        assert names_read == []  # opening decodes nothing
+        assert snap["PLACE 199999"] == {"population": 199999, "avg_income": 50000}
+        assert names_read == [199999]  # one hash probe, one name compared
+        assert "atlantis" not in snap and len(names_read) == 1
+        assert len(snap) == 200_000
+
+
+def test_fractional_income_is_stored_exactly(tmp_path, capsys):
+    population = {"Provo": {"population": 116618, "avg_income": 61234.56},
+                  "Orem": {"population": 97499, "avg_income": 70000.25}}
+    path = str(tmp_path / "fractional.mdsnap")
+    compile_snapshot(population, path)
+
+    industry = fetch_industry_data()["cafes"]
+    filters = {"industry": "cafes", "cities": ["Provo", "Orem"]}
+    with load_snapshot(path) as snap:
+        assert snap["provo"] == {"population": 116618, "avg_income": 61234.56}
+        got = analyze_market([], snap, filters, industry)
+    assert got["weighted_income"] == analyze_market([], population, filters, industry)["weighted_income"]
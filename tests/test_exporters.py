@@ -0,0 +1,145 @@
+import csv
+import gzip
+import json
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+import exporters
+from analyzer import analyze_market
+from business_table import BusinessTable
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses, sort_businesses
+
+
+def sample_results():
+    businesses = fetch_business_data()
+    filters = {"industry": "cafes", "cities": [], "sort_by": "revenue"}
+    rows = sort_businesses(filter_businesses(businesses, filters), filters)
+    analysis = analyze_market(rows, fetch_demographic_data(), filters, fetch_industry_data()["cafes"])
+    return rows, analysis
+
+
+def test_csv_and_ndjson_round_trip(tmp_path):
+    rows, analysis = sample_results()
+    rows = rows + [{"business_name": "No Revenue", "city": "provo", "industry": "Cafes", "revenue": None}]
+
+    path = str(tmp_path / "cafes.csv.gz")
+    assert exporters.export_businesses(rows, path, chunk_size=3) == len(rows)
+    with gzip.open(path, "rt", newline="") as f:
+        read = list(csv.DictReader(f))
+    assert [r["business_name"] for r in read] == [b["business_name"] for b in rows]
+    assert read[-1]["revenue"] == ""
+    assert float(read[0]["revenue"]) == rows[0]["revenue"]
+
+    table_path = str(tmp_path / "cafes.ndjson")
+    exporters.export_businesses(BusinessTable.from_records(rows), table_path)
+    with open(table_path) as f:
+        lines = [json.loads(line) for line in f]
+    assert [r["business_name"] for r in lines] == [b["business_name"] for b in rows]
+    assert lines[-1]["revenue"] is None
+
+    exporters.render("csv", rows, analysis, path=str(tmp_path / "out.csv"))
+    with open(tmp_path / "out.analysis.csv", newline="") as f:
+        (record,) = list(csv.DictReader(f))
+    assert float(record["demand_score"]) == pytest.approx(analysis["demand_score"])
+    assert float(record["stats_dif.median_revenue"]) == analysis["stats_dif"]["median_revenue"]
+    assert sorted(os.listdir(tmp_path)) == ["cafes.csv.gz", "cafes.ndjson", "out.analysis.csv", "out.csv"]
+
+
+def test_streaming_export_memory_is_constant(tmp_path):
+    def rows(n):
+        for i in range(n):
+            yield {"business_name": f"biz {i}", "city": "provo", "industry": "Cafes", "revenue": i * 10.0}
+
+    tracemalloc.start()
+    n = exporters.export_businesses(rows(40_000), str(tmp_path / "big.ndjson.gz"), chunk_size=5000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert n == 40_000
+    assert peak < 6 * 1024 * 1024
+    with gzip.open(tmp_path / "big.ndjson.gz", "rt") as f:
+        assert sum(1 for _ in f) == 40_000
+
+
+def test_failed_export_leaves_no_file_and_renderers_are_pluggable(tmp_path, capsys):
+    def broken():
+        yield {"business_name": "ok"}
+        raise RuntimeError("source went away")
+
+    with pytest.raises(RuntimeError):
+        exporters.export_businesses(broken(), str(tmp_path / "x.csv"), chunk_size=1)
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(ValueError):
+        exporters.export_businesses([], str(tmp_path / "x.txt"))
+    with pytest.raises(ValueError, match="ndjson"):
+        exporters.export_businesses([], str(tmp_path / "x.json"))
+    with pytest.raises(ValueError):
+        exporters.render("pdf", [], {})
+
+    rows, analysis = sample_results()
+    exporters.render("terminal", rows[:3], analysis)
+    assert "MARKET ANALYSIS DASHBOARD" in capsys.readouterr().out
+
+    seen = []
+    exporters.register_renderer("collect")(lambda business_list, analysis, path=None, **o: seen.append(analysis))
+    try:
+        exporters.render("collect", rows, analysis)
+    finally:
+        del exporters.RENDERERS["collect"]
+    assert seen == [analysis]
+
+
+def test_parquet_export(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows, analysis = sample_results()
+    path = str(tmp_path / "cafes.parquet")
+    exporters.render("parquet", rows, analysis, path=path, chunk_size=2)
+    table = pq.read_table(path)
+    assert table.column("business_name").to_pylist() == [b["business_name"] for b in rows]
+    assert pq.read_table(exporters.analysis_path(path)).num_rows == 1
+
+
+def test_main_dispatches_through_the_renderer_registry(tmp_path, monkeypatch, capsys):
+    import main
+    monkeypatch.setattr(main, "set_filter_options",
+                        lambda: {"num_to_display": 3, "industry": "cafes", "cities": [], "sort_by": "revenue"})
+    monkeypatch.setattr(main, "get_business_data", lambda **kw: fetch_business_data())
+    monkeypatch.setattr(main, "get_demographic_data", lambda **kw: fetch_demographic_data())
+    monkeypatch.setattr(main, "get_industry_data", fetch_industry_data)
+    seen = []
+    exporters.register_renderer("collect")(lambda business_list, analysis, path=None, **o: seen.append(path) or 7)
+    monkeypatch.setattr(main, "RENDERER", "collect")
+    monkeypatch.setattr(main, "EXPORT_RENDERER", "collect")
+    monkeypatch.setattr(main, "EXPORT_PATH", str(tmp_path / "out.csv"))
+    try:
+        main.main()
+    finally:
+        del exporters.RENDERERS["collect"]
+    assert seen == [None, str(tmp_path / "out.csv")]
+    assert "Exported 7 businesses" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("settings", [
+    {"RENDERER": "pdf"},
+    {"EXPORT_PATH": "out.txt"},
+    {"EXPORT_PATH": "out.csv", "EXPORT_RENDERER": "pdf"},
+])
+def test_main_rejects_bad_output_settings_before_running(settings, monkeypatch, capsys):
+    import main
+    asked = []
+    monkeypatch.setattr(main, "set_filter_options", lambda: asked.append(1))
+    for name, value in settings.items():
+        monkeypatch.setattr(main, name, value)
+    main.main()
+    assert asked == []
+    assert "⚠️ Invalid output settings" in capsys.readouterr().out
+
+
+def test_parquet_export_without_pyarrow_is_caught_up_front(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ImportError, match="pyarrow"):
+        exporters.export_renderer_for("out.parquet")
+    assert exporters.export_renderer_for("out.csv.gz") == "csv"
@@ -0,0 +1,125 @@
+import random
+
+from business_index import BusinessIndex
+from data_sources import fetch_business_data
+from filtering import filter_businesses, sort_businesses
+
+
+def synthetic_businesses(n, seed=3):
+    rng = random.Random(seed)
+    cities = [f"City {i}" for i in range(200)]
+    industries = ["Cafes", "Fitness", "Dentistry", "Pest Control", "Auto Repair"]
+    return [
+        {
+            "business_name": f"Biz {rng.randint(0, n)}",
+            "city": rng.choice(cities) if rng.random() > 0.5 else rng.choice(cities).upper(),
+            "industry": rng.choice(industries),
+            "revenue": rng.choice([50_000, 75_000, rng.randint(10_000, 900_000)]),
+        }
+        for _ in range(n)
+    ]
+
+
+def test_index_matches_linear_filter_and_sort():
+    businesses = fetch_business_data() + synthetic_businesses(5000)
+    index = BusinessIndex(businesses)
+    queries = [
+        {"industry": "cafes", "cities": ["Provo", "provo", "Lehi"]},
+        {"industry": "Fitness", "cities": []},
+        {"industry": "", "cities": ["City 7", "Orem"]},
+        {"industry": "", "cities": []},
+        {"industry": "nope", "cities": ["Provo"]},
+    ]
+    for filters in queries:
+        expected = filter_businesses(businesses, filters)
+        selection = filter_businesses(index, filters)
+        assert list(selection) == expected
+        for sort_by in ("business_name", "revenue", "industry"):
+            options = dict(filters, sort_by=sort_by)
+            assert sort_businesses(selection, options) == sort_businesses(expected, options)
+
+
+class CountingRows(list):
+    def __init__(self, rows):
+        super().__init__(rows)
+        self.reads = 0
+
+    def __getitem__(self, i):
+        self.reads += 1
+        return super().__getitem__(i)
+
+
+def test_index_query_reads_only_matching_rows():
+    index = BusinessIndex(synthetic_businesses(50_000))
+    index.rows = rows = CountingRows(index.rows)
+    filters = {"industry": "Cafes", "cities": ["City 1", "City 2"], "sort_by": "revenue"}
+
+    selection = filter_businesses(index, filters)
+    assert 0 < len(selection) < len(index) // 100
+    assert rows.reads == len(selection)  # bucket lookups, no scan
+    rows.reads = 0
+    ordered = sort_businesses(selection, filters)
+    assert rows.reads == len(ordered) == len(selection)  # presorted buckets merged, no comparisons on rows
+
+
+def _core(rows):
+    return [(b["business_name"], b["city"], b["industry"], b["revenue"]) for b in rows]
+
+
+def test_business_table_filter_sort_and_analysis_match_dicts(capsys):
+    from analyzer import analyze_market
+    from business_table import BusinessTable
+    from data_sources import fetch_demographic_data, fetch_industry_data
+
+    businesses = fetch_business_data()
+    table = BusinessTable.from_records(businesses)
+    filters = {"industry": "cafes", "cities": ["Provo", "lehi", "Orem"]}
+
+    expected = filter_businesses(businesses, filters)
+    selected = filter_businesses(table, filters)
+    assert _core(selected) == _core(expected)
+    for sort_by in ("business_name", "revenue", "industry"):
+        options = dict(filters, sort_by=sort_by)
+        assert _core(sort_businesses(selected, options)) == _core(sort_businesses(expected, options))
+
+    population, industries = fetch_demographic_data(), fetch_industry_data()
+    from_table = analyze_market(selected, population, filters, industries["cafes"])
+    from_dicts = analyze_market(expected, population, filters, industries["cafes"])
+    assert from_table["demand_score"] == from_dicts["demand_score"]
+    assert from_table["stats_dif"] == from_dicts["stats_dif"]
+
+
+def test_business_table_uses_a_fifth_of_the_memory():
+    import json
+    import tracemalloc
+
+    from business_table import BusinessTable
+
+    rng = random.Random(5)
+    records = [
+        {
+            "business_name": f"Summit Coffee {i}",
+            "city": f"City {rng.randint(0, 300)}",
+            "industry": rng.choice(["Cafes", "Fitness", "Dentistry"]),
+            "revenue": rng.choice([None, rng.randint(10_000, 900_000)]),
+            "place_id": f"ChIJ{rng.getrandbits(120):030x}",
+            "rating": rng.choice([None, round(rng.uniform(1, 5), 1)]),
+            "user_ratings_total": rng.randint(0, 3000),
+        }
+        for i in range(50_000)
+    ]
+    text = json.dumps(records)
+    del records
+
+    tracemalloc.start()
+    try:
+        rows = json.loads(text)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        table = BusinessTable.from_records(rows)
+        del rows
+        table_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert dict_bytes / table_bytes >= 5
+    assert table[3]["place_id"].startswith("ChIJ")
@@ -0,0 +1,79 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation as instr
+from analyzer import analyze_market
+from data_sources import get_business_data, get_demographic_data, get_industry_data
+from filtering import filter_businesses, sort_businesses
+
+
+def test_disabled_by_default_records_nothing():
+    instr.reset()
+    with instr.span("anything"):
+        instr.count("things")
+    assert instr.report() == {"spans": [], "counters": {}}
+
+
+def test_profile_covers_pipeline_stages(tmp_path, capsys):
+    instr.reset()
+    instr.enable()
+    try:
+        businesses = get_business_data()
+        population, industries = get_demographic_data(), get_industry_data()
+        filters = {"industry": "cafes", "cities": ["Provo"], "sort_by": "revenue"}
+        filtered = filter_businesses(businesses, filters)
+        sort_businesses(filtered, filters)
+        with instr.span("run"):
+            analyze_market(filtered, population, filters, industries["cafes"])
+    finally:
+        instr.disable()
+
+    paths = {s["path"] for s in instr.report()["spans"]}
+    assert {"fetch.business", "fetch.business;fetch.business.file", "filter", "sort",
+            "run;analyze", "run;analyze;analyze.score", "run;analyze;analyze.stats"} <= paths
+    assert instr.report()["counters"]["analyze.businesses"] == len(filtered)
+
+    instr.dump(str(tmp_path / "p.json"))
+    instr.dump(str(tmp_path / "p.folded"))
+    assert json.loads((tmp_path / "p.json").read_text())["spans"]
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in (tmp_path / "p.folded").read_text().splitlines())
+    # [DEBUG] chatter is off unless verbose
+    assert "[DEBUG]" not in capsys.readouterr().out
+
+
+def test_log_formats_lazily_and_warnings_stay_visible(capsys):
+    class Exploding:
+        def __format__(self, spec):
+            raise AssertionError("formatted while quiet")
+
+    instr.log("[DEBUG] {}", Exploding())
+    population = get_demographic_data()
+    industry = get_industry_data()["cafes"]
+    analyze_market([], population, {"industry": "cafes", "cities": ["Nowhere"]}, industry)
+    out = capsys.readouterr().out
+    assert "⚠️  Missing or zero population data" in out
+    assert "[DEBUG]" not in out
+
+    instr.set_verbose()
+    try:
+        instr.log("[DEBUG] income ${:,.2f}", 1234.5)
+    finally:
+        instr.set_verbose(False)
+    assert capsys.readouterr().out == "[DEBUG] income $1,234.50\n"
+
+
+def test_bound_worker_spans_nest_under_parent():
+    def work(n):
+        with instr.span("work"):
+            return n
+
+    instr.reset()
+    instr.enable()
+    try:
+        with instr.span("parent"), ThreadPoolExecutor(max_workers=2) as pool:
+            assert list(pool.map(instr.bind(work), range(4))) == [0, 1, 2, 3]
+    finally:
+        instr.disable()
+
+    calls = {s["path"]: s["calls"] for s in instr.report()["spans"]}
+    assert calls == {"parent": 1, "parent;work": 4}
@@ -0,0 +1,77 @@
+from analyzer import analyze_market, aggregate_population
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses
+from market_state import MarketState
+
+FIELDS = ["tam", "current_revenue", "remaining_tam", "competition_score", "rev_opp_score",
+          "demand_score", "population", "businesses", "confidence_score"]
+
+
+def _setup():
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    params = fetch_industry_data()["cafes"]
+    filters = {"industry": "cafes", "cities": ["Salt Lake City", "Provo", "Orem"]}
+    return filter_businesses(businesses, filters), population, filters, params
+
+
+def _assert_matches(state, rows, population, filters, params):
+    expected = analyze_market(rows, population, filters, params)
+    got = state.scores()
+    for field in FIELDS:
+        assert got[field] == expected[field], field
+
+
+def test_add_remove_matches_full_recompute(capsys):
+    rows, population, filters, params = _setup()
+    state = MarketState.from_data(rows[:1], population, filters, params)
+    current = rows[:1]
+    for b in rows[1:]:
+        state.add_business(b)
+        current = current + [b]
+        _assert_matches(state, current, population, filters, params)
+
+    state.remove_business(rows[0])
+    _assert_matches(state, rows[1:], population, filters, params)
+    assert not state.remove_business(rows[0])
+
+    new = {"business_name": "New Roast", "city": "Provo", "industry": "Cafes",
+           "revenue": None, "place_id": "p-new"}
+    state.add_business(new)
+    state.add_business(dict(new, revenue=250000))  # same place_id -> replaced
+    assert len(state) == len(rows)
+    _assert_matches(state, rows[1:] + [dict(new, revenue=250000)], population, filters, params)
+    assert state.remove_business("p-new")
+
+
+def test_sync_and_population_update(capsys):
+    rows, population, filters, params = _setup()
+    state = MarketState.from_data(rows, population, filters, params)
+    refreshed = [dict(rows[0], revenue=1)] + rows[2:] + [
+        {"business_name": "Pop Up", "city": "Orem", "industry": "Cafes", "revenue": 5000}
+    ]
+    assert state.sync(refreshed) == {"added": 1, "removed": 1, "updated": 1}
+    _assert_matches(state, refreshed, population, filters, params)
+
+    grown = {k: dict(v, population=v["population"] * 2) for k, v in population.items()}
+    state.update_population(aggregate_population(grown, filters["cities"]))
+    _assert_matches(state, refreshed, grown, filters, params)
+
+
+def test_table_rows_as_keys_and_no_drift_under_churn():
+    from business_table import BusinessTable
+
+    rows, population, filters, params = _setup()
+    table = BusinessTable.from_records(rows)
+    state = MarketState.from_data(table, population, filters, params)
+    row = next(iter(table))
+    assert row in state
+    assert state.remove_business(row) and row not in state
+
+    state = MarketState(params, total_population=1000, weighted_income=50000,
+                        businesses=[{"place_id": "small", "revenue": 0.1}])
+    big = {"place_id": "big", "revenue": 1e16 / 3}
+    for _ in range(1000):
+        state.add_business(big)
+        state.remove_business(big)
+    assert state.scores()["current_revenue"] == 0.1
@@ -0,0 +1,104 @@
+import pickle
+import random
+
+from analyzer import analyze_market
+from business_index import BusinessIndex
+from business_table import BusinessTable
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses
+import place_resolver
+from place_resolver import UNKNOWN, PlaceResolver, lookup_place, parse_address_city
+
+
+def test_spellings_resolve_to_one_place():
+    resolver = PlaceResolver.from_population(
+        {"provo": {"population": 115000, "avg_income": 60000},
+         "salt lake city": {"population": 200000, "avg_income": 70000}},
+        aliases={"SLC": "Salt Lake City"},
+    )
+    provo = resolver.resolve("provo")
+    assert resolver.resolve("Provo city") == resolver.resolve("  PROVO ") == resolver.resolve("Provo, UT") == provo
+    assert resolver.resolve("Salt Lake City city") == resolver.resolve("slc") == resolver.resolve("Salt Lake City")
+    assert resolver.resolve("nowhere") == UNKNOWN
+    assert resolver["SLC"]["population"] == 200000
+    assert "Provo City" in resolver and "nowhere" not in resolver
+    assert sorted(resolver) == ["provo", "salt lake city"] and len(resolver) == 2
+    assert resolver.resolve_many(["Provo", None, "slc", "provo city", "nowhere"]).tolist() == [
+        provo, UNKNOWN, resolver.resolve("slc"), provo, UNKNOWN]
+    assert pickle.loads(pickle.dumps(resolver)).resolve("slc") == resolver.resolve("slc")
+
+
+def test_bare_name_never_gains_a_suffix(monkeypatch):
+    population = {"park city": {"population": 8000, "avg_income": 120000},
+                  "salt lake city": {"population": 200000, "avg_income": 70000}}
+    resolver = PlaceResolver.from_population(population)
+    assert resolver.resolve("Park") == UNKNOWN and "Park" not in resolver
+    assert resolver.resolve("Salt Lake") == UNKNOWN
+    assert lookup_place(population, "park") is None
+    assert resolver.resolve("Park City") == resolver.resolve("park city city") != UNKNOWN
+    resolver.add_alias("Salt Lake", "salt lake city")  # explicit aliases still work
+    assert resolver["salt lake"]["population"] == 200000
+
+    monkeypatch.setattr(place_resolver, "MAX_CACHED_SPELLINGS", 10)
+    grow = PlaceResolver()
+    for i in range(50):
+        grow.resolve(f"Town {i}")
+    assert len(grow._cache) <= 10 and grow.resolve("town 3") == grow.resolve("Town 3")
+
+
+def test_ids_do_not_depend_on_lookup_order():
+    seed = lambda: ["Provo", "Park City"]
+    first, second = PlaceResolver(seed=seed), PlaceResolver(seed=seed)
+    assert first.resolve("Provo city") == first.resolve("provo")
+    assert second.resolve("provo") == second.resolve("Provo city")
+    assert first.resolve("Provo city") == second.resolve("Provo city")
+    # names outside the seed: one ID per place either way round
+    assert first.resolve("Lehi city") == first.resolve("lehi")
+    assert second.resolve("lehi") == second.resolve("Lehi city")
+    # seeded places still never gain a suffix
+    assert first.resolve("park") != first.resolve("Park City") == first.resolve("park city city")
+
+    filters = {"industry": "cafes", "cities": ["Provo city"]}
+    businesses = fetch_business_data()
+    assert filter_businesses(businesses, filters) == filter_businesses(businesses, dict(filters, cities=["provo"]))
+    assert place_resolver.PLACES.resolve("Provo city") == place_resolver.PLACES.resolve("provo")
+
+
+def test_address_parsing():
+    assert parse_address_city("155 S Freedom Blvd, Provo, UT 84601, USA") == "provo"
+    assert parse_address_city("Suite 4, 12 Main St, Salt Lake City, UT 84101") == "salt lake city"
+    assert parse_address_city("12 Main St, Orem") == "orem"
+    assert parse_address_city("Orem") == ""
+
+
+def test_alias_aware_filters_agree_and_match_analysis():
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    params = fetch_industry_data()["cafes"]
+    city = businesses[0]["city"]
+    census_spelling = {"industry": "cafes", "cities": [f"{city.title()} city"]}
+    plain = {"industry": "cafes", "cities": [city]}
+
+    expected = filter_businesses(businesses, plain)
+    assert expected and filter_businesses(businesses, census_spelling) == expected
+    assert list(filter_businesses(BusinessIndex(businesses), census_spelling)) == expected
+    table = filter_businesses(BusinessTable.from_records(businesses), census_spelling)
+    assert [r["business_name"] for r in table.to_records()] == [b["business_name"] for b in expected]
+
+    resolver = PlaceResolver.from_population(population)
+    assert (analyze_market(expected, resolver, census_spelling, params)
+            == analyze_market(expected, population, plain, params))
+
+
+def test_bulk_resolution_resolves_each_distinct_name_once():
+    rng = random.Random(2)
+    names = [f"Place {i}" for i in range(2000)]
+    column = [rng.choice(names) + rng.choice(["", " city", " CDP"]) for _ in range(300_000)]
+    resolver = PlaceResolver()  # not the process-wide PLACES: these names must not leak
+    resolved = []
+    resolve = resolver.resolve
+    resolver.resolve = lambda name: resolved.append(name) or resolve(name)
+    ids = resolver.resolve_many(column)
+    assert sorted(resolved) == sorted(set(column))  # one lookup per distinct spelling, not per row
+    assert len(set(ids.tolist())) == 2000
+    assert ids[0] == resolve(column[0].replace(" CDP", ""))
@@ -0,0 +1,50 @@
+import random
+
+from analyzer import analyze_market
+from batch_scoring import score_markets_batch
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses
+from ranking import rank_cities
+
+
+def test_ranking_matches_per_city_analysis(capsys):
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    params = fetch_industry_data()["cafes"]
+
+    ranked = rank_cities(businesses, population, "cafes", params, k=len(population))
+    assert len(ranked) == len(population)
+    assert [r["rank"] for r in ranked] == list(range(1, len(ranked) + 1))
+    demands = [r["demand_score"] for r in ranked]
+    assert demands == sorted(demands, reverse=True)
+    for r in ranked:
+        filters = {"industry": "cafes", "cities": [r["city"]]}
+        expected = analyze_market(filter_businesses(businesses, filters), population, filters, params)
+        for field in ("demand_score", "tam", "confidence_score", "businesses"):
+            assert r[field] == expected[field], (r["city"], field)
+
+    top3 = rank_cities(businesses, population, "cafes", params, k=3)
+    assert top3 == ranked[:3]
+
+
+def test_filters_and_single_batch_on_thousands_of_places(monkeypatch):
+    import ranking
+    rng = random.Random(5)
+    population = {f"place {i}": {"population": rng.randint(100, 500_000), "avg_income": rng.randint(30_000, 150_000)}
+                  for i in range(5000)}
+    businesses = [{"business_name": f"b{i}", "city": f"place {rng.randrange(5000)}", "industry": "Cafes",
+                   "revenue": rng.choice([None, rng.randint(50_000, 900_000)])} for i in range(50_000)]
+    params = {"ideal_ppb": 2000, "spend_per_capita": 350, "tam_weight": 0.5, "income_elasticity": 1.05}
+
+    batches = []
+
+    def counting_batch(*args, **kwargs):
+        batches.append(1)
+        return score_markets_batch(*args, **kwargs)
+    monkeypatch.setattr(ranking, "score_markets_batch", counting_batch)
+    ranked = rank_cities(businesses, population, "cafes", params, k=25,
+                         min_population=20_000, min_confidence=40, max_income=120_000)
+    assert batches == [1]  # every place scored in one vectorized call
+    assert len(ranked) == 25
+    for r in ranked:
+        assert r["population"] >= 20_000 and r["confidence_score"] >= 40 and r["weighted_income"] <= 120_000
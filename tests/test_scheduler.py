@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+
+import pytest
+
+import data_sources
+import data_storage
+import scheduler
+import transport
+from scheduler import ApiError, QuotaExceeded, RequestScheduler, TokenBucket
+
+
+class Response:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def scripted(*statuses):
+    """send() that answers with the given statuses in turn (exceptions are raised)."""
+    calls = []
+
+    def send():
+        status = statuses[len(calls)]
+        calls.append(status)
+        if isinstance(status, Exception):
+            raise status
+        return status if isinstance(status, Response) else Response(status)
+    return send, calls
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_storage, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(scheduler, "_schedulers", {})
+    monkeypatch.setattr(data_sources, "fetch_API_Keys",
+                        lambda: {"google_maps_api_key": "k", "Census_API_Key": "k"})
+    data_storage.clear_memory_cache()
+    yield
+    data_storage.clear_memory_cache()
+
+
+def test_retries_transient_errors_with_jittered_backoff():
+    sleeps = []
+    s = RequestScheduler("t", max_retries=3, base_delay=1.0, sleep=sleeps.append, rng=random.Random(1))
+    send, calls = scripted(503, 429, ConnectionError("reset"), 200)
+    assert s.request(send).status_code == 200
+    assert len(calls) == 4 and len(sleeps) == 3
+    assert all(0 <= d <= cap for d, cap in zip(sleeps, (1.0, 2.0, 4.0)))
+    stats = s.stats()
+    assert (stats["retries"], stats["server_errors"], stats["rate_limited"], stats["connection_errors"]) == (3, 1, 1, 1)
+
+    # 4xx other than 429 is the caller's problem, not retried
+    send, calls = scripted(404)
+    assert s.request(send).status_code == 404 and calls == [404]
+
+
+def test_retry_after_is_honoured_and_failure_raises():
+    sleeps = []
+    s = RequestScheduler("t", max_retries=2, max_delay=10, sleep=sleeps.append)
+    send, calls = scripted(Response(429, {"Retry-After": "3"}), Response(429, {"Retry-After": "60"}), 500)
+    with pytest.raises(ApiError, match="HTTP 500 after 3 attempts") as err:
+        s.request(send)
+    assert err.value.status == 500 and err.value.api == "t"
+    assert sleeps == [3.0, 10.0]
+    assert s.stats()["failures"] == 1
+
+
+def test_daily_quota():
+    s = RequestScheduler("t", daily_quota=2, sleep=lambda d: None)
+    for _ in range(2):
+        s.request(scripted(200)[0])
+    send, calls = scripted(200)
+    with pytest.raises(QuotaExceeded):
+        s.request(send)
+    assert calls == [] and s.stats()["quota_rejections"] == 1
+
+
+def test_token_bucket_paces_requests():
+    now = [0.0]
+    bucket = TokenBucket(rate=10, burst=2, clock=lambda: now[0], sleep=lambda d: now.__setitem__(0, now[0] + d))
+    waits = [bucket.acquire() for _ in range(12)]
+    assert waits[:2] == [0.0, 0.0]  # burst
+    assert now[0] == pytest.approx(1.0)  # then 10/s
+    assert all(w == pytest.approx(0.1) for w in waits[2:])
+
+
+def test_identical_inflight_requests_are_coalesced():
+    s = RequestScheduler("t")
+    release, calls = threading.Event(), []
+
+    def send():
+        calls.append(1)
+        release.wait(5)
+        return Response(200)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(s.request(send, key=("GET", "u", {"q": 1}))))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and len(results) == 5 and len({id(r) for r in results}) == 1
+    assert s.stats()["coalesced"] == 4
+
+
+def test_fetchers_ride_out_flaky_server_and_report_outages(monkeypatch, capsys):
+    scheduler.configure_scheduler("census", base_delay=0.01, max_retries=8, rng=random.Random(0))
+    scheduler.configure_scheduler("places", base_delay=0.01, max_retries=8, rng=random.Random(0))
+    with transport.FakeApiServer(error_rate=0.4, places_per_state=25, places_per_query=20, seed=5) as fake:
+        table = data_sources.fetch_demographic_nationwide(["49", "06", "17", "29"], max_workers=4,
+                                                          base_url=fake.census_url)
+        rows = data_sources.fetch_business_api("gyms", ["Provo", "Orem", "Logan"], url=fake.places_url)
+        assert fake.stats()["errors"] > 0
+        assert len(table) == 4 * 25 and len(rows) == 60
+        stats = scheduler.scheduler_stats()
+        assert stats["census"]["retries"] + stats["places"]["retries"] == fake.stats()["errors"]
+
+        fake.error_rate = 1.0
+        scheduler.configure_scheduler("places", base_delay=0.001, max_retries=1)
+        with pytest.raises(ApiError):
+            data_sources.fetch_business_api("gyms", ["Ogden"], url=fake.places_url)
+        monkeypatch.setattr(data_sources, "PLACES_SEARCH_URL", fake.places_url)
+        with pytest.raises(ApiError):  # live data was asked for: no silent sample substitute
+            data_sources.get_business_data("api", "gyms", ["Ogden"])
+        data = data_sources.get_business_data("api", "gyms", ["Ogden"], fallback=True)
+    assert "FAILED" in capsys.readouterr().out
+    assert data == data_sources.fetch_business_data()
+
+
+def test_missing_places_key_raises(monkeypatch):
+    monkeypatch.setattr(data_sources, "fetch_API_Keys", lambda: {})
+    with pytest.raises(ApiError, match="key missing"):
+        data_sources.fetch_business_api("gyms", ["Provo"], url="http://127.0.0.1:9/")
+    with pytest.raises(ApiError, match="key missing"):
+        data_sources.harvest_business_api("gyms", ["Provo"], url="http://127.0.0.1:9/")
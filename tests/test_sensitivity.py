@@ -0,0 +1,48 @@
+from analyzer import analyze_market
+from batch_scoring import score_markets_batch
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses
+from sensitivity import run_sensitivity, sample_parameters
+
+
+def _market():
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    industries = fetch_industry_data()
+    industry = next(k for k in industries if k != "default")
+    filters = {"industry": industry, "cities": list(population)[:3]}
+    return filter_businesses(businesses, filters), population, filters, industries[industry]
+
+
+def test_fixed_spreads_collapse_to_analyze_market(capsys):
+    filtered, population, filters, params = _market()
+    fixed = {name: ("fixed", 0.0) for name in sample_parameters(params, 1)}
+    result = run_sensitivity(filtered, population, filters, params, n_draws=50, spreads=fixed, seed=0)
+    expected = analyze_market(filtered, population, filters, params)
+
+    assert result["baseline"]["demand_score"] == expected["demand_score"]
+    for field in ("demand_score", "tam"):
+        band = result["bands"][field]
+        assert band["p5"] == band["p95"] == expected[field]
+
+
+def test_bands_are_ordered_and_reproducible():
+    filtered, population, filters, params = _market()
+    a = run_sensitivity(filtered, population, filters, params, n_draws=5000, seed=3)
+    b = run_sensitivity(filtered, population, filters, params, n_draws=5000, seed=3)
+    assert a == b
+    band = a["bands"]["demand_score"]
+    assert 0 <= band["p5"] <= band["p25"] <= band["p50"] <= band["p75"] <= band["p95"] <= 100
+
+
+def test_100k_draws_are_scored_in_one_batch(monkeypatch):
+    import sensitivity
+    filtered, population, filters, params = _market()
+    calls = []
+
+    def counting_batch(*args, **kwargs):
+        calls.append(1)
+        return score_markets_batch(*args, **kwargs)
+    monkeypatch.setattr(sensitivity, "score_markets_batch", counting_batch)
+    result = run_sensitivity(filtered, population, filters, params, n_draws=100_000, seed=1)
+    assert calls == [1] and result["draws"] == 100_000
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import batch_runner
+import service as service_module
+from service import AnalysisService
+
+QUERY = {"industry": "cafes", "cities": ["Provo", "Salt Lake City"], "sort_by": "revenue", "limit": 3}
+
+
+@pytest.fixture
+def service_url():
+    service = AnalysisService(refresh_interval=0.2)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(service.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}", service
+
+    async def shutdown():
+        await service.stop()
+        server.close()
+        await server.wait_closed()
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_endpoints_match_batch_results(service_url):
+    url, _ = service_url
+    datasets = batch_runner.build_datasets()
+    expected = batch_runner.run_query(batch_runner.normalize_query(QUERY, 0), datasets)
+
+    got = requests.post(f"{url}/analyze", json=QUERY).json()
+    assert got["analysis"]["demand_score"] == expected["analysis"]["demand_score"]
+    assert got["businesses"] == expected["businesses"]
+
+    rows = requests.post(f"{url}/businesses", json=QUERY).json()["businesses"]
+    assert rows == expected["businesses"]
+
+    ranked = requests.post(f"{url}/rank", json={"industry": "cafes", "top": 3}).json()["cities"]
+    assert [r["rank"] for r in ranked] == [1, 2, 3]
+
+    assert requests.get(f"{url}/health").json()["status"] == "ok"
+    assert requests.post(f"{url}/rank", json={"industry": "nope"}).status_code == 404
+    assert requests.post(f"{url}/analyze", json={"industry": "nope"}).status_code == 404
+    assert requests.post(f"{url}/analyze", data=b"{not json").status_code == 400
+    assert requests.get(f"{url}/nowhere").status_code == 405
+    assert requests.post(f"{url}/nowhere", json={}).status_code == 404
+
+
+def test_malformed_numbers_are_rejected_with_400(service_url):
+    url, _ = service_url
+    for path, body in [("/rank", {"industry": "cafes", "top": "ten"}),
+                       ("/rank", {"industry": "cafes", "top": -1}),
+                       ("/analyze", dict(QUERY, limit="three")),
+                       ("/businesses", dict(QUERY, limit=None))]:
+        response = requests.post(f"{url}{path}", json=body)
+        assert response.status_code == 400, (path, body)
+        assert "must be a non-negative integer" in response.json()["error"]
+
+
+def test_concurrent_requests_are_served_during_background_refresh(service_url):
+    url, service = service_url
+    first_load = service.loaded_at
+
+    def client(n):
+        session = requests.Session()  # keep-alive connection per client
+        scores = []
+        deadline = time.monotonic() + 10
+        # keep querying until a background reload has happened underneath us
+        while (len(scores) < n or service.loaded_at == first_load) and time.monotonic() < deadline:
+            scores.append(session.post(f"{url}/analyze", json=QUERY).json()["analysis"]["demand_score"])
+        return scores
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        scores = [score for chunk in pool.map(client, [40] * 8) for score in chunk]
+
+    assert service.loaded_at > first_load
+    assert len(scores) >= 320 and len(set(scores)) == 1  # same answer before, during and after reloads
+
+
+def test_slow_query_does_not_block_other_connections(service_url, monkeypatch):
+    url, _ = service_url
+    real_run_query = service_module.run_query
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_run_query(query, datasets):
+        started.set()
+        release.wait(10)  # stands in for a large CPU-bound analysis
+        return real_run_query(query, datasets)
+
+    monkeypatch.setattr(service_module, "run_query", slow_run_query)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        slow = pool.submit(requests.post, f"{url}/analyze", json=QUERY)
+        assert started.wait(5)
+        assert requests.get(f"{url}/health", timeout=5).status_code == 200
+        assert not slow.done()  # answered while the analysis was still running
+        release.set()
+        assert slow.result().status_code == 200
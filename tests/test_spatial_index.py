@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+
+from business_index import BusinessIndex
+from business_table import BusinessTable
+from filtering import filter_businesses, sort_businesses
+from spatial_index import SpatialIndex, distances_km
+
+PROVO = (40.2338, -111.6585)
+
+
+def random_businesses(n, seed=9, missing_every=50):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        row = {"business_name": f"b{i}", "city": "somewhere", "industry": rng.choice(["Cafes", "Gyms"]),
+               "revenue": rng.randint(50_000, 900_000)}
+        if i % missing_every:
+            row["lat"] = PROVO[0] + rng.uniform(-1.5, 1.5)
+            row["lon"] = PROVO[1] + rng.uniform(-1.5, 1.5)
+        rows.append(row)
+    return rows
+
+
+def test_kd_tree_matches_brute_force():
+    rows = random_businesses(200_000)
+    index = SpatialIndex(rows)
+    assert index.missing == 200_000 // 50
+    dist = distances_km(rows, PROVO)
+
+    examined = []
+    leaf_distances = index._leaf_distances
+
+    def counting_leaf_distances(node, q):
+        examined.append(index._end[node] - index._start[node])
+        return leaf_distances(node, q)
+    index._leaf_distances = counting_leaf_distances
+    hits = index.within(*PROVO, radius_km=10)
+    expected = np.flatnonzero(dist <= 10)
+    assert sorted(id(r) for _, r in hits) == sorted(id(rows[i]) for i in expected)
+    kms = [km for km, _ in hits]
+    assert kms == sorted(kms)
+    assert len(expected) <= sum(examined) < len(index) // 20  # pruned leaves: no full scan
+
+    nearest = index.nearest(*PROVO, k=25)
+    order = np.argsort(np.where(np.isnan(dist), np.inf, dist), kind="stable")[:25]
+    assert [r for _, r in nearest] == [rows[i] for i in order]
+    assert np.allclose([km for km, _ in nearest], dist[order])
+
+
+def test_radius_filter_same_for_list_index_and_table():
+    rows = random_businesses(5000)
+    filters = {"industry": "cafes", "cities": [], "origin": PROVO, "radius_km": 25}
+    expected = filter_businesses(rows, filters)
+    assert expected and all(b["industry"] == "Cafes" for b in expected)
+    assert all(d <= 25 for d in distances_km(expected, PROVO))
+
+    assert filter_businesses(BusinessIndex(rows), filters) == expected
+    table_rows = filter_businesses(BusinessTable.from_records(rows), filters).to_records()
+    assert [r["business_name"] for r in table_rows] == [r["business_name"] for r in expected]
+
+
+def test_distance_sort_puts_missing_coordinates_last(capsys):
+    rows = [
+        {"business_name": "far", "lat": 41.0, "lon": -111.9},
+        {"business_name": "unknown", "lat": None, "lon": None},
+        {"business_name": "near", "lat": 40.24, "lon": -111.66},
+    ]
+    filters = {"sort_by": "distance", "origin": PROVO}
+    assert [b["business_name"] for b in sort_businesses(rows, filters)] == ["near", "far", "unknown"]
+    table = sort_businesses(BusinessTable.from_records(rows), filters)
+    assert [r["business_name"] for r in table.to_records()] == ["near", "far", "unknown"]
+
+    assert sort_businesses(rows, {"sort_by": "distance"}) == rows
+    assert "needs an origin" in capsys.readouterr().out
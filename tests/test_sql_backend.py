@@ -0,0 +1,135 @@
+import copy
+import math
+import sqlite3
+
+from analyzer import analyze_market
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses, sort_businesses
+from sql_backend import (analyze_market_sql, build_database, connect, get_industry_params, market_aggregates,
+                         query_businesses)
+from validation import validate_businesses, validate_demographics
+
+FIELDS = ["tam", "current_revenue", "remaining_tam", "demand_score", "population",
+          "businesses", "weighted_income", "spend_per_capita"]
+
+
+def _build(tmp_path, businesses=None):
+    businesses = businesses if businesses is not None else fetch_business_data()
+    return build_database(str(tmp_path / "market.db"), iter(businesses),
+                          fetch_demographic_data(), fetch_industry_data())
+
+
+def test_sql_scores_match_python_pipeline(tmp_path, capsys):
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    industries = fetch_industry_data()
+    conn = _build(tmp_path, businesses)
+
+    for industry in [k for k in industries if k != "default"]:
+        for cities in ([], ["Provo"], ["salt lake city", "Orem", "Provo"]):
+            filters = {"industry": industry, "cities": cities}
+            expected = analyze_market(filter_businesses(businesses, filters), population, filters,
+                                      industries[industry], streaming=False)
+            got = analyze_market_sql(conn, filters)
+            for field in FIELDS:
+                assert got[field] == expected[field], (industry, cities, field)
+            for key, value in expected["stats_dif"].items():
+                assert (math.isnan(value) and math.isnan(got["stats_dif"][key])) \
+                    or got["stats_dif"][key] == value
+
+
+def test_aggregates_are_pushed_down_and_case_insensitive(tmp_path):
+    rows = [
+        {"business_name": "A", "city": "Provo", "industry": "Cafes", "revenue": 100},
+        {"business_name": "B", "city": "provo", "industry": "cafes", "revenue": None},
+        {"business_name": "C", "city": "Nowhere", "industry": "Cafes", "revenue": 50},
+    ]
+    conn = _build(tmp_path, rows)
+    agg = market_aggregates(conn, "CAFES", ["PROVO"])
+    assert agg["biz_count"] == 2
+    assert agg["current_revenue"] == 100
+    assert agg["revenue_count"] == 1
+    assert agg["population"] == fetch_demographic_data()["provo"]["population"]
+
+    # reopening an existing file works without reloading
+    conn.close()
+    assert market_aggregates(connect(str(tmp_path / "market.db")), "cafes", [])["biz_count"] == 3
+
+
+def test_query_businesses_sorts_in_sql(tmp_path):
+    businesses = fetch_business_data()
+    conn = _build(tmp_path, businesses)
+    filters = {"industry": "cafes", "cities": [], "sort_by": "business_name"}
+    expected = sort_businesses(filter_businesses(businesses, filters), filters)
+    got = query_businesses(conn, filters, limit=3)
+    assert [b["business_name"] for b in got] == [b["business_name"] for b in expected[:3]]
+
+
+def test_alias_spellings_match_python(tmp_path, capsys):
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    params = fetch_industry_data()["cafes"]
+    aliased = [dict(b, city="Salt Lake City city") if b["city"].lower() == "salt lake city" else b
+               for b in businesses]
+    conn = _build(tmp_path, aliased)
+
+    filters = {"industry": "cafes", "cities": ["Salt Lake City city", "provo, UT"]}
+    expected = analyze_market(filter_businesses(aliased, filters), population, filters, params, streaming=False)
+    assert expected["businesses"] > 0
+    got = analyze_market_sql(conn, filters)
+    for field in FIELDS:
+        assert got[field] == expected[field], field
+    assert len(query_businesses(conn, filters)) == expected["businesses"]
+
+
+def test_dirty_inputs_are_validated_like_python(tmp_path, capsys):
+    rows = [
+        {"business_name": "A", "city": "Provo", "industry": "cafes", "revenue": "$12,000"},
+        {"business_name": "B", "city": "Provo", "industry": "cafes", "revenue": "N/A", "rating": "4.5"},
+        {"business_name": "C", "city": "Orem", "industry": "cafes", "revenue": 3000},
+        {"business_name": "D", "city": " ", "industry": "cafes", "revenue": 10},
+    ]
+    population = dict(fetch_demographic_data(), orem={"population": 98000, "avg_income": -666666666})
+    conn = build_database(str(tmp_path / "market.db"), iter(copy.deepcopy(rows)), population,
+                          fetch_industry_data())
+
+    filters = {"industry": "cafes", "cities": ["Provo", "Orem"]}
+    clean_rows, _ = validate_businesses(copy.deepcopy(rows))
+    clean_population, _ = validate_demographics(population)
+    expected = analyze_market(filter_businesses(clean_rows, filters), clean_population, filters,
+                              fetch_industry_data()["cafes"], streaming=False)
+    got = analyze_market_sql(conn, filters)
+    assert got["current_revenue"] == expected["current_revenue"] == 15000
+    for field in FIELDS:
+        assert got[field] == expected[field], field
+    assert [b["revenue"] for b in query_businesses(conn, dict(filters, sort_by="revenue"))] == [12000, 3000, None]
+    assert "Validation" in capsys.readouterr().out
+
+
+def test_benchmark_income_round_trips(tmp_path, capsys):
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    industries = fetch_industry_data()
+    industries["cafes"] = dict(industries["cafes"], benchmark_income=91234.5)
+    conn = build_database(str(tmp_path / "market.db"), iter(businesses), population, industries)
+
+    assert get_industry_params(conn, "cafes")["benchmark_income"] == 91234.5
+    filters = {"industry": "cafes", "cities": ["Provo"]}
+    expected = analyze_market(filter_businesses(businesses, filters), population, filters,
+                              industries["cafes"], streaming=False)
+    got = analyze_market_sql(conn, filters)
+    for field in FIELDS:
+        assert got[field] == expected[field], field
+
+
+def test_connect_adds_new_industry_columns_to_old_databases(tmp_path):
+    path = str(tmp_path / "old.db")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE industries (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE, "
+                "ideal_ppb INTEGER, spend_per_capita INTEGER, tam_weight REAL, rev_weight REAL, "
+                "income_elasticity REAL)")
+    old.commit()
+    old.close()
+
+    columns = {row[1] for row in connect(path).execute("PRAGMA table_info(industries)")}
+    assert "benchmark_income" in columns
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+import sweeps
+from analyzer import analyze_market
+from batch_scoring import score_markets_batch
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data
+from filtering import filter_businesses
+
+FIELDS = ["demand_score", "tam", "remaining_tam", "competition_norm", "rev_opp_score",
+          "confidence_score", "population", "weighted_income", "businesses", "spend_per_capita"]
+
+
+def key(r):
+    return r["industry"], tuple(r["cities"]), r["dynamic_spc"]
+
+
+def test_sweep_matches_analyze_market_in_process_and_in_pool(capsys):
+    businesses = fetch_business_data()
+    population = fetch_demographic_data()
+    industries = fetch_industry_data()
+
+    local = list(sweeps.run_sweep(businesses, population, industries, max_window=3, workers=1))
+    n_windows = 20 + 19 + 18
+    assert len(local) == len(industries) * n_windows * 2
+
+    for r in local[::7]:
+        filters = {"industry": r["industry"], "cities": r["cities"]}
+        expected = analyze_market(filter_businesses(businesses, filters), population, filters,
+                                  industries[r["industry"]], r["dynamic_spc"])
+        for field in FIELDS:
+            assert r[field] == pytest.approx(expected[field], rel=1e-12, abs=1e-9), (key(r), field)
+
+    pooled = list(sweeps.run_sweep(businesses, population, industries, max_window=3, workers=2, chunk_size=50))
+    assert sorted(pooled, key=key) == sorted(local, key=key)
+
+
+def test_early_stop_releases_pool_and_shared_memory():
+    businesses = fetch_business_data()
+    results = sweeps.run_sweep(businesses, fetch_demographic_data(), fetch_industry_data(),
+                               workers=2, chunk_size=10)
+    first = next(results)
+    assert "demand_score" in first
+    results.close()  # pool shut down, block unlinked, no leaked-resource warnings
+
+
+def test_tens_of_thousands_of_scenarios_are_scored_in_chunks(monkeypatch):
+    rng = random.Random(3)
+    population = {f"place {i}": {"population": rng.randint(500, 300_000), "avg_income": rng.randint(30_000, 140_000)}
+                  for i in range(400)}
+    industries = {f"industry {k}": {"ideal_ppb": rng.randint(500, 5000), "spend_per_capita": rng.randint(50, 900)}
+                  for k in range(20)}
+    businesses = [{"business_name": f"b{i}", "city": f"place {rng.randrange(400)}",
+                   "industry": f"industry {rng.randrange(20)}", "revenue": rng.randint(10_000, 900_000)}
+                  for i in range(20_000)]
+    batches = []
+
+    def counting_batch(**inputs):
+        batches.append(len(inputs["population"]))
+        return score_markets_batch(**inputs)
+    monkeypatch.setattr(sweeps, "score_markets_batch", counting_batch)
+
+    n = sum(1 for _ in sweeps.run_sweep(businesses, population, industries, max_window=5, workers=1))
+    assert n == sum(batches) == 20 * (400 + 399 + 398 + 397 + 396) * 2
+    assert len(batches) <= 2 * -(-n // sweeps.CHUNK_SIZE)  # one call per chunk and SPC mode
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+import requests
+
+import data_sources
+import data_storage
+import transport
+from scheduler import ApiError
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_storage, "CACHE_DIR", str(tmp_path / "cache"))
+    data_storage.clear_memory_cache()
+    monkeypatch.setattr(data_sources, "fetch_API_Keys",
+                        lambda: {"google_maps_api_key": "secret-places-key", "Census_API_Key": "secret-census-key"})
+    yield
+    transport.set_transport(None)
+    data_storage.clear_memory_cache()
+
+
+def test_record_then_replay_offline(tmp_path):
+    fixtures = str(tmp_path / "fixtures")
+    with transport.FakeApiServer(places_per_state=30) as fake:
+        recorder = transport.RecordingTransport(fixtures)
+        transport.set_transport(recorder)
+        live_census = data_sources.fetch_demographic_api("49", base_url=fake.census_url)
+        live_places = data_sources.fetch_business_api("cafes", ["Provo", "Orem"], url=fake.places_url)
+        places_url, census_url = fake.places_url, fake.census_url
+    assert len(live_census) == 30 and len(live_places) == 40
+    assert recorder.recorded == 3
+    for name in os.listdir(fixtures):
+        with open(os.path.join(fixtures, name)) as f:
+            assert "secret" not in f.read()
+
+    # server gone, response cache cleared: everything must come from the fixtures
+    data_storage.clear_memory_cache()
+    for name in os.listdir(data_storage.CACHE_DIR):
+        os.remove(os.path.join(data_storage.CACHE_DIR, name))
+    replay = transport.ReplayTransport(fixtures)
+    transport.set_transport(replay)
+    assert data_sources.fetch_demographic_api("49", base_url=census_url) == live_census
+    assert data_sources.fetch_business_api("cafes", ["Provo", "Orem"], url=places_url) == live_places
+    assert replay.replayed == 3
+
+    with pytest.raises(ApiError, match="No recorded response"):
+        data_sources.fetch_business_api("cafes", ["Logan"], url=places_url)
+
+
+def test_fake_server_paging_latency_and_errors():
+    with transport.FakeApiServer(page_size=7, places_per_query=20) as fake:
+        pages, token = [], None
+        while True:
+            body = {"textQuery": "gyms in Provo, UT", "pageSize": 20}
+            if token:
+                body["pageToken"] = token
+            data = requests.post(fake.places_url, json=body, timeout=5).json()
+            pages.append(len(data["places"]))
+            token = data.get("nextPageToken")
+            if not token:
+                break
+        assert pages == [7, 7, 6]
+
+        fake.error_rate = 1.0
+        assert requests.get(fake.census_url, params={"in": "state:49"}, timeout=5).status_code in (429, 500)
+        fake.error_rate = 0.0
+
+        fake.latency = 0.1
+        table = data_sources.fetch_demographic_nationwide(["49", "06", "17", "29", "48", "36", "12", "13"],
+                                                          max_workers=8, base_url=fake.census_url)
+        assert len(table) == 8 * 200
+        assert fake.stats()["peak_concurrency"] > 1  # states fetched concurrently
+
+
+def test_harvest_against_fake_server_is_deterministic():
+    with transport.FakeApiServer(places_per_query=60) as fake:
+        first = data_sources.harvest_business_api("cafes", ["Provo"], url=fake.places_url, patience=50)
+        data_storage.clear_memory_cache()
+        second = data_sources.harvest_business_api("cafes", ["Provo"], url=fake.places_url, patience=50)
+    ids = [r["place_id"] for r in first]
+    assert len(ids) == len(set(ids)) == 60
+    assert first == second
+    assert all(r["city"] == "provo" and r["lat"] is not None for r in first)
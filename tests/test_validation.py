@@ -0,0 +1,87 @@
+import copy
+
+import pytest
+
+from analyzer import analyze_market, calculate_current_revenue
+from data_sources import fetch_business_data, fetch_demographic_data, fetch_industry_data, validate_data
+from filtering import filter_businesses, sort_businesses
+from validation import to_number, validate_businesses, validate_demographics, validate_industries
+
+
+def test_to_number():
+    assert to_number(12) == 12 and to_number(2.5) == 2.5
+    assert to_number("$12,500") == 12500 and isinstance(to_number("12"), int)
+    assert to_number(" 3.75 ") == 3.75
+    for bad in (None, True, "N/A", "", float("nan"), float("inf"), [1]):
+        assert to_number(bad) is None
+
+
+def test_businesses_are_coerced_and_bad_rows_rejected():
+    rows = [
+        {"business_name": " Bean There ", "city": "Provo", "industry": "Cafes", "revenue": "$120,000"},
+        {"business_name": "No Revenue", "city": "Orem", "industry": "cafes", "revenue": None,
+         "rating": 7, "lat": 40.3, "lon": None},
+        {"business_name": "Refund Co", "city": "Orem", "industry": "cafes", "revenue": -50, "user_ratings_total": "31"},
+        {"business_name": "Nowhere", "city": "  ", "industry": "cafes", "revenue": 10},
+        {"business_name": "Mystery", "city": "Provo", "revenue": 10},
+        "not a row",
+    ]
+    original = copy.deepcopy(rows)
+    clean, report = validate_businesses(rows)
+    assert rows == original  # callers' rows come back untouched
+    assert [b["business_name"] for b in clean] == ["Bean There", "No Revenue", "Refund Co"]
+    assert [b["revenue"] for b in clean] == [120000, None, None]
+    assert clean[1]["rating"] is None and clean[1]["lat"] is None
+    assert clean[2]["user_ratings_total"] == 31
+    assert report.total == 6 and report.kept == 3 and report.rejected_count == 3
+    assert report.rejected == {"missing city": 1, "missing industry": 1, "not a record": 1}
+    assert report.coerced["revenue"] == 2
+    assert "3 of 6 kept" in report.summary()
+
+
+def test_demographics_drop_sentinels_and_coerce():
+    clean, report = validate_demographics({
+        "Provo": {"population": "115,000", "avg_income": 60000},
+        "ghost town": {"population": 12, "avg_income": -666666666},
+        "Lost": {"population": None, "avg_income": 50000},
+        "Rich": {"population": 10, "avg_income": 5_000_000},
+    })
+    assert clean == {"provo": {"population": 115000, "avg_income": 60000}}
+    assert report.rejected == {"missing / sentinel income": 2, "missing / negative population": 1}
+
+
+def test_industries_require_core_params():
+    clean, report = validate_industries({
+        "Cafes": {"ideal_ppb": "2000", "spend_per_capita": 350, "tam_weight": "high"},
+        "bad": {"ideal_ppb": 0, "spend_per_capita": 10},
+    })
+    assert clean == {"cafes": {"ideal_ppb": 2000, "spend_per_capita": 350}}
+    assert report.coerced["tam_weight"] == 1 and report.rejected_count == 1
+
+
+def test_sample_data_is_already_clean(capsys):
+    for data, kind in ((fetch_business_data(), "business"), (fetch_demographic_data(), "demographic"),
+                       (fetch_industry_data(), "industry")):
+        assert len(validate_data(data, kind)) == len(data)
+    assert "Validation" not in capsys.readouterr().out
+
+
+def test_api_rows_with_missing_revenue_sort_and_analyze():
+    rows, _ = validate_businesses([
+        {"business_name": "A", "city": "provo", "industry": "cafes", "revenue": None},
+        {"business_name": "B", "city": "provo", "industry": "cafes", "revenue": 300},
+        {"business_name": "C", "city": "provo", "industry": "cafes", "revenue": "N/A"},
+        {"business_name": "D", "city": "provo", "industry": "cafes", "revenue": 900},
+    ])
+    ordered = sort_businesses(rows, {"sort_by": "revenue"})
+    assert [b["business_name"] for b in ordered] == ["D", "B", "A", "C"]
+    unvalidated = [{"business_name": "E"}, {"business_name": "F", "revenue": 5}]
+    assert [b["business_name"] for b in sort_businesses(unvalidated, {"sort_by": "revenue"})] == ["F", "E"]
+    assert calculate_current_revenue(rows) == 1200
+
+    filters = {"industry": "cafes", "cities": ["Provo"]}
+    result = analyze_market(filter_businesses(rows, filters), fetch_demographic_data(), filters,
+                            fetch_industry_data()["cafes"])
+    assert result["businesses"] == 4
+    assert result["current_revenue"] == 1200
+    assert result["stats_dif"]["median_revenue"] == pytest.approx(600)